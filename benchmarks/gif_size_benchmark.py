@@ -0,0 +1,48 @@
+# benchmarks/gif_size_benchmark.py
+"""GIF大小限制转换基准测试
+
+对比两种大小限制策略把同一段视频转为不超过指定大小的GIF:
+1. iterative: 逐步调整参数，每次调整都完整编码一次
+2. predict: 编码探测片段预测大小，一次选定参数(可选调色板)
+
+用法:
+    python -m benchmarks.gif_size_benchmark --video clip.mp4 --max-size-mb 10
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from utils.video_converter import VideoProcessConfig, VideoProcessor
+
+MODES = (
+    ("iterative", {"gif_size_mode": "iterative"}),
+    ("predict", {"gif_size_mode": "predict", "gif_use_palette": False}),
+    ("predict+palette", {"gif_size_mode": "predict", "gif_use_palette": True}),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GIF大小限制转换基准测试")
+    parser.add_argument("--video", type=Path, required=True, help="输入视频")
+    parser.add_argument("--max-size-mb", type=float, default=30.0, help="GIF大小限制(MB)")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg路径")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"video={args.video.name} max_size={args.max_size_mb}MB")
+        for name, options in MODES:
+            processor = VideoProcessor(VideoProcessConfig(
+                ffmpeg_path=args.ffmpeg, gif_max_size_mb=args.max_size_mb, **options
+            ))
+            started = time.perf_counter()
+            gif_path = processor.convert_to_gif(args.video, Path(tmp) / f"{name}.gif", force_reprocess=True)
+            elapsed = time.perf_counter() - started
+            size = f"{gif_path.stat().st_size / 1024 / 1024:.2f}MB" if gif_path else "失败"
+            print(f"{name:>16}: {elapsed:.1f}s | {size}")
+
+
+if __name__ == "__main__":
+    main()
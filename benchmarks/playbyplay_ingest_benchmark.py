@@ -0,0 +1,124 @@
+# benchmarks/playbyplay_ingest_benchmark.py
+"""PlayByPlay写入吞吐基准测试
+
+对比两种events写入方式:
+1. 逐条写入: 每个动作先SELECT再INSERT/UPDATE (PlayByPlaySync._save_or_update_play_action)
+2. 批量替换: 按game_id删除后executemany插入 (PlayByPlaySync._replace_game_events)
+
+使用临时SQLite文件和合成的动作数据，不访问网络。
+引擎使用与 DBSession 相同的连接参数(驱动层自动提交模式)和调优PRAGMA，结果与生产环境一致。
+
+用法:
+    python -m benchmarks.playbyplay_ingest_benchmark --games 20 --actions 500
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from config import NBAConfig
+from database.models.stats_models import Base, Event
+from database.sqlite_tuning import apply_engine_profile
+from database.sync.playbyplay_sync import PlayByPlaySync
+
+
+def make_actions(count: int) -> list:
+    """生成与playbyplayv3结构一致的合成动作列表"""
+    action_types = ['2pt', '3pt', 'rebound', 'turnover', 'foul', 'freethrow', 'substitution']
+    actions = []
+    for number in range(1, count + 1):
+        actions.append({
+            'actionNumber': number,
+            'clock': f"PT{random.randint(0, 11):02d}M{random.randint(0, 59):02d}.00S",
+            'period': 1 + number * 4 // (count + 1),
+            'teamId': random.choice([1610612747, 1610612744]),
+            'teamTricode': random.choice(['LAL', 'GSW']),
+            'personId': random.randint(1, 2000000),
+            'playerName': 'Player',
+            'playerNameI': 'P. Player',
+            'xLegacy': random.randint(-250, 250),
+            'yLegacy': random.randint(-50, 400),
+            'shotDistance': random.randint(0, 30),
+            'shotResult': random.choice(['Made', 'Missed', '']),
+            'isFieldGoal': random.randint(0, 1),
+            'scoreHome': str(number),
+            'scoreAway': str(number),
+            'pointsTotal': 0,
+            'location': random.choice(['h', 'v']),
+            'description': 'synthetic action',
+            'actionType': random.choice(action_types),
+            'subType': '',
+            'videoAvailable': 1,
+            'shotValue': random.choice([0, 2, 3]),
+            'actionId': number
+        })
+    return actions
+
+
+def make_engine(db_path: Path):
+    """按 DBSession 的方式创建引擎: 相同的connect_args和引擎调优参数"""
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={
+        'timeout': NBAConfig.DATABASE.TIMEOUT,
+        'isolation_level': NBAConfig.DATABASE.ISOLATION_LEVEL,
+        'check_same_thread': False
+    })
+    apply_engine_profile(engine, NBAConfig.DATABASE.get_engine_profile())
+    return engine
+
+
+def run_row_by_row(sync: PlayByPlaySync, session_factory, games: dict) -> float:
+    start = time.perf_counter()
+    for game_id, actions in games.items():
+        session = session_factory()
+        for action in sync._extract_play_actions({'game': {'actions': actions}}, game_id):
+            sync._save_or_update_play_action(session, action)
+        session.commit()
+        session.close()
+    return time.perf_counter() - start
+
+
+def run_bulk_replace(sync: PlayByPlaySync, session_factory, games: dict) -> float:
+    start = time.perf_counter()
+    for game_id, actions in games.items():
+        session = session_factory()
+        sync._replace_game_events(session, game_id, actions)
+        session.commit()
+        session.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PlayByPlay写入吞吐基准测试")
+    parser.add_argument("--games", type=int, default=20, help="比赛数量")
+    parser.add_argument("--actions", type=int, default=500, help="每场比赛的动作数")
+    args = parser.parse_args()
+
+    games = {f"00223{i:05d}": make_actions(args.actions) for i in range(args.games)}
+    total_actions = args.games * args.actions
+    sync = PlayByPlaySync(bulk_write=True)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, runner in (("逐条写入", run_row_by_row), ("批量替换", run_bulk_replace)):
+            # 首次写入(空表)和重复写入(全部为更新)分别计时
+            engine = make_engine(Path(tmp_dir) / f'{runner.__name__}.db')
+            Base.metadata.create_all(engine)
+            session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+            insert_seconds = runner(sync, session_factory, games)
+            update_seconds = runner(sync, session_factory, games)
+
+            with session_factory() as session:
+                stored = session.query(Event).count()
+            engine.dispose()
+
+            print(f"{label}: 首次写入 {total_actions / insert_seconds:,.0f} 条/秒 ({insert_seconds:.2f}秒), "
+                  f"重复写入 {total_actions / update_seconds:,.0f} 条/秒 ({update_seconds:.2f}秒), "
+                  f"表中记录 {stored}")
+
+
+if __name__ == "__main__":
+    main()
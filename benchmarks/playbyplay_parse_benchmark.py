@@ -0,0 +1,132 @@
+# benchmarks/playbyplay_parse_benchmark.py
+"""PlayByPlay解析吞吐基准测试
+
+对比两种回放事件解析方式的吞吐(events/sec):
+1. validated: 每个动作单独构建并校验对应的Pydantic事件模型
+2. trusted: 可信快速路径，按事件类分组后每组一次列表校验
+
+使用合成的、与CDN playbyplay结构一致的动作数据，不访问网络。
+同时比较两种方式解析结果的 model_dump，确认字段一致。
+
+用法:
+    python -m benchmarks.playbyplay_parse_benchmark --games 20 --actions 500 --repeat 5
+"""
+import argparse
+import copy
+import logging
+import random
+import time
+
+from nba.parser.game_parser import GameDataParser
+
+PLAYERS = [(1628983, 'Shai Gilgeous-Alexander', 'S. Gilgeous-Alexander'),
+           (1629029, 'Luka Doncic', 'L. Doncic'),
+           (203999, 'Nikola Jokic', 'N. Jokic'),
+           (1630162, 'Anthony Edwards', 'A. Edwards')]
+TEAMS = [(1610612760, 'OKC'), (1610612743, 'DEN')]
+
+
+def make_action(number: int, rng: random.Random) -> dict:
+    """生成一个结构合法的合成动作"""
+    person_id, name, name_i = rng.choice(PLAYERS)
+    team_id, tricode = rng.choice(TEAMS)
+    action_type = rng.choice(['2pt', '2pt', '3pt', 'rebound', 'foul', 'turnover', 'freethrow',
+                              'substitution', 'steal', 'block', 'timeout'])
+    action = {
+        'actionNumber': number,
+        'clock': f"PT{rng.randint(0, 11):02d}M{rng.randint(0, 59):02d}.00S",
+        'timeActual': '2025-01-01T01:00:00.0Z',
+        'period': 1 + number % 4,
+        'teamId': team_id,
+        'teamTricode': tricode,
+        'actionType': action_type,
+        'subType': '',
+        'description': f"synthetic {action_type}",
+        'personId': person_id,
+        'playerName': name,
+        'playerNameI': name_i,
+        'x': rng.uniform(0, 100),
+        'y': rng.uniform(0, 100),
+        'xLegacy': rng.randint(-250, 250),
+        'yLegacy': rng.randint(-50, 400),
+        'scoreHome': str(number),
+        'scoreAway': str(number),
+        'qualifiers': [],
+        'possession': team_id,
+        'orderNumber': number * 10000,
+    }
+    if action_type in ('2pt', '3pt'):
+        action.update({'subType': 'Jump Shot', 'area': 'Mid-Range', 'areaDetail': 'Center',
+                       'side': 'center', 'shotDistance': rng.uniform(0, 30),
+                       'shotResult': rng.choice(['Made', 'Missed']), 'isFieldGoal': 1})
+        if action['shotResult'] == 'Made' and rng.random() < 0.6:
+            assist_id, _, assist_i = rng.choice(PLAYERS)
+            action.update({'assistPersonId': assist_id, 'assistPlayerNameInitial': assist_i})
+    elif action_type == 'freethrow':
+        action.update({'subType': '1 of 2', 'shotResult': rng.choice(['Made', 'Missed']), 'isFieldGoal': 0})
+    elif action_type == 'rebound':
+        action.update({'subType': rng.choice(['offensive', 'defensive']), 'reboundTotal': 1,
+                       'reboundDefensiveTotal': 1, 'reboundOffensiveTotal': 0})
+    elif action_type == 'foul':
+        action.update({'subType': 'personal', 'foulDrawnPersonId': rng.choice(PLAYERS)[0]})
+    elif action_type == 'turnover':
+        action.update({'subType': 'bad pass', 'turnoverTotal': 1})
+    elif action_type == 'substitution':
+        action['subType'] = rng.choice(['in', 'out'])
+    elif action_type == 'timeout':
+        action['subType'] = 'full'
+    return action
+
+
+def make_games(games: int, actions: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [{'game': {'gameId': f"00224{index:05d}", 'actions': [make_action(n, rng) for n in range(1, actions + 1)]}}
+            for index in range(games)]
+
+
+def run(parser: GameDataParser, games: list, repeat: int) -> tuple:
+    """重复解析全部比赛，返回最后一次的解析结果和最短耗时"""
+    # 先解析一场预热(创建校验器)
+    parser._parse_playbyplay(copy.deepcopy(games[0]))
+    timings = []
+    for _ in range(repeat):
+        # 完整校验路径会修改输入字典，每次运行使用独立副本
+        batch = copy.deepcopy(games)
+        started = time.perf_counter()
+        parsed = [parser._parse_playbyplay(game) for game in batch]
+        timings.append(time.perf_counter() - started)
+    return parsed, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PlayByPlay解析吞吐基准测试")
+    parser.add_argument("--games", type=int, default=20, help="比赛场数")
+    parser.add_argument("--actions", type=int, default=500, help="每场动作数")
+    parser.add_argument("--repeat", type=int, default=5, help="每种方式重复次数(取最短耗时)")
+    args = parser.parse_args()
+
+    # 每场一条的INFO日志会干扰计时
+    logging.disable(logging.INFO)
+
+    games = make_games(args.games, args.actions)
+    total = args.games * args.actions
+
+    validated, validated_elapsed = run(GameDataParser(trusted_playbyplay=False), games, args.repeat)
+    trusted, trusted_elapsed = run(GameDataParser(trusted_playbyplay=True), games, args.repeat)
+
+    print(f"games={args.games} actions/game={args.actions} repeat={args.repeat}")
+    print(f" validated: {validated_elapsed:.2f}s | {total / validated_elapsed:,.0f} events/s")
+    print(f"   trusted: {trusted_elapsed:.2f}s | {total / trusted_elapsed:,.0f} events/s")
+    print(f"speedup: {validated_elapsed / trusted_elapsed:.1f}x")
+
+    mismatched = sum(
+        1 for slow, fast in zip(validated, trusted)
+        for slow_event, fast_event in zip(slow.actions, fast.actions)
+        if slow_event.model_dump() != fast_event.model_dump() or type(slow_event) is not type(fast_event)
+    )
+    counts_match = all(len(slow.actions) == len(fast.actions) for slow, fast in zip(validated, trusted))
+    print(f"event counts match: {counts_match} | mismatched events: {mismatched}")
+
+
+if __name__ == "__main__":
+    main()
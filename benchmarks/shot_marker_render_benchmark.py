@@ -0,0 +1,100 @@
+# benchmarks/shot_marker_render_benchmark.py
+"""投篮标记渲染基准测试
+
+对比两种投篮标记渲染方式生成同一张球队投篮图的耗时:
+1. matplotlib: 每个投篮一个 inset_axes + imshow + Circle
+2. raster: ShotMarkerLayer 在一个RGBA图层上合成所有头像
+
+球员头像用本地生成的图片预先写入 PlayerImageManager 的缓存(磁盘缓存指向临时目录)，不访问网络。
+同时输出两张PNG的平均像素差，用于确认两种方式的视觉效果一致。
+
+用法:
+    python -m benchmarks.shot_marker_render_benchmark --shots 90 --players 8 --dpi 200
+"""
+import argparse
+import random
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from nba.services.game_charts_service import ChartConfig, GameChartsService, HeadshotStore, PlayerImageManager
+
+BACKENDS = ("matplotlib", "raster")
+
+
+def seed_headshots(player_ids, store_dir: Path):
+    """生成纯色带编号的头像并写入原始图像缓存"""
+    image_manager = PlayerImageManager()
+    image_manager.store = HeadshotStore(store_dir)
+    for player_id in player_ids:
+        rng = random.Random(player_id)
+        img = Image.new('RGB', (260, 190), tuple(rng.randrange(40, 220) for _ in range(3)))
+        ImageDraw.Draw(img).text((110, 85), str(player_id), fill=(255, 255, 255))
+        buffer = BytesIO()
+        img.save(buffer, format='PNG')
+        url = image_manager.get_player_headshot_url(player_id, small=True)
+        image_manager.cache.set_raw(url, buffer.getvalue())
+
+
+def make_team_shots(shots: int, player_ids, seed: int = 7):
+    """生成分布在半场内的投篮数据 {player_id: [shot, ...]}"""
+    rng = random.Random(seed)
+    team_shots = {player_id: [] for player_id in player_ids}
+    for _ in range(shots):
+        team_shots[rng.choice(player_ids)].append({
+            'x_legacy': rng.uniform(-240, 240),
+            'y_legacy': rng.uniform(-40, 300),
+            'shot_result': 'Made' if rng.random() < 0.5 else 'Missed',
+        })
+    return team_shots
+
+
+def run(backend: str, team_shots, dpi: int, output_dir: Path, repeat: int) -> dict:
+    config = ChartConfig(dpi=dpi, figure_path=output_dir, marker_backend=backend)
+    service = GameChartsService(config)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        service.plot_shots(team_shots, title="基准测试", output_path=f"{backend}.png",
+                           shot_outcome="all", data_type="team")
+        timings.append(time.perf_counter() - started)
+    return {'backend': backend, 'best': min(timings), 'mean': sum(timings) / len(timings),
+            'path': output_dir / f"{backend}.png"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="投篮标记渲染基准测试")
+    parser.add_argument("--shots", type=int, default=90, help="投篮数")
+    parser.add_argument("--players", type=int, default=8, help="球员数")
+    parser.add_argument("--dpi", type=int, default=350, help="图表DPI")
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式重复次数")
+    args = parser.parse_args()
+
+    player_ids = list(range(1000, 1000 + args.players))
+    team_shots = make_team_shots(args.shots, player_ids)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_headshots(player_ids, Path(tmp) / "headshots")
+        results = [run(backend, team_shots, args.dpi, Path(tmp), args.repeat) for backend in BACKENDS]
+
+        print(f"shots={args.shots} players={args.players} dpi={args.dpi} repeat={args.repeat}")
+        for result in results:
+            print(f"{result['backend']:>10}: best {result['best']:.2f}s | mean {result['mean']:.2f}s")
+        print(f"speedup: {results[0]['best'] / results[1]['best']:.1f}x")
+
+        images = [np.asarray(Image.open(result['path']).convert('RGB'), dtype=np.int16) for result in results]
+        if images[0].shape == images[1].shape:
+            print(f"mean abs pixel diff: {np.abs(images[0] - images[1]).mean():.2f} (0-255)")
+        else:
+            print(f"image sizes differ: {images[0].shape} vs {images[1].shape}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/sqlite_write_contention_benchmark.py
+"""SQLite并发写入争用基准测试
+
+模拟BoxscoreSync/PlayByPlaySync的多线程写入: 多个线程各自打开会话，
+以小事务方式反复写入同一个数据库文件，对比不同引擎调优配置下的
+吞吐量、"database is locked"错误数和最长单次事务耗时。
+
+使用临时SQLite文件，不访问网络。
+
+用法:
+    python -m benchmarks.sqlite_write_contention_benchmark --threads 12 --transactions 200
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from config import NBAConfig
+from database.sqlite_tuning import apply_engine_profile
+
+# 未调优对照组: 不执行任何PRAGMA，仅依赖连接参数timeout，与调优前的 DBSession.initialize 一致
+UNTUNED_PROFILE = {}
+
+
+def make_engine(db_path: Path, profile: dict, timeout: float):
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={
+            'timeout': timeout,
+            'isolation_level': None,
+            'check_same_thread': False,
+        },
+        pool_size=32,
+        max_overflow=0,
+    )
+    apply_engine_profile(engine, profile)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS contention ("
+            " id INTEGER PRIMARY KEY, worker INTEGER, seq INTEGER, payload TEXT)"
+        ))
+    return engine
+
+
+def writer(engine, worker_id: int, transactions: int, rows: int, results: list, lock: threading.Lock):
+    """单个写线程: 每个事务插入rows行，同时读取一次计数模拟同步中的查询"""
+    locked = 0
+    written = 0
+    slowest = 0.0
+    payload = "x" * 200
+    for seq in range(transactions):
+        started = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                try:
+                    conn.exec_driver_sql(
+                        "INSERT INTO contention (worker, seq, payload) VALUES (?, ?, ?)",
+                        [(worker_id, seq, payload)] * rows
+                    )
+                    conn.exec_driver_sql("SELECT COUNT(*) FROM contention WHERE worker = ?", (worker_id,)).scalar()
+                    conn.exec_driver_sql("COMMIT")
+                except Exception:
+                    conn.exec_driver_sql("ROLLBACK")
+                    raise
+            written += rows
+        except OperationalError as e:
+            if 'locked' in str(e):
+                locked += 1
+            else:
+                raise
+        slowest = max(slowest, time.perf_counter() - started)
+    with lock:
+        results.append((written, locked, slowest))
+
+
+def run(profile_name: str, profile: dict, threads: int, transactions: int, rows: int, timeout: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(Path(tmp) / "bench.db", profile, timeout)
+        results, lock = [], threading.Lock()
+        workers = [
+            threading.Thread(target=writer, args=(engine, i, transactions, rows, results, lock))
+            for i in range(threads)
+        ]
+        started = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - started
+        engine.dispose()
+
+    written = sum(r[0] for r in results)
+    return {
+        'profile': profile_name,
+        'rows': written,
+        'locked_errors': sum(r[1] for r in results),
+        'slowest_txn_ms': max(r[2] for r in results) * 1000,
+        'seconds': elapsed,
+        'rows_per_second': written / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite并发写入争用基准测试")
+    parser.add_argument("--threads", type=int, default=12, help="写线程数")
+    parser.add_argument("--transactions", type=int, default=200, help="每个线程的事务数")
+    parser.add_argument("--rows", type=int, default=20, help="每个事务写入的行数")
+    parser.add_argument("--timeout", type=float, default=5.0, help="未调优配置的连接超时(秒)")
+    args = parser.parse_args()
+
+    profiles = [('untuned', UNTUNED_PROFILE)]
+    profiles += list(NBAConfig.DATABASE.ENGINE_PROFILES.items())
+
+    print(f"threads={args.threads} transactions={args.transactions} rows/txn={args.rows}")
+    for name, profile in profiles:
+        result = run(name, profile, args.threads, args.transactions, args.rows, args.timeout)
+        print(f"{result['profile']:>8}: {result['rows']:>7} rows in {result['seconds']:.2f}s "
+              f"({result['rows_per_second']:,.0f} rows/s) | locked={result['locked_errors']} "
+              f"| slowest txn={result['slowest_txn_ms']:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
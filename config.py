@@ -70,6 +70,7 @@ class NBAConfig:
         SCHEDULE_CACHE_DIR = CACHE_DIR / "schedule"
         VIDEOURL_CACHE_DIR = CACHE_DIR / "videourls"
         LEAGUE_CACHE_DIR = CACHE_DIR / "league"
+        HEADSHOT_CACHE_DIR = CACHE_DIR / "headshots"
 
         # 媒体存储目录
         PICTURES_DIR = STORAGE_DIR / "pictures"
@@ -98,6 +99,69 @@ class NBAConfig:
             for path in dir_paths:
                 path.mkdir(parents=True, exist_ok=True)
 
+    class CACHE:
+        """请求缓存配置"""
+        BACKEND = "sqlite"  # 缓存存储后端: sqlite(单文件压缩存储) 或 json(旧版每键一个文件)
+        DB_FILENAME = "cache.sqlite3"  # sqlite后端在每个缓存目录下的数据库文件名
+        COMPRESSION_LEVEL = 6  # payload的zlib压缩级别(1-9)
+        CONDITIONAL_REQUESTS = True  # 使用缓存中的ETag/Last-Modified发送条件请求，304时复用缓存
+
+        # 进程内内存缓存层
+        MEMORY_MAX_BYTES = 128 * 1024 * 1024  # 每个缓存管理器的内存上限(字节)，0表示禁用
+        MEMORY_TTL_SECONDS = 600  # 条目在内存中的默认保留时间(秒)
+        # 按缓存前缀(fetcher类名小写)覆盖内存保留时间
+        MEMORY_PREFIX_TTL_SECONDS = {
+            'gamefetcher': 1800,
+            'schedulefetcher': 3600,
+            'leaguefetcher': 300,
+        }
+
+        # 球员头像磁盘缓存(原始PNG + 按尺寸处理后的版本)
+        HEADSHOT_MAX_BYTES = 256 * 1024 * 1024  # 磁盘占用上限(字节)，超出时按最近最少使用淘汰
+        HEADSHOT_TTL_SECONDS = 30 * 24 * 60 * 60  # 头像文件有效期(秒)，过期后重新下载
+        HEADSHOT_PREFETCH_WORKERS = 8  # 预取头像的并发下载数
+        HEADSHOT_FAILURE_RETRY_SECONDS = 600  # 下载失败的头像在此时间内不再重试(秒)
+
+        # 解析后的Game对象缓存(GameDataProvider)
+        PARSED_GAME_MAX_ENTRIES = 32  # 最多缓存的比赛数
+        PARSED_GAME_MAX_EVENTS = 20000  # 所有缓存比赛的回放事件总数上限(近似内存上限)，超出时按LRU淘汰
+        # 按比赛状态(GameStatusEnum值)决定缓存时间(秒)：未开始 / 进行中 / 已结束
+        PARSED_GAME_STATUS_TTL_SECONDS = {
+            1: 300,
+            2: 15,
+            3: 6 * 60 * 60,
+        }
+        PARSED_GAME_NEGATIVE_TTL_SECONDS = 60  # 获取或解析失败的结果缓存时间(秒)，避免短时间内重复请求
+
+    class PARSER:
+        """数据解析配置"""
+        # 可信快速路径：CDN回放数据结构稳定时按事件类批量校验，批量失败时整场回退到逐事件校验
+        TRUSTED_PLAYBYPLAY = False
+
+    class NETWORK:
+        """网络请求配置"""
+        # 异步抓取引擎：按主机分别限制并发，CDN可承受的并发远高于stats API
+        ASYNC_HOST_LIMITS = {
+            'cdn.nba.com': 32,
+            'stats.nba.com': 1,
+        }
+        ASYNC_DEFAULT_HOST_LIMIT = 4  # 未配置主机的并发上限
+        ASYNC_POOL_SIZE = 64  # 连接池大小(也是同时进行的阻塞IO数上限)
+        ASYNC_TIMEOUT = 20  # 单个请求超时(秒)
+        ASYNC_MAX_RETRIES = 3  # 429/5xx/网络异常的最大重试次数
+
+        # 请求限速：token_bucket 为所有HTTPRequestManager共享的按主机令牌桶，adaptive 为旧版每实例自适应等待
+        RATE_LIMIT_MODE = "token_bucket"
+        # 主机: (每秒令牌数, 桶容量)，子域名按后缀匹配
+        HOST_RATE_LIMITS = {
+            'stats.nba.com': (0.4, 3),  # 约720请求/30分钟，低于观察到的800请求限制
+            'cdn.nba.com': (50.0, 100),
+            'videos.nba.com': (4.0, 8),
+            'weibo.com': (1.0, 3),  # 包含 picupload/fileplatform 等子域名
+            'weibo.cn': (1.0, 3),
+        }
+        DEFAULT_HOST_RATE_LIMIT = (2.0, 4)  # 未配置主机的 (每秒令牌数, 桶容量)
+
     class DATABASE:
         """数据库配置"""
         # 相对路径 - 在运行时会与项目根目录组合
@@ -116,6 +180,37 @@ class NBAConfig:
         FOREIGN_KEYS = True  # 启用外键约束
         CACHE_SIZE = -1024 * 64  # 缓存大小（KB，负值表示内存中的KB）
 
+        # SQLite引擎调优配置，通过连接事件在每个新连接上执行PRAGMA
+        DEFAULT_ENGINE_PROFILE = "wal"
+        ENGINE_PROFILES = {
+            # 多线程同步写入场景：WAL允许读写并发，NORMAL同步在WAL下保证一致性
+            "wal": {
+                "busy_timeout": 60000,  # 锁等待时间(毫秒)
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "mmap_size": 256 * 1024 * 1024,  # 内存映射大小(字节)
+                "cache_size": -1024 * 64,  # 页缓存大小(负值表示KB)
+                "temp_store": "MEMORY",
+                "wal_autocheckpoint": 1000,  # 每1000页自动checkpoint
+            },
+            # 保守配置：回滚日志 + 完全同步，与未调优前行为一致
+            "safe": {
+                "busy_timeout": 30000,
+                "journal_mode": "DELETE",
+                "synchronous": "FULL",
+            },
+        }
+
+        # 批量写入配置
+        BULK_WRITE = True  # 同步时使用批量upsert写入统计数据
+        BULK_CHUNK_SIZE = 500  # 每条批量写入语句处理的行数
+
+        # 并行同步写入队列配置(需同时启用BULK_WRITE)
+        WRITE_QUEUE = True  # 由单个写线程统一提交数据库写入
+        WRITE_QUEUE_MAX_PENDING = 64  # 队列中最多等待的任务数，超出时网络线程阻塞
+        WRITE_QUEUE_GROUP_SIZE = 32  # 每个事务最多合并的任务数
+        WRITE_QUEUE_GROUP_WAIT = 0.05  # 凑批时等待后续任务的最长时间(秒)
+
         # 同步配置
         AUTO_SYNC_ON_START = True  # 启动时自动同步
         SYNC_INTERVAL_HOURS = 24  # 数据自动同步间隔（小时）
@@ -125,11 +220,13 @@ class NBAConfig:
             """开发环境配置"""
             ECHO_SQL = True  # 输出SQL语句到日志
             FORCE_SYNC = False  # 强制同步数据
+            ENGINE_PROFILE = "wal"  # SQLite引擎调优配置
 
         class TESTING:
             """测试环境配置"""
             IN_MEMORY = False  # 是否使用内存数据库
             ECHO_SQL = True  # 输出SQL语句到日志
+            ENGINE_PROFILE = "wal"  # SQLite引擎调优配置
 
         class PRODUCTION:
             """生产环境配置"""
@@ -137,6 +234,7 @@ class NBAConfig:
             BACKUP_ENABLED = True  # 启用自动备份
             BACKUP_INTERVAL_DAYS = 7  # 备份间隔（天）
             MAX_BACKUP_COUNT = 5  # 最大备份文件数
+            ENGINE_PROFILE = "wal"  # SQLite引擎调优配置
 
         @classmethod
         def get_db_path(cls, env="default"):
@@ -157,6 +255,26 @@ class NBAConfig:
             # 默认使用常规数据库路径
             return root / cls.DEFAULT_DB_RELATIVE_PATH
 
+        @classmethod
+        def get_engine_profile(cls, env="default"):
+            """
+            根据环境获取SQLite引擎调优参数
+
+            Args:
+                env: 环境名称，可以是 "default", "test", "development", "testing", "production"
+
+            Returns:
+                Dict: PRAGMA名称到值的映射
+            """
+            env_config = {
+                "development": cls.DEVELOPMENT,
+                "test": cls.TESTING,
+                "testing": cls.TESTING,
+                "production": cls.PRODUCTION,
+            }.get(env)
+            profile_name = getattr(env_config, "ENGINE_PROFILE", cls.DEFAULT_ENGINE_PROFILE)
+            return dict(cls.ENGINE_PROFILES[profile_name])
+
         @classmethod
         def get_game_db_path(cls, env="default"):
             """
@@ -7,6 +7,7 @@ import os
 from typing import Dict, Optional
 import logging
 from config import NBAConfig
+from database.sqlite_tuning import apply_engine_profile
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +26,7 @@ class ConnectionPool:
 
     def setup_engine(self, name: str, db_path: str, echo: bool = False,
                      pool_size: int = 15, max_overflow: int = 20,
-                     pool_timeout: int = 60) -> Engine:
+                     pool_timeout: int = 60, engine_profile: Optional[Dict] = None) -> Engine:
         """
         创建并配置SQLAlchemy引擎
 
@@ -36,6 +37,7 @@ class ConnectionPool:
             pool_size: 连接池大小
             max_overflow: 最大溢出连接数
             pool_timeout: 连接超时时间(秒)
+            engine_profile: SQLite调优PRAGMA，默认使用 NBAConfig.DATABASE 中当前环境的配置
 
         Returns:
             Engine: SQLAlchemy引擎实例
@@ -65,6 +67,11 @@ class ConnectionPool:
             }
         )
 
+        # 在每个新连接上应用调优PRAGMA
+        if engine_profile is None:
+            engine_profile = NBAConfig.DATABASE.get_engine_profile(NBAConfig.APP.ENV)
+        apply_engine_profile(engine, engine_profile)
+
         # 存储引擎和路径
         self.engines[name] = engine
         self.db_paths[name] = db_path
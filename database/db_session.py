@@ -5,6 +5,7 @@ from contextlib import contextmanager
 import threading
 from utils.logger_handler import AppLogger
 from config import NBAConfig
+from database.sqlite_tuning import apply_engine_profile
 
 
 class DBSession:
@@ -73,6 +74,9 @@ class DBSession:
             else:
                 echo = False
 
+            # SQLite引擎调优参数(WAL、同步级别、mmap、页缓存等)
+            engine_profile = NBAConfig.DATABASE.get_engine_profile(env)
+
             # 为每个数据库创建引擎和会话工厂
             for db_name, conn_str in db_config.items():
                 # 创建引擎
@@ -81,6 +85,7 @@ class DBSession:
                     echo=echo,
                     connect_args=connect_args
                 )
+                apply_engine_profile(engine, engine_profile)
                 self.engines[db_name] = engine
 
                 # 创建会话工厂
@@ -102,7 +107,7 @@ class DBSession:
                         StatsModels.metadata.create_all(engine)
 
             self._initialized = True
-            self.logger.info(f"数据库会话初始化成功，环境: {env}")
+            self.logger.info(f"数据库会话初始化成功，环境: {env}，引擎调优参数: {engine_profile}")
             return True
 
         except Exception as e:
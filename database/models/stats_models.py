@@ -159,6 +159,12 @@ class Event(Base):
     # 元数据
     last_updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+    # 索引: 按球员/球队读取投篮位置(赛季投篮图)
+    __table_args__ = (
+        Index('idx_events_player_shots', 'person_id', 'is_field_goal', 'game_id'),
+        Index('idx_events_team_shots', 'team_id', 'is_field_goal', 'game_id'),
+    )
+
     def __repr__(self):
         return f"<Event {self.game_id} #{self.action_number} {self.action_type}>"
 
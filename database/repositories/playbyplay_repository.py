@@ -1,6 +1,6 @@
 # database/repositories/playbyplay_repository.py
-from typing import Dict, List, Optional, Union
-from sqlalchemy import and_
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from sqlalchemy import and_, or_
 from database.models.stats_models import Event
 from database.db_session import DBSession
 from utils.logger_handler import AppLogger
@@ -12,10 +12,23 @@ class PlayByPlayRepository:
     支持内部会话和外部传入会话两种模式
     """
 
+    # 比赛ID第3位表示比赛类型
+    SEASON_TYPE_CODES = {
+        'Pre Season': '1',
+        'Regular Season': '2',
+        'All Star': '3',
+        'Playoffs': '4',
+        'PlayIn': '5',
+    }
+
+    # 按比赛ID过滤时每条IN查询包含的ID数，低于SQLite的绑定参数上限
+    GAME_ID_CHUNK_SIZE = 500
+
     def __init__(self):
         """初始化比赛回合数据访问对象"""
         self.db_session = DBSession.get_instance()
         self.logger = AppLogger.get_logger(__name__, app_name='sqlite')
+        self._shot_indexes_checked = False
 
     @staticmethod
     def _to_dict(model_instance):
@@ -165,4 +178,100 @@ class PlayByPlayRepository:
 
         except Exception as e:
             self.logger.error(f"获取比赛得分回合失败: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def iter_shot_locations(self,
+                            player_id: Optional[int] = None,
+                            team_id: Optional[int] = None,
+                            season: Optional[str] = None,
+                            season_type: Optional[str] = None,
+                            game_ids: Optional[Iterable[str]] = None,
+                            batch_size: int = 5000) -> Iterator[Tuple[str, int, int, int, int, str]]:
+        """
+        流式读取投篮位置，用于赛季/时间段投篮图
+
+        只查询需要的列并分批读取，赛季和比赛类型转换为比赛ID范围条件，
+        指定比赛时按 GAME_ID_CHUNK_SIZE 分块生成 game_id IN 条件，
+        配合 (person_id|team_id, is_field_goal, game_id) 索引在SQL中完成过滤。
+
+        Args:
+            player_id: 球员ID
+            team_id: 球队ID
+            season: 赛季标识，如"2024-25"
+            season_type: 比赛类型，如"Regular Season"、"Playoffs"，None表示全部
+            game_ids: 只保留这些比赛(如按日期范围筛选出的比赛)
+            batch_size: 每批读取的行数
+
+        Yields:
+            Tuple: (game_id, period, person_id, x_legacy, y_legacy, shot_result)
+        """
+        self._ensure_shot_indexes()
+        game_id_list = sorted(set(game_ids)) if game_ids is not None else None
+        if game_id_list is not None and not game_id_list:
+            return
+
+        with self.db_session.session_scope('game') as session:
+            query = session.query(
+                Event.game_id, Event.period, Event.person_id,
+                Event.x_legacy, Event.y_legacy, Event.shot_result
+            ).filter(
+                Event.is_field_goal == 1,
+                Event.x_legacy.isnot(None),
+                Event.y_legacy.isnot(None)
+            )
+            if player_id is not None:
+                query = query.filter(Event.person_id == player_id)
+            if team_id is not None:
+                query = query.filter(Event.team_id == team_id)
+
+            ranges = self._game_id_ranges(season, season_type)
+            if ranges:
+                query = query.filter(or_(*(and_(Event.game_id >= low, Event.game_id < high)
+                                           for low, high in ranges)))
+
+            if game_id_list is None:
+                queries = [query]
+            else:
+                chunk_size = self.GAME_ID_CHUNK_SIZE
+                queries = [query.filter(Event.game_id.in_(game_id_list[start:start + chunk_size]))
+                           for start in range(0, len(game_id_list), chunk_size)]
+
+            for chunk_query in queries:
+                for row in chunk_query.yield_per(batch_size):
+                    yield tuple(row)
+
+    def _game_id_ranges(self, season: Optional[str], season_type: Optional[str]) -> List[Tuple[str, str]]:
+        """
+        把赛季和比赛类型转换为比赛ID的前缀范围
+
+        比赛ID格式为 00 + 类型(1位) + 赛季起始年后两位 + 序号，
+        如 "0022400001" 为2024-25赛季常规赛。
+        """
+        if season_type is not None and season_type not in self.SEASON_TYPE_CODES:
+            raise ValueError(f"未知的比赛类型: {season_type}")
+        type_codes = [self.SEASON_TYPE_CODES[season_type]] if season_type else None
+
+        if season is None:
+            if type_codes is None:
+                return []
+            return [(f"00{code}", f"00{int(code) + 1}") for code in type_codes]
+
+        year = season.split('-')[0][-2:]
+        next_year = f"{(int(year) + 1) % 100:02d}"
+        codes = type_codes or sorted(set(self.SEASON_TYPE_CODES.values()))
+        # 99赛季的上界跨越类型位，使用类型位的下一个值
+        return [(f"00{code}{year}", f"00{code}{next_year}" if year != "99" else f"00{int(code) + 1}")
+                for code in codes]
+
+    def _ensure_shot_indexes(self) -> None:
+        """为已存在的events表补建投篮查询索引(create_all不会给已有表加索引)"""
+        if self._shot_indexes_checked:
+            return
+        try:
+            engine = self.db_session.engines['game']
+            for index in Event.__table__.indexes:
+                if index.name in ('idx_events_player_shots', 'idx_events_team_shots'):
+                    index.create(bind=engine, checkfirst=True)
+        except Exception as e:
+            self.logger.warning(f"创建投篮查询索引失败: {e}")
+        self._shot_indexes_checked = True
@@ -227,6 +227,36 @@ class ScheduleRepository:
             self.logger.error(f"获取赛季({season})赛程数据失败: {e}")
             return []
 
+    def get_game_ids_by_date_range(self, start_date: Union[str, date, datetime, None] = None,
+                                   end_date: Union[str, date, datetime, None] = None) -> List[str]:
+        """
+        获取日期范围内(含首尾)的比赛ID
+
+        Args:
+            start_date: 开始日期，日期对象或YYYY-MM-DD格式字符串，None表示不限
+            end_date: 结束日期，日期对象或YYYY-MM-DD格式字符串，None表示不限
+
+        Returns:
+            List[str]: 按比赛ID升序排列的比赛ID列表
+        """
+        try:
+            with self.db_session.session_scope('nba') as session:
+                query = session.query(Game.game_id)
+                if start_date:
+                    if isinstance(start_date, (date, datetime)):
+                        start_date = start_date.strftime('%Y-%m-%d')
+                    query = query.filter(Game.game_date >= start_date)
+                if end_date:
+                    if isinstance(end_date, (date, datetime)):
+                        end_date = end_date.strftime('%Y-%m-%d')
+                    query = query.filter(Game.game_date <= end_date)
+
+                return [row.game_id for row in query.order_by(Game.game_id).all()]
+
+        except Exception as e:
+            self.logger.error(f"获取日期范围({start_date} ~ {end_date})比赛ID失败: {e}")
+            return []
+
     def get_schedules_count_by_season(self, season: str) -> int:
         """
         获取指定赛季的赛程数量
@@ -0,0 +1,31 @@
+# database/sqlite_tuning.py
+from typing import Dict, Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# busy_timeout需要最先设置，后续切换journal_mode时可能需要等待锁
+_PRAGMA_ORDER = ("busy_timeout", "journal_mode", "synchronous")
+
+
+def apply_engine_profile(engine: Engine, profile: Dict[str, Any]) -> None:
+    """为SQLite引擎注册连接事件，在每个新建的DBAPI连接上执行调优PRAGMA
+
+    Args:
+        engine: SQLAlchemy引擎
+        profile: PRAGMA名称到值的映射，见 NBAConfig.DATABASE.ENGINE_PROFILES
+    """
+    if not profile:
+        return
+
+    pragmas = sorted(profile.items(),
+                     key=lambda item: _PRAGMA_ORDER.index(item[0]) if item[0] in _PRAGMA_ORDER else len(_PRAGMA_ORDER))
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
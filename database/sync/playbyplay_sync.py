@@ -6,25 +6,77 @@ import json
 import concurrent.futures
 import threading
 import time
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice
 from requests.exceptions import ReadTimeout, ProxyError
+from config import NBAConfig
 from nba.fetcher.game_fetcher import GameFetcher
 from utils.logger_handler import AppLogger
 from database.models.stats_models import Event, GameStatsSyncHistory
 from database.db_session import DBSession
+from database.sync.write_queue import SyncWriteQueue, begin_immediate
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from sqlalchemy import and_, exists
+from sqlalchemy import and_, exists, delete
+
+# events表列与API字段的对应关系: (列名, API字段名, 默认值)
+EVENT_FIELD_MAP = (
+    ("action_number", "actionNumber", 0),
+    ("clock", "clock", ''),
+    ("period", "period", 0),
+    ("team_id", "teamId", 0),
+    ("team_tricode", "teamTricode", ''),
+    ("person_id", "personId", 0),
+    ("player_name", "playerName", ''),
+    ("player_name_i", "playerNameI", ''),
+    ("x_legacy", "xLegacy", 0),
+    ("y_legacy", "yLegacy", 0),
+    ("shot_distance", "shotDistance", 0),
+    ("shot_result", "shotResult", ''),
+    ("is_field_goal", "isFieldGoal", 0),
+    ("score_home", "scoreHome", ''),
+    ("score_away", "scoreAway", ''),
+    ("points_total", "pointsTotal", 0),
+    ("location", "location", ''),
+    ("description", "description", ''),
+    ("action_type", "actionType", ''),
+    ("sub_type", "subType", ''),
+    ("video_available", "videoAvailable", 0),
+    ("shot_value", "shotValue", 0),
+    ("action_id", "actionId", 0),
+)
+
+EVENT_INSERT_COLUMNS = ("game_id",) + tuple(column for column, _, _ in EVENT_FIELD_MAP) + ("last_updated_at",)
+EVENT_INSERT_SQL = (
+    f"INSERT OR REPLACE INTO {Event.__tablename__} ({', '.join(EVENT_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in EVENT_INSERT_COLUMNS)})"
+)
+
 
 class PlayByPlaySync:
     """
     优化的比赛回合数据同步器
+
+    批量写入模式(bulk_write)下，每场比赛的events在一个事务内整体替换：
+    先按game_id删除，再用executemany插入直接由API动作列表生成的元组
+
+    写入队列模式(write_queue)下，线程池中的网络线程不再访问数据库，
+    events替换和同步历史作为一个任务交给 SyncWriteQueue 的写线程合并提交
     """
 
-    def __init__(self, playbyplay_repository=None, game_fetcher=None, max_global_concurrency=5):
+    def __init__(self, playbyplay_repository=None, game_fetcher=None, max_global_concurrency=5,
+                 bulk_write: Optional[bool] = None, write_queue: Optional[bool] = None):
         """初始化比赛回合数据同步器 - 默认降低并发度"""
         self.db_session = DBSession.get_instance()
         self.playbyplay_repository = playbyplay_repository
         self.game_fetcher = game_fetcher or GameFetcher()
         self.logger = AppLogger.get_logger(__name__, app_name='sqlite')
+        # 批量写入模式
+        self.bulk_write = NBAConfig.DATABASE.BULK_WRITE if bulk_write is None else bulk_write
+        self.bulk_chunk_size = NBAConfig.DATABASE.BULK_CHUNK_SIZE
+        # 写入队列模式，依赖批量写入
+        self.write_queue = self.bulk_write and (
+            NBAConfig.DATABASE.WRITE_QUEUE if write_queue is None else write_queue)
 
         # 获取game_fetcher中的http_manager引用或创建新的
         self.http_manager = self.game_fetcher.http_manager
@@ -374,8 +426,12 @@ class PlayByPlaySync:
 
     def _process_batch_with_threading(self, game_ids: List[str], force_update: bool, max_workers: int) -> List[
         Dict[str, Any]]:
-        """使用多线程处理一批比赛数据 - 增强版"""
+        """使用多线程处理一批比赛数据 - 增强版
+
+        写入队列模式下，线程只负责获取数据并提交写入任务，写入结果在写队列关闭后统一汇总。
+        """
         results = []
+        writer: Optional[SyncWriteQueue] = None
 
         # 线程安全的计数器
         counters = {"success": 0, "failed": 0, "no_data": 0}
@@ -414,7 +470,12 @@ class PlayByPlaySync:
                             not playbyplay_data['game']['actions']):
                         summary = {"message": "没有可用的Play-by-Play数据，可能是早期比赛"}
 
-                        self._record_sync_history(game_id, "success", start_time, datetime.now(), 0, summary)
+                        if writer:
+                            writer.submit(partial(self._add_sync_history, game_id=game_id, status="success",
+                                                  start_time=start_time, end_time=datetime.now(),
+                                                  items_processed=0, details=summary), game_id)
+                        else:
+                            self._record_sync_history(game_id, "success", start_time, datetime.now(), 0, summary)
 
                         with counter_lock:
                             counters["no_data"] += 1
@@ -432,6 +493,18 @@ class PlayByPlaySync:
                             "no_data": True
                         }
 
+                    if writer:
+                        # 写入和同步历史交给写线程，在同一事务中提交
+                        future = writer.submit(partial(self._write_game_events, game_id=game_id,
+                                                       actions=playbyplay_data['game']['actions'],
+                                                       start_time=start_time), game_id)
+                        return {
+                            "game_id": game_id,
+                            "status": "pending",
+                            "write": future,
+                            "start_time": start_time
+                        }
+
                     # 解析和保存数据
                     success_count, summary = self._save_playbyplay_data(game_id, playbyplay_data)
 
@@ -469,7 +542,13 @@ class PlayByPlaySync:
                     self.logger.error(error_msg)
 
                     # 记录失败的同步历史
-                    self._record_sync_history(game_id, "failed", datetime.now(), datetime.now(), 0, {"error": str(e)})
+                    if writer:
+                        writer.submit(partial(self._add_sync_history, game_id=game_id, status="failed",
+                                              start_time=datetime.now(), end_time=datetime.now(),
+                                              items_processed=0, details={"error": str(e)}), game_id)
+                    else:
+                        self._record_sync_history(game_id, "failed", datetime.now(), datetime.now(), 0,
+                                                  {"error": str(e)})
 
                     # 更新计数器
                     with counter_lock:
@@ -486,27 +565,69 @@ class PlayByPlaySync:
                     with self.thread_lock:
                         self.active_threads -= 1
 
-        # 使用线程池并行处理
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_game = {executor.submit(process_game, game_id): game_id for game_id in game_ids}
+        # 使用线程池并行处理，写入队列在线程池结束后关闭，保证所有写入已提交
+        with (SyncWriteQueue(self.db_session) if self.write_queue else nullcontext()) as writer:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # 提交所有任务
+                future_to_game = {executor.submit(process_game, game_id): game_id for game_id in game_ids}
 
-            # 获取结果
-            for future in concurrent.futures.as_completed(future_to_game):
-                game_id = future_to_game[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    self.logger.error(f"获取比赛(ID:{game_id})处理结果失败: {e}")
-                    results.append({
-                        "game_id": game_id,
-                        "status": "failed",
-                        "error": f"获取处理结果失败: {e}"
-                    })
+                # 获取结果
+                for future in concurrent.futures.as_completed(future_to_game):
+                    game_id = future_to_game[future]
+                    try:
+                        result = future.result()
+                        results.append(result)
+                    except Exception as e:
+                        self.logger.error(f"获取比赛(ID:{game_id})处理结果失败: {e}")
+                        results.append({
+                            "game_id": game_id,
+                            "status": "failed",
+                            "error": f"获取处理结果失败: {e}"
+                        })
+
+        if writer:
+            results = self._resolve_queued_results(results)
 
         return results
 
+    def _resolve_queued_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """写入队列模式：根据写入任务的结果生成每场比赛的最终状态"""
+        finalized = []
+        for r in results:
+            if r["status"] != "pending":
+                finalized.append(r)
+                continue
+
+            game_id = r["game_id"]
+            start_time = r["start_time"]
+            try:
+                success_count, summary = r["write"].result()
+            except Exception as e:
+                # 写入事务已回滚，单独补记失败历史
+                end_time = datetime.now()
+                self._record_sync_history(game_id, "failed", start_time, end_time, 0, {"error": str(e)})
+                finalized.append({
+                    "game_id": game_id,
+                    "status": "failed",
+                    "error": str(e),
+                    "duration": (end_time - start_time).total_seconds()
+                })
+                continue
+
+            end_time = datetime.now()
+            status = "success" if success_count > 0 else "failed"
+            finalized.append({
+                "game_id": game_id,
+                "status": status,
+                "items_processed": 1,
+                "items_succeeded": success_count,
+                "summary": summary,
+                "start_time": start_time.isoformat(),
+                "end_time": end_time.isoformat(),
+                "duration": (end_time - start_time).total_seconds()
+            })
+        return finalized
+
     def _adjust_batch_parameters(self, results: List[Dict[str, Any]], batch_idx: int) -> Tuple[int, int]:
         """根据上一批次的结果动态调整参数 - 增强版"""
         # 计算成功率
@@ -624,22 +745,40 @@ class PlayByPlaySync:
         """记录同步历史到数据库"""
         try:
             with self.db_session.session_scope('game') as session:
-                sync_history = GameStatsSyncHistory(
-                    sync_type='playbyplay',
-                    game_id=game_id,
-                    status=status,
-                    items_processed=items_processed,
-                    items_succeeded=items_processed if status == "success" else 0,
-                    start_time=start_time,
-                    end_time=end_time,
-                    details=json.dumps(details),
-                    error_message=details.get("error", "") if status == "failed" else ""
-                )
-                session.add(sync_history)
+                self._add_sync_history(session, game_id, status, start_time, end_time, items_processed, details)
                 # 事务会在session_scope结束时自动提交
         except Exception as e:
             self.logger.error(f"记录同步历史失败: {e}")
 
+    @staticmethod
+    def _add_sync_history(session, game_id: str, status: str, start_time: datetime, end_time: datetime,
+                          items_processed: int, details: Dict) -> None:
+        """在给定会话中添加一条同步历史，由调用方提交"""
+        session.add(GameStatsSyncHistory(
+            sync_type='playbyplay',
+            game_id=game_id,
+            status=status,
+            items_processed=items_processed,
+            items_succeeded=items_processed if status == "success" else 0,
+            start_time=start_time,
+            end_time=end_time,
+            details=json.dumps(details),
+            error_message=details.get("error", "") if status == "failed" else ""
+        ))
+
+    def _write_game_events(self, session, game_id: str, actions: List[Dict],
+                           start_time: datetime) -> Tuple[int, Dict]:
+        """写入队列任务：在同一事务中替换一场比赛的events并记录同步历史
+
+        Returns:
+            Tuple[int, Dict]: 写入的动作数和摘要信息
+        """
+        success_count = self._replace_game_events(session, game_id, actions)
+        summary = {"play_actions_count": success_count}
+        status = "success" if success_count > 0 else "failed"
+        self._add_sync_history(session, game_id, status, start_time, datetime.now(), success_count, summary)
+        return success_count, summary
+
     def _save_playbyplay_data(self, game_id: str, playbyplay_data: Dict) -> Tuple[int, Dict]:
         """
         解析并保存playbyplay数据到数据库
@@ -650,6 +789,18 @@ class PlayByPlaySync:
                 "play_actions_count": 0
             }
 
+            if self.bulk_write:
+                actions = playbyplay_data.get('game', {}).get('actions', [])
+                if actions:
+                    with self.db_session.session_scope('game') as session:
+                        success_count = self._replace_game_events(session, game_id, actions)
+                    summary["play_actions_count"] = success_count
+                else:
+                    summary["message"] = "没有回合动作数据，但同步成功"
+
+                self.logger.info(f"成功保存比赛(ID:{game_id})的PlayByPlay数据，共{success_count}条记录")
+                return success_count, summary
+
             # 提取回合动作
             play_actions = self._extract_play_actions(playbyplay_data, game_id)
 
@@ -675,6 +826,42 @@ class PlayByPlaySync:
             self.logger.error(f"保存PlayByPlay数据失败: {e}")
             raise
 
+    @staticmethod
+    def _iter_event_rows(game_id: str, actions: List[Dict], updated_at: str):
+        """把API动作列表直接转换为插入元组，不构建中间字典"""
+        fields = tuple((key, default) for _, key, default in EVENT_FIELD_MAP)
+        for action in actions:
+            get = action.get
+            yield (game_id,) + tuple(get(key, default) for key, default in fields) + (updated_at,)
+
+    def _replace_game_events(self, session, game_id: str, actions: List[Dict]) -> int:
+        """在当前事务中整体替换一场比赛的events
+
+        Args:
+            session: 数据库会话 (事务由调用方提交)
+            game_id: 比赛ID
+            actions: API返回的actions列表
+
+        Returns:
+            int: 写入的动作数
+        """
+        # 自动提交模式下必须显式开启事务，否则DELETE立即提交，插入中途失败会丢失已有数据
+        begin_immediate(session)
+        session.execute(delete(Event).where(Event.game_id == game_id))
+
+        # 与SQLAlchemy在SQLite中存储DateTime的格式保持一致
+        updated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+        connection = session.connection()
+        rows = self._iter_event_rows(game_id, actions, updated_at)
+        written = 0
+        while True:
+            chunk = list(islice(rows, self.bulk_chunk_size))
+            if not chunk:
+                break
+            connection.exec_driver_sql(EVENT_INSERT_SQL, chunk)
+            written += len(chunk)
+        return written
+
     def _extract_play_actions(self, playbyplay_data: Dict, game_id: str) -> List[Dict]:
         """从playbyplay数据中提取具体回合动作"""
         try:
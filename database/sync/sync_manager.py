@@ -15,10 +15,10 @@ from database.sync.team_sync import TeamSync
 from database.sync.player_sync import PlayerSync
 from database.sync.boxscore_sync import BoxscoreSync
 from database.sync.playbyplay_sync import PlayByPlaySync
+from database.sync.sync_planner import SyncPlanner
 
 # 导入模型
-from database.models.base_models import Game
-from database.models.stats_models import GameStatsSyncHistory, Statistics, Event
+from database.models.stats_models import GameStatsSyncHistory, Statistics
 
 
 class SyncManager:
@@ -44,6 +44,9 @@ class SyncManager:
         self.boxscore_sync = BoxscoreSync(max_global_concurrency=max(3, max_global_concurrency // 2))
         self.playbyplay_sync = PlayByPlaySync(max_global_concurrency=max(3, max_global_concurrency // 2))
 
+        # 同步规划器，用聚合查询计算待同步比赛
+        self.sync_planner = SyncPlanner(self.db_session, playbyplay_filter=self.should_sync_playbyplay)
+
         self.logger.info(f"同步管理器初始化完成，全局最大并发数: {max_global_concurrency}")
 
         # 状态记录
@@ -481,103 +484,17 @@ class SyncManager:
             self.logger.info(f"当前赛季赛程更新完成，共处理 {schedule_count} 场比赛。")
 
         try:
-            # 1. 查询所有已完成的比赛ID
-            with self.db_session.session_scope('nba') as session:
-                finished_games = session.query(Game).filter(
-                    Game.game_status == 3  # 已完成的比赛
-                ).all()
-                all_game_ids = [game.game_id for game in finished_games]
-
-            # 按时间顺序排序（而不是根据reverse_order参数）
-            all_game_ids.sort()  # 按ID排序，较早的比赛ID较小
-            self.logger.info("使用顺序(从旧到新)处理比赛数据")
-
-            # 2. 查询同步状态和检测错误标记
-            with self.db_session.session_scope('game') as session:
-                # 获取boxscore已同步的比赛ID
-                boxscore_synced = session.query(GameStatsSyncHistory.game_id).filter(
-                    GameStatsSyncHistory.sync_type == 'boxscore',
-                    GameStatsSyncHistory.status == 'success'
-                ).all()
-                boxscore_synced_ids = {record.game_id for record in boxscore_synced}
-
-                # 获取playbyplay已同步的比赛ID
-                playbyplay_synced = session.query(GameStatsSyncHistory.game_id).filter(
-                    GameStatsSyncHistory.sync_type == 'playbyplay',
-                    GameStatsSyncHistory.status == 'success'
-                ).all()
-                playbyplay_synced_ids = {record.game_id for record in playbyplay_synced}
-
-                # 检测错误标记的playbyplay记录（标记为成功但没有实际数据）
-                mismarked_playbyplay_ids = set()
-
-                # 查询标记为成功同步的playbyplay记录
-                potential_mismarked = session.query(GameStatsSyncHistory).filter(
-                    GameStatsSyncHistory.sync_type == 'playbyplay',
-                    GameStatsSyncHistory.status == 'success'
-                ).all()
-
-                for record in potential_mismarked:
-                    game_id = record.game_id
-
-                    # 只检查应该有PlayByPlay数据的比赛
-                    if not self.should_sync_playbyplay(game_id):
-                        continue
-
-                    # 检查Event表中是否有实际数据
-                    event_count = session.query(Event).filter(
-                        Event.game_id == game_id
-                    ).count()
-
-                    # 检查同步历史记录的items_succeeded字段
-                    items_succeeded = record.items_succeeded or 0
-
-                    # 检查details字段中是否标记为no_data
-                    no_data_flag = False
-                    if record.details:
-                        try:
-                            details_dict = json.loads(record.details)
-                            if details_dict.get('no_data', False) or 'no_data' in details_dict.get('message',
-                                                                                                   '').lower():
-                                no_data_flag = True
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-
-                    # 如果没有事件数据且不是明确标记为无数据的记录，则认为是错误标记
-                    if event_count == 0 and items_succeeded == 0 and not no_data_flag:
-                        mismarked_playbyplay_ids.add(game_id)
-                        self.logger.warning(f"发现错误标记的PlayByPlay记录: {game_id}, 将重新同步")
-
-                self.logger.info(
-                    f"发现{len(mismarked_playbyplay_ids)}场比赛的PlayByPlay数据被错误标记为成功但实际无数据")
-
-            # 3. 区分需要同步PlayByPlay的比赛和不需要的比赛
-            playbyplay_games = []
-            no_playbyplay_games = []
-
-            for gid in all_game_ids:
-                if self.should_sync_playbyplay(gid):
-                    playbyplay_games.append(gid)
-                else:
-                    no_playbyplay_games.append(gid)
+            # 1-4. 按比赛ID顺序(从旧到新)规划待同步比赛，并检测错误标记的PlayByPlay记录
+            plan = self.sync_planner.plan(force_update=force_update)
+            all_game_ids = plan.all_game_ids
+            no_playbyplay_games = plan.no_playbyplay_games
+            mismarked_playbyplay_ids = plan.mismarked_playbyplay_ids
+            to_sync_boxscore = plan.to_sync_boxscore
+            to_sync_playbyplay = plan.to_sync_playbyplay
 
             self.logger.info(
-                f"总计{len(all_game_ids)}场比赛，需要PlayByPlay的比赛：{len(playbyplay_games)}场，"
+                f"总计{len(all_game_ids)}场比赛，需要PlayByPlay的比赛：{len(plan.playbyplay_games)}场，"
                 f"不需要PlayByPlay的比赛：{len(no_playbyplay_games)}场")
-
-            # 4. 过滤需要同步的比赛ID
-            # 对于boxscore，所有比赛都需要
-            to_sync_boxscore = [gid for gid in all_game_ids if
-                                gid not in boxscore_synced_ids or force_update]
-
-            # 对于playbyplay，只考虑应该有数据的比赛
-            to_sync_playbyplay = [
-                gid for gid in playbyplay_games if  # 这些已经是应该有PlayByPlay的比赛
-                (gid not in playbyplay_synced_ids or  # 未同步
-                 gid in mismarked_playbyplay_ids or  # 错误标记
-                 force_update)  # 强制更新
-            ]
-
             self.logger.info(f"需要同步的比赛：boxscore: {len(to_sync_boxscore)}场, "
                              f"playbyplay: {len(to_sync_playbyplay)}场 "
                              f"(其中错误标记: {len(mismarked_playbyplay_ids & set(to_sync_playbyplay))}场)")
@@ -703,47 +620,34 @@ class SyncManager:
             # 9. 验证同步效果
             if mismarked_playbyplay_ids:
                 self.logger.info("验证错误标记的记录是否已正确同步...")
-                with self.db_session.session_scope('game') as session:
-                    fixed_count = 0
-                    still_missing_count = 0
+                # 检查Event表中是否现在有数据
+                event_counts = self.sync_planner.count_events(mismarked_playbyplay_ids)
+                still_missing_ids = [gid for gid, count in event_counts.items() if count == 0]
+                fixed_count = len(event_counts) - len(still_missing_ids)
+                still_missing_count = len(still_missing_ids)
 
-                    for game_id in mismarked_playbyplay_ids:
-                        # 检查Event表中是否现在有数据
-                        event_count = session.query(Event).filter(
-                            Event.game_id == game_id
-                        ).count()
-
-                        if event_count > 0:
-                            fixed_count += 1
-                        else:
-                            still_missing_count += 1
-
-                    self.logger.info(
-                        f"错误标记记录处理结果: 成功修复 {fixed_count} 场, 仍缺数据 {still_missing_count} 场")
+                self.logger.info(
+                    f"错误标记记录处理结果: 成功修复 {fixed_count} 场, 仍缺数据 {still_missing_count} 场")
 
+                with self.db_session.session_scope('game') as session:
                     # 如果仍有缺数据的记录，可能是真的没数据，自动标记为no_data
                     if still_missing_count > 0:
                         self.logger.info(f"自动标记 {still_missing_count} 场真正没有数据的比赛")
-                        for game_id in mismarked_playbyplay_ids:
-                            event_count = session.query(Event).filter(
-                                Event.game_id == game_id
-                            ).count()
-
-                            if event_count == 0:
-                                # 创建一个新的成功记录，但标记为no_data
-                                now = datetime.now()
-                                new_history = GameStatsSyncHistory(
-                                    sync_type='playbyplay',
-                                    game_id=game_id,
-                                    status='success',
-                                    items_processed=0,
-                                    items_succeeded=0,
-                                    start_time=now,
-                                    end_time=now,
-                                    details=json.dumps({"message": "没有可用的Play-by-Play数据", "no_data": True}),
-                                    error_message=""
-                                )
-                                session.add(new_history)
+                        for game_id in still_missing_ids:
+                            # 创建一个新的成功记录，但标记为no_data
+                            now = datetime.now()
+                            new_history = GameStatsSyncHistory(
+                                sync_type='playbyplay',
+                                game_id=game_id,
+                                status='success',
+                                items_processed=0,
+                                items_succeeded=0,
+                                start_time=now,
+                                end_time=now,
+                                details=json.dumps({"message": "没有可用的Play-by-Play数据", "no_data": True}),
+                                error_message=""
+                            )
+                            session.add(new_history)
 
                     result["details"]["fix_validation"] = {
                         "fixed_count": fixed_count,
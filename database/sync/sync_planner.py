@@ -0,0 +1,176 @@
+# database/sync/sync_planner.py
+import json
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func
+
+from utils.logger_handler import AppLogger
+from database.db_session import DBSession
+from database.models.base_models import Game
+from database.models.stats_models import GameStatsSyncHistory, Event
+
+# SQLite变量上限为999，IN查询分块时保守取500
+_IN_CHUNK_SIZE = 500
+
+
+@dataclass
+class SyncPlan:
+    """一次统计数据同步的待办清单"""
+    all_game_ids: List[str] = field(default_factory=list)
+    playbyplay_games: List[str] = field(default_factory=list)  # 应该有PlayByPlay数据的比赛
+    no_playbyplay_games: List[str] = field(default_factory=list)  # 按规则不同步PlayByPlay的比赛
+    to_sync_boxscore: List[str] = field(default_factory=list)
+    to_sync_playbyplay: List[str] = field(default_factory=list)
+    mismarked_playbyplay_ids: Set[str] = field(default_factory=set)  # 标记成功但实际无数据
+
+
+class SyncPlanner:
+    """
+    同步规划器
+
+    用少量聚合查询计算需要同步的比赛，替代逐场比赛的COUNT查询:
+    1. 一次查询取出boxscore和playbyplay的成功同步记录
+    2. 一次 LEFT JOIN + GROUP BY 找出标记成功但events表中没有数据的playbyplay记录
+    """
+
+    def __init__(self, db_session: Optional[DBSession] = None,
+                 playbyplay_filter: Optional[Callable[[str], bool]] = None):
+        """
+        初始化同步规划器
+
+        Args:
+            db_session: 数据库会话，默认使用全局单例
+            playbyplay_filter: 判断比赛是否应该有PlayByPlay数据的函数，默认全部需要
+        """
+        self.db_session = db_session or DBSession.get_instance()
+        self.playbyplay_filter = playbyplay_filter or (lambda game_id: True)
+        self.logger = AppLogger.get_logger(__name__, app_name='nba')
+
+    def plan(self, game_ids: Optional[Iterable[str]] = None, force_update: bool = False) -> SyncPlan:
+        """
+        计算boxscore和playbyplay的待同步比赛
+
+        Args:
+            game_ids: 候选比赛ID，默认为所有已完成的比赛
+            force_update: 是否强制更新(所有候选比赛都需要同步)
+
+        Returns:
+            SyncPlan: 按比赛ID升序排列的待办清单
+        """
+        all_game_ids = sorted(game_ids) if game_ids is not None else self.get_finished_game_ids()
+        synced = self.get_synced_game_ids()
+        boxscore_synced_ids = synced['boxscore']
+        playbyplay_synced_ids = synced['playbyplay']
+        mismarked_ids = self.find_mismarked_playbyplay()
+
+        plan = SyncPlan(all_game_ids=all_game_ids, mismarked_playbyplay_ids=mismarked_ids)
+        for game_id in all_game_ids:
+            if self.playbyplay_filter(game_id):
+                plan.playbyplay_games.append(game_id)
+            else:
+                plan.no_playbyplay_games.append(game_id)
+
+        # 对于boxscore，所有比赛都需要
+        plan.to_sync_boxscore = [gid for gid in all_game_ids
+                                 if force_update or gid not in boxscore_synced_ids]
+
+        # 对于playbyplay，只考虑应该有数据的比赛：未同步、错误标记或强制更新
+        plan.to_sync_playbyplay = [gid for gid in plan.playbyplay_games
+                                   if force_update or gid not in playbyplay_synced_ids or gid in mismarked_ids]
+
+        self.logger.info(f"同步规划完成: 候选{len(all_game_ids)}场, "
+                         f"boxscore待同步{len(plan.to_sync_boxscore)}场, "
+                         f"playbyplay待同步{len(plan.to_sync_playbyplay)}场, "
+                         f"错误标记{len(mismarked_ids)}场")
+        return plan
+
+    def get_finished_game_ids(self) -> List[str]:
+        """获取所有已完成比赛的ID(升序)"""
+        with self.db_session.session_scope('nba') as session:
+            rows = session.query(Game.game_id).filter(Game.game_status == 3).order_by(Game.game_id).all()
+            return [row.game_id for row in rows]
+
+    def get_synced_game_ids(self) -> Dict[str, Set[str]]:
+        """一次查询获取boxscore和playbyplay已成功同步的比赛ID"""
+        synced = {'boxscore': set(), 'playbyplay': set()}
+        with self.db_session.session_scope('game') as session:
+            rows = session.query(GameStatsSyncHistory.sync_type, GameStatsSyncHistory.game_id).filter(
+                GameStatsSyncHistory.sync_type.in_(tuple(synced)),
+                GameStatsSyncHistory.status == 'success'
+            ).distinct().all()
+            for sync_type, game_id in rows:
+                synced[sync_type].add(game_id)
+        return synced
+
+    def find_mismarked_playbyplay(self) -> Set[str]:
+        """
+        找出被标记为成功但实际没有events数据的playbyplay记录
+
+        只有同时满足以下条件的记录才视为错误标记:
+        1. 应该有PlayByPlay数据(playbyplay_filter)
+        2. events表中没有该比赛的数据
+        3. items_succeeded为0
+        4. details中没有明确标记no_data
+        """
+        mismarked = set()
+        with self.db_session.session_scope('game') as session:
+            event_counts = session.query(
+                Event.game_id.label('game_id'),
+                func.count().label('event_count')
+            ).group_by(Event.game_id).subquery()
+
+            candidates = session.query(
+                GameStatsSyncHistory.game_id,
+                GameStatsSyncHistory.details
+            ).outerjoin(
+                event_counts, event_counts.c.game_id == GameStatsSyncHistory.game_id
+            ).filter(
+                GameStatsSyncHistory.sync_type == 'playbyplay',
+                GameStatsSyncHistory.status == 'success',
+                func.coalesce(GameStatsSyncHistory.items_succeeded, 0) == 0,
+                func.coalesce(event_counts.c.event_count, 0) == 0
+            ).all()
+
+            for game_id, details in candidates:
+                if game_id in mismarked or not self.playbyplay_filter(game_id):
+                    continue
+                if not self._is_no_data(details):
+                    mismarked.add(game_id)
+
+        if mismarked:
+            self.logger.warning(f"发现{len(mismarked)}场比赛的PlayByPlay数据被错误标记为成功但实际无数据")
+        return mismarked
+
+    def count_events(self, game_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        按比赛分组统计events数量
+
+        Args:
+            game_ids: 比赛ID
+
+        Returns:
+            Dict[str, int]: 比赛ID到事件数的映射，没有数据的比赛为0
+        """
+        game_ids = list(game_ids)
+        counts = dict.fromkeys(game_ids, 0)
+        with self.db_session.session_scope('game') as session:
+            for i in range(0, len(game_ids), _IN_CHUNK_SIZE):
+                chunk = game_ids[i:i + _IN_CHUNK_SIZE]
+                rows = session.query(Event.game_id, func.count()).filter(
+                    Event.game_id.in_(chunk)
+                ).group_by(Event.game_id).all()
+                counts.update(rows)
+        return counts
+
+    @staticmethod
+    def _is_no_data(details: Optional[str]) -> bool:
+        """details中是否明确标记为无数据"""
+        if not details:
+            return False
+        try:
+            details_dict = json.loads(details)
+            return bool(details_dict.get('no_data', False) or
+                        'no_data' in details_dict.get('message', '').lower())
+        except (json.JSONDecodeError, TypeError, AttributeError):
+            return False
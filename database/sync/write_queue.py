@@ -0,0 +1,230 @@
+# database/sync/write_queue.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from config import NBAConfig
+from utils.logger_handler import AppLogger
+
+# 队列关闭标记
+_STOP = object()
+
+
+def begin_immediate(session) -> None:
+    """
+    显式开启写事务
+
+    game库连接为驱动层自动提交模式(isolation_level=None)，不显式BEGIN时
+    每条语句各自提交，多条语句的写入无法整体回滚。已在事务中时不做任何操作。
+    """
+    dbapi_connection = session.connection().connection.dbapi_connection
+    if not dbapi_connection.in_transaction:
+        dbapi_connection.execute("BEGIN IMMEDIATE")
+
+
+class _WriteJob:
+    """单个写入任务: write(session) 在写线程的事务中执行"""
+    __slots__ = ('write', 'label', 'future')
+
+    def __init__(self, write: Callable[[Any], Any], label: str):
+        self.write = write
+        self.label = label
+        self.future: Future = Future()
+
+
+class SyncWriteQueue:
+    """
+    同步写入队列
+
+    并行同步时由单个写线程独占数据库写入:
+    1. 网络线程只负责获取和解析数据，通过有界队列提交写入任务
+    2. 队列满时 submit 阻塞(背压)，避免解析结果在内存中无限堆积
+    3. 写线程把队列中已有的多个任务合并到一个事务中提交
+    4. 合并事务失败时逐个任务重试，单场比赛的错误不影响同组其他比赛
+    5. close() 会等待所有已提交任务写完后才返回
+
+    写入函数接收session并在同一事务中完成数据和同步历史的写入，
+    因此同步历史只会在数据真正提交后才出现。
+    """
+
+    def __init__(self, db_session, db_name: str = 'game',
+                 max_pending: Optional[int] = None,
+                 group_size: Optional[int] = None,
+                 group_wait: Optional[float] = None):
+        """
+        初始化写入队列
+
+        Args:
+            db_session: DBSession实例
+            db_name: 写入的数据库名称
+            max_pending: 队列中最多等待的任务数，超出时 submit 阻塞
+            group_size: 每个事务最多合并的任务数
+            group_wait: 凑批时等待后续任务的最长时间(秒)
+        """
+        self.db_session = db_session
+        self.db_name = db_name
+        self.max_pending = max_pending or NBAConfig.DATABASE.WRITE_QUEUE_MAX_PENDING
+        self.group_size = group_size or NBAConfig.DATABASE.WRITE_QUEUE_GROUP_SIZE
+        self.group_wait = NBAConfig.DATABASE.WRITE_QUEUE_GROUP_WAIT if group_wait is None else group_wait
+        self.logger = AppLogger.get_logger(__name__, app_name='sqlite')
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._state_lock = threading.Lock()
+
+        # 运行统计
+        self._stats = {
+            "jobs": 0,
+            "failed_jobs": 0,
+            "transactions": 0,
+            "group_retries": 0,
+            "max_depth": 0,
+            "blocked_seconds": 0.0,
+            "write_seconds": 0.0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def __enter__(self) -> 'SyncWriteQueue':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """启动写线程"""
+        with self._state_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=f"sync-writer-{self.db_name}", daemon=True)
+            self._thread.start()
+
+    def submit(self, write: Callable[[Any], Any], label: str = '') -> Future:
+        """
+        提交写入任务
+
+        Args:
+            write: 接收session的写入函数，返回值会作为Future的结果
+            label: 任务标识(通常为game_id)，用于日志
+
+        Returns:
+            Future: 任务提交到数据库后完成；写入失败时带有异常
+        """
+        if self._closed:
+            raise RuntimeError("写入队列已关闭")
+        if self._thread is None:
+            self.start()
+
+        job = _WriteJob(write, label)
+        started = time.perf_counter()
+        self._queue.put(job)  # 队列满时阻塞，形成背压
+        blocked = time.perf_counter() - started
+
+        with self._stats_lock:
+            self._stats["blocked_seconds"] += blocked
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+        return job.future
+
+    def flush(self) -> None:
+        """等待所有已提交任务写入完成"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """停止接收新任务，写完队列中剩余任务后退出写线程"""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+
+        if thread is None:
+            return
+
+        self._queue.put(_STOP)
+        thread.join()
+
+        stats = self.get_stats()
+        self.logger.info(
+            f"写入队列已关闭: 任务{stats['jobs']}个, 失败{stats['failed_jobs']}个, "
+            f"事务{stats['transactions']}次, 最大积压{stats['max_depth']}, "
+            f"提交阻塞{stats['blocked_seconds']:.2f}秒, 写入耗时{stats['write_seconds']:.2f}秒")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取写入统计"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _run(self) -> None:
+        """写线程主循环"""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                break
+
+            group = [first]
+            deadline = time.monotonic() + self.group_wait
+            while len(group) < self.group_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    # 先写完已取出的任务再退出
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                group.append(job)
+
+            try:
+                self._write_group(group)
+            finally:
+                for _ in group:
+                    self._queue.task_done()
+
+    def _write_group(self, group: List[_WriteJob]) -> None:
+        """在一个事务中写入一组任务，失败时退回逐个任务单独提交"""
+        started = time.perf_counter()
+        try:
+            with self.db_session.session_scope(self.db_name) as session:
+                begin_immediate(session)
+                results = [job.write(session) for job in group]
+            for job, result in zip(group, results):
+                job.future.set_result(result)
+            self._record(len(group), 0, 1, started)
+            return
+        except Exception as e:
+            if len(group) == 1:
+                group[0].future.set_exception(e)
+                self.logger.error(f"写入任务失败({group[0].label}): {e}")
+                self._record(1, 1, 1, started)
+                return
+            self.logger.warning(f"合并写入{len(group)}个任务失败，逐个重试: {e}")
+            with self._stats_lock:
+                self._stats["group_retries"] += 1
+
+        for job in group:
+            job_started = time.perf_counter()
+            try:
+                with self.db_session.session_scope(self.db_name) as session:
+                    begin_immediate(session)
+                    result = job.write(session)
+                job.future.set_result(result)
+                self._record(1, 0, 1, job_started)
+            except Exception as e:
+                job.future.set_exception(e)
+                self.logger.error(f"写入任务失败({job.label}): {e}")
+                self._record(1, 1, 1, job_started)
+
+    def _record(self, jobs: int, failed: int, transactions: int, started: float) -> None:
+        with self._stats_lock:
+            self._stats["jobs"] += jobs
+            self._stats["failed_jobs"] += failed
+            self._stats["transactions"] += transactions
+            self._stats["write_seconds"] += time.perf_counter() - started
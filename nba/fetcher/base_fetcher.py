@@ -5,8 +5,10 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Optional, Any, Union, List, Callable
 
-from utils.http_handler import HTTPRequestManager, RetryConfig
+from config import NBAConfig
+from utils.http_handler import HTTPRequestManager, RetryConfig, ConditionalRequest
 from utils.logger_handler import AppLogger
+from .cache_backend import MemoryCacheTier, create_cache_backend, encode_payload
 
 
 class BaseCacheConfig:
@@ -17,12 +19,22 @@ class BaseCacheConfig:
             duration: timedelta,
             root_path: Union[str, Path],
             file_pattern: str = "{prefix}_{identifier}.json",
-            dynamic_duration: Optional[Dict[Any, timedelta]] = None
+            dynamic_duration: Optional[Dict[Any, timedelta]] = None,
+            backend: Optional[str] = None,
+            memory_max_bytes: Optional[int] = None,
+            memory_ttl: Optional[Dict[str, timedelta]] = None
     ):
         self.duration = duration
         self.root_path = Path(root_path)
         self.file_pattern = file_pattern
         self.dynamic_duration = dynamic_duration or {}
+        self.backend = backend or NBAConfig.CACHE.BACKEND
+        self.memory_max_bytes = (NBAConfig.CACHE.MEMORY_MAX_BYTES
+                                 if memory_max_bytes is None else memory_max_bytes)
+        self.memory_ttl = memory_ttl or {
+            prefix: timedelta(seconds=seconds)
+            for prefix, seconds in NBAConfig.CACHE.MEMORY_PREFIX_TTL_SECONDS.items()
+        }
 
         try:
             self.root_path.mkdir(parents=True, exist_ok=True)
@@ -36,21 +48,35 @@ class BaseCacheConfig:
         filename = self.file_pattern.format(prefix=prefix, identifier=identifier)
         return self.root_path / filename
 
+    def get_cache_key(self, prefix: str, identifier: str) -> str:
+        """获取缓存键(与旧版文件名去掉扩展名一致)"""
+        return self.get_cache_path(prefix, identifier).stem
+
     def get_duration(self, key: Any = None) -> timedelta:
         """获取缓存时长,支持动态缓存时间"""
         if key is not None and key in self.dynamic_duration:
             return self.dynamic_duration[key]
         return self.duration
 
+    def get_memory_ttl(self, prefix: str) -> timedelta:
+        """获取内存缓存层中条目的保留时间"""
+        return self.memory_ttl.get(prefix, timedelta(seconds=NBAConfig.CACHE.MEMORY_TTL_SECONDS))
+
 
 class CacheManager:
-    """缓存管理器"""
+    """缓存管理器
+
+    两级缓存：进程内LRU内存层 + 磁盘缓存后端(见 cache_backend.py)。
+    内存层为写穿透，条目新鲜度同时受内存保留时间和动态缓存时长约束。
+    """
 
     def __init__(self, config: BaseCacheConfig):
         if not isinstance(config, BaseCacheConfig):
             raise TypeError("config must be an instance of BaseCacheConfig")
         self.config = config
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.backend = create_cache_backend(config.backend, config.root_path)
+        self.memory = MemoryCacheTier(config.memory_max_bytes)
 
     def get(self, prefix: str, identifier: str, cache_key: Any = None) -> Optional[Dict]:
         """获取缓存数据
@@ -63,23 +89,36 @@ class CacheManager:
         if not prefix or not identifier:
             raise ValueError("prefix and identifier cannot be empty")
 
-        cache_path = self.config.get_cache_path(prefix, identifier)
-        if not cache_path.exists():
+        key = self.config.get_cache_key(prefix, identifier)
+        duration = self.config.get_duration(cache_key)
+        if duration.total_seconds() <= 0:
+            # 不缓存的数据(如进行中的比赛)无需查询任何一层
             return None
 
         try:
-            with cache_path.open('r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            if self.memory.enabled:
+                ttl = min(duration, self.config.get_memory_ttl(prefix)).total_seconds()
+                entry = self.memory.get(key, ttl)
+                if entry is not None:
+                    timestamp, raw = entry
+                    if datetime.now() - datetime.fromtimestamp(timestamp) < duration:
+                        return json.loads(raw)
+                    # 内存层是写穿透的，磁盘上的记录同样已过期
+                    return None
+
+            cache_data = self.backend.read(key)
+            if cache_data is None:
+                return None
 
             timestamp = datetime.fromtimestamp(cache_data.get('timestamp', 0))
-            duration = self.config.get_duration(cache_key)
 
             if datetime.now() - timestamp < duration:
+                if self.memory.enabled:
+                    raw = cache_data.get('raw') or encode_payload(cache_data.get('data'))
+                    self.memory.put(key, cache_data.get('timestamp', 0), raw)
                 # 这里获取的就是缓存数据的data字段下，原本应该是api请求的数据。
                 return cache_data.get('data')
 
-        except json.JSONDecodeError as e:
-            self.logger.error(f"缓存文件JSON解析失败: {e}")
         except Exception as e:
             self.logger.error(f"读取缓存失败: {e}")
 
@@ -99,30 +138,57 @@ class CacheManager:
         if not isinstance(data, dict):
             raise TypeError("data must be a dictionary")
 
-        cache_path = self.config.get_cache_path(prefix, identifier)
-        cache_data = {
-            'timestamp': datetime.now().timestamp(),
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'data': data
-        }
+        key = self.config.get_cache_key(prefix, identifier)
+        timestamp = datetime.now().timestamp()
+        raw = encode_payload(data)
+        try:
+            self.backend.write(key, {
+                'timestamp': timestamp,
+                'data': data,
+                'raw': raw,
+                'metadata': metadata
+            })
+        except Exception:
+            self.memory.discard(key)
+            raise
+        self.memory.put(key, timestamp, raw)
+
+    def get_entry(self, prefix: str, identifier: str) -> Optional[Dict]:
+        """读取完整缓存记录(data、metadata、timestamp)，不检查是否过期
+
+        用于条件请求：即使缓存时长为0(如进行中的比赛)，也可以用记录中的校验信息重新验证
 
-        if metadata:
-            cache_data['metadata'] = metadata
+        Args:
+            prefix: 缓存前缀
+            identifier: 缓存标识符
+        """
+        if not prefix or not identifier:
+            raise ValueError("prefix and identifier cannot be empty")
 
-        temp_path = cache_path.with_suffix('.tmp')
         try:
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)  # type: ignore
-            temp_path.replace(cache_path)
+            return self.backend.read(self.config.get_cache_key(prefix, identifier))
         except Exception as e:
-            self.logger.error(f"写入缓存失败: {e}")
-            raise
-        finally:
-            if temp_path.exists():
-                try:
-                    temp_path.unlink()
-                except Exception as e:
-                    self.logger.error(f"删除临时文件失败: {e}")
+            self.logger.error(f"读取缓存记录失败: {e}")
+            return None
+
+    def touch(self, prefix: str, identifier: str, metadata: Optional[Dict] = None) -> bool:
+        """刷新缓存时间戳(和元数据)，payload保持不变
+
+        Args:
+            prefix: 缓存前缀
+            identifier: 缓存标识符
+            metadata: 新的元数据，None表示保留原值
+
+        Returns:
+            bool: 记录存在并已刷新时返回True
+        """
+        if not prefix or not identifier:
+            raise ValueError("prefix and identifier cannot be empty")
+
+        key = self.config.get_cache_key(prefix, identifier)
+        # 内存层只保存时间戳和payload，直接丢弃，下次读取时从后端加载
+        self.memory.discard(key)
+        return self.backend.touch(key, datetime.now().timestamp(), metadata)
 
     def clear(self, prefix: str, identifier: Optional[str] = None,
               age: Optional[timedelta] = None) -> None:
@@ -136,30 +202,22 @@ class CacheManager:
         if not prefix:
             raise ValueError("prefix cannot be empty")
 
-        now = datetime.now()
         if identifier:
-            cache_file = self.config.get_cache_path(prefix, identifier)
-            if cache_file.exists():
-                try:
-                    cache_file.unlink()
-                except Exception as e:
-                    self.logger.error(f"删除缓存文件失败 {cache_file}: {e}")
+            key = self.config.get_cache_key(prefix, identifier)
+            self.memory.discard(key)
+            self.backend.delete(key)
             return
 
-        for cache_file in self.config.root_path.glob(f"{prefix}_*.json"):
-            try:
-                if not cache_file.exists():
-                    continue
-
-                with cache_file.open('r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-                timestamp = datetime.fromtimestamp(cache_data.get('timestamp', 0))
-
-                if age is None or (now - timestamp) > age:
-                    cache_file.unlink()
+        older_than = (datetime.now() - age).timestamp() if age is not None else None
+        self.memory.discard_prefix(prefix, older_than=older_than)
+        removed = self.backend.purge(prefix, older_than=older_than)
+        self.logger.debug(f"清理缓存完成 prefix={prefix} | removed={removed}")
 
-            except Exception as e:
-                self.logger.error(f"清理缓存文件失败 {cache_file}: {e}")
+    def get_stats(self) -> Dict[str, Any]:
+        """获取内存缓存层的命中/未命中/淘汰统计"""
+        stats = self.memory.stats()
+        stats['backend'] = self.backend.name
+        return stats
 
 
 class BatchRequestTracker:
@@ -350,11 +408,17 @@ class BaseNBAFetcher:
 
         # 3. 执行 API 请求
         try:
+            # 3.0 条件请求：带上已缓存记录的ETag/Last-Modified，未变化时服务器返回304
+            conditional = None
+            if cache_key and data is None and NBAConfig.CACHE.CONDITIONAL_REQUESTS:
+                conditional = self._build_conditional_request(cache_key)
+
             # 3.1 调用 http_manager 发起请求，参数 'data' 用于 POST 请求体
             api_response = self.http_manager.make_request(
                 url=request_url,
                 params=params,
-                data=data  # 将传入的 data 用于请求体
+                data=data,  # 将传入的 data 用于请求体
+                conditional=conditional
             )
 
             # --- API 请求日志 ---
@@ -379,20 +443,31 @@ class BaseNBAFetcher:
             context_str = " | ".join(context_info) if context_info else ""
 
             # 构建日志消息
-            log_msg = f"数据来源[API请求]: {self.__class__.__name__} | 原因: {log_reason}"
+            source = "API请求(304未修改)" if conditional and conditional.not_modified else "API请求"
+            log_msg = f"数据来源[{source}]: {self.__class__.__name__} | 原因: {log_reason}"
             if context_str:
                 log_msg += f" | {context_str}"
 
             self.logger.info(log_msg)
 
-            # 3.2 如果获取成功且需要缓存，则更新缓存
-            if api_response is not None and cache_key:
+            # 3.2 如果获取成功且需要缓存，则更新缓存，并记录新的校验信息
+            if conditional and conditional.not_modified:
+                # 内容未变化，只刷新时间戳，未传入元数据时保留原记录的元数据(含校验信息)
+                try:
+                    self.cache_manager.touch(
+                        prefix=self.__class__.__name__.lower(),
+                        identifier=cache_key,
+                        metadata=conditional.merge_validators(metadata) if metadata else None
+                    )
+                except Exception as e:
+                    self.logger.error(f"刷新缓存失败 ({cache_key}): {e}")
+            elif api_response is not None and cache_key:
                 try:
                     self.cache_manager.set(
                         prefix=self.__class__.__name__.lower(),
                         identifier=cache_key,
                         data=api_response,  # 缓存从 API 返回的数据
-                        metadata=metadata
+                        metadata=conditional.merge_validators(metadata) if conditional else metadata
                     )
                     # --- 缓存写入日志 (Debug级别) ---
                     self.logger.debug(f"数据已写入缓存: {self.__class__.__name__} - Key: {cache_key}")
@@ -407,6 +482,19 @@ class BaseNBAFetcher:
             self.logger.error(f"API请求处理失败: {request_url} - {str(e)}")
             return None  # 确保在请求异常时返回 None
 
+    def _build_conditional_request(self, cache_key: str) -> ConditionalRequest:
+        """根据已缓存记录中的校验信息构造条件请求(记录可以已过期)"""
+        entry = self.cache_manager.get_entry(self.__class__.__name__.lower(), cache_key)
+        if not entry or not isinstance(entry.get('metadata'), dict) or entry.get('data') is None:
+            return ConditionalRequest()
+
+        metadata = entry['metadata']
+        return ConditionalRequest(
+            cached_data=entry['data'],
+            etag=metadata.get('etag'),
+            last_modified=metadata.get('last_modified')
+        )
+
     def _batch_fetch(self,
                      ids: List[Any],
                      fetch_func: Callable[[Any], Dict],
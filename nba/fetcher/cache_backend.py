@@ -0,0 +1,527 @@
+"""
+缓存存储后端
+
+为 CacheManager 提供可插拔的存储实现：
+- JsonFileCacheBackend: 旧版布局，每个键一个 `{prefix}_{identifier}.json` 文件
+- SQLiteCacheBackend: 单文件 SQLite 存储，payload 以 zlib 压缩的紧凑 JSON 保存，
+  时间戳与元数据存放在带索引的列中，get/set/clear 均为索引查询
+
+另外提供 migrate_json_cache()，用于把旧版 JSON 缓存目录迁移到 SQLite 存储：
+
+    python -m nba.fetcher.cache_backend data/cache/games --delete-source
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Any, Union, Iterator, Tuple
+
+from config import NBAConfig
+
+
+def encode_payload(data: Dict) -> bytes:
+    """把缓存数据序列化为紧凑的JSON字节"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class CacheBackend:
+    """缓存存储后端基类
+
+    记录(record)统一为字典: {'timestamp': float, 'data': Dict, 'metadata': Optional[Dict]}，
+    可选的 'raw' 为 data 的紧凑JSON字节，后端可直接使用以避免重复序列化
+    """
+
+    name = "base"
+
+    def __init__(self, root_path: Union[str, Path]):
+        self.root_path = Path(root_path)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取一条缓存记录，不存在时返回None"""
+        raise NotImplementedError
+
+    def write(self, key: str, record: Dict[str, Any]) -> None:
+        """写入(覆盖)一条缓存记录"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """删除一条缓存记录"""
+        raise NotImplementedError
+
+    def touch(self, key: str, timestamp: float, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """刷新一条记录的时间戳(和元数据)而不改写payload，用于条件请求返回304时
+
+        Returns:
+            bool: 记录存在并已更新时返回True
+        """
+        record = self.read(key)
+        if record is None:
+            return False
+        record['timestamp'] = timestamp
+        if metadata is not None:
+            record['metadata'] = metadata
+        self.write(key, record)
+        return True
+
+    def purge(self, prefix: str, older_than: Optional[float] = None) -> int:
+        """删除键以 `{prefix}_` 开头的记录
+
+        Args:
+            prefix: 键前缀
+            older_than: 时间戳阈值，只删除早于该时间戳的记录；None表示全部删除
+
+        Returns:
+            int: 删除的记录数
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放后端持有的资源"""
+
+
+class JsonFileCacheBackend(CacheBackend):
+    """旧版JSON文件缓存后端(每个键一个带缩进的JSON文件)"""
+
+    name = "json"
+
+    def _path(self, key: str) -> Path:
+        return self.root_path / f"{key}.json"
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        cache_path = self._path(key)
+        if not cache_path.exists():
+            return None
+
+        try:
+            with cache_path.open('r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError as e:
+            self.logger.error(f"缓存文件JSON解析失败: {e}")
+        except Exception as e:
+            self.logger.error(f"读取缓存失败: {e}")
+        return None
+
+    def write(self, key: str, record: Dict[str, Any]) -> None:
+        cache_path = self._path(key)
+        cache_data = {
+            'timestamp': record['timestamp'],
+            'last_updated': datetime.fromtimestamp(record['timestamp']).strftime('%Y-%m-%d %H:%M:%S'),
+            'data': record['data']
+        }
+        if record.get('metadata'):
+            cache_data['metadata'] = record['metadata']
+
+        temp_path = cache_path.with_suffix('.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache_data, f, indent=2, ensure_ascii=False)  # type: ignore
+            temp_path.replace(cache_path)
+        except Exception as e:
+            self.logger.error(f"写入缓存失败: {e}")
+            raise
+        finally:
+            if temp_path.exists():
+                try:
+                    temp_path.unlink()
+                except Exception as e:
+                    self.logger.error(f"删除临时文件失败: {e}")
+
+    def delete(self, key: str) -> None:
+        cache_file = self._path(key)
+        if cache_file.exists():
+            try:
+                cache_file.unlink()
+            except Exception as e:
+                self.logger.error(f"删除缓存文件失败 {cache_file}: {e}")
+
+    def purge(self, prefix: str, older_than: Optional[float] = None) -> int:
+        removed = 0
+        for cache_file in self.root_path.glob(f"{prefix}_*.json"):
+            try:
+                if not cache_file.exists():
+                    continue
+
+                if older_than is not None:
+                    with cache_file.open('r', encoding='utf-8') as f:
+                        cache_data = json.load(f)
+                    if cache_data.get('timestamp', 0) >= older_than:
+                        continue
+
+                cache_file.unlink()
+                removed += 1
+
+            except Exception as e:
+                self.logger.error(f"清理缓存文件失败 {cache_file}: {e}")
+        return removed
+
+    def iter_records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """遍历目录中所有的旧版缓存文件，用于迁移"""
+        for cache_file in self.root_path.glob("*.json"):
+            if cache_file.name.startswith("batch_"):
+                # 批量任务的进度文件不是缓存记录
+                continue
+            record = self.read(cache_file.stem)
+            if record is not None and 'data' in record:
+                yield cache_file.stem, record
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """SQLite单文件缓存后端
+
+    - 每个缓存目录一个数据库文件，键为原文件名去掉扩展名 (`{prefix}_{identifier}`)
+    - payload 使用紧凑JSON + zlib压缩
+    - timestamp 列带索引，按年龄清理无需解析payload
+    - 每个线程使用独立连接，WAL模式支持并发读
+    """
+
+    name = "sqlite"
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS cache_entries ("
+        " key TEXT PRIMARY KEY,"
+        " timestamp REAL NOT NULL,"
+        " game_status INTEGER,"
+        " metadata TEXT,"
+        " payload BLOB NOT NULL"
+        ") WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS idx_cache_entries_timestamp ON cache_entries (timestamp)",
+    )
+
+    def __init__(self, root_path: Union[str, Path],
+                 db_filename: str = NBAConfig.CACHE.DB_FILENAME,
+                 compression_level: int = NBAConfig.CACHE.COMPRESSION_LEVEL):
+        super().__init__(root_path)
+        self.db_path = self.root_path / db_filename
+        self.compression_level = compression_level
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connection(self) -> sqlite3.Connection:
+        """获取当前线程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    for statement in self._SCHEMA:
+                        conn.execute(statement)
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _prefix_range(prefix: str) -> Tuple[str, str]:
+        """把 `{prefix}_` 前缀匹配转换为主键范围查询，'`' 是 '_' 的下一个字符"""
+        return f"{prefix}_", f"{prefix}`"
+
+    def _encode(self, record: Dict[str, Any]) -> bytes:
+        raw = record.get('raw') or encode_payload(record['data'])
+        return zlib.compress(raw, self.compression_level)
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = self._connection().execute(
+                "SELECT timestamp, metadata, payload FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            timestamp, metadata, payload = row
+            raw = zlib.decompress(payload)
+            return {
+                'timestamp': timestamp,
+                'data': json.loads(raw.decode('utf-8')),
+                'raw': raw,
+                'metadata': json.loads(metadata) if metadata else None
+            }
+        except (zlib.error, json.JSONDecodeError) as e:
+            self.logger.error(f"缓存记录解码失败 {key}: {e}")
+        except sqlite3.Error as e:
+            self.logger.error(f"读取缓存失败 {key}: {e}")
+        return None
+
+    def write(self, key: str, record: Dict[str, Any]) -> None:
+        metadata = record.get('metadata')
+        game_status = metadata.get('game_status') if isinstance(metadata, dict) else None
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache_entries (key, timestamp, game_status, metadata, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    record['timestamp'],
+                    game_status if isinstance(game_status, int) else None,
+                    json.dumps(metadata, ensure_ascii=False, default=str) if metadata else None,
+                    self._encode(record)
+                )
+            )
+        except sqlite3.Error as e:
+            self.logger.error(f"写入缓存失败 {key}: {e}")
+            raise
+
+    def touch(self, key: str, timestamp: float, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        game_status = metadata.get('game_status') if isinstance(metadata, dict) else None
+        try:
+            cursor = self._connection().execute(
+                "UPDATE cache_entries SET timestamp = ?, game_status = COALESCE(?, game_status), "
+                "metadata = COALESCE(?, metadata) WHERE key = ?",
+                (
+                    timestamp,
+                    game_status if isinstance(game_status, int) else None,
+                    json.dumps(metadata, ensure_ascii=False, default=str) if metadata is not None else None,
+                    key
+                )
+            )
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            self.logger.error(f"刷新缓存时间戳失败 {key}: {e}")
+            return False
+
+    def write_many(self, records: Iterator[Tuple[str, Dict[str, Any]]], chunk_size: int = 500) -> int:
+        """在事务中批量写入记录，用于迁移
+
+        Returns:
+            int: 写入的记录数
+        """
+        conn = self._connection()
+        written = 0
+        rows = []
+
+        def flush():
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache_entries (key, timestamp, game_status, metadata, payload) "
+                    "VALUES (?, ?, ?, ?, ?)", rows
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        for key, record in records:
+            metadata = record.get('metadata')
+            game_status = metadata.get('game_status') if isinstance(metadata, dict) else None
+            rows.append((
+                key,
+                record.get('timestamp', 0),
+                game_status if isinstance(game_status, int) else None,
+                json.dumps(metadata, ensure_ascii=False, default=str) if metadata else None,
+                self._encode(record)
+            ))
+            if len(rows) >= chunk_size:
+                flush()
+                written += len(rows)
+                rows = []
+
+        if rows:
+            flush()
+            written += len(rows)
+        return written
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self.logger.error(f"删除缓存记录失败 {key}: {e}")
+
+    def purge(self, prefix: str, older_than: Optional[float] = None) -> int:
+        low, high = self._prefix_range(prefix)
+        sql = "DELETE FROM cache_entries WHERE key >= ? AND key < ?"
+        params: Tuple = (low, high)
+        if older_than is not None:
+            sql += " AND timestamp < ?"
+            params = (low, high, older_than)
+
+        try:
+            return self._connection().execute(sql, params).rowcount
+        except sqlite3.Error as e:
+            self.logger.error(f"清理缓存失败 prefix={prefix}: {e}")
+            return 0
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                self.logger.error(f"关闭缓存数据库失败: {e}")
+            self._local.conn = None
+
+
+class MemoryCacheTier:
+    """进程内LRU内存缓存层
+
+    - 按字节计量容量(紧凑JSON字节长度)，超出上限时按LRU淘汰
+    - 条目保存JSON字节而非对象，每次命中返回独立副本，避免解析器修改缓存数据
+    - 所有操作加锁，可在同步线程池中共享
+    """
+
+    # 每个条目除payload外的估算开销(键、元组、时间戳等)
+    ENTRY_OVERHEAD = 200
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, float, bytes]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _entry_size(self, key: str, raw: bytes) -> int:
+        return len(raw) + len(key) + self.ENTRY_OVERHEAD
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= self._entry_size(key, entry[2])
+
+    def get(self, key: str, ttl: float) -> Optional[Tuple[float, bytes]]:
+        """获取条目
+
+        Args:
+            key: 缓存键
+            ttl: 条目进入内存后的最长保留秒数
+
+        Returns:
+            Tuple: (记录时间戳, JSON字节)，未命中或已过期返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            timestamp, loaded_at, raw = entry
+            if time.monotonic() - loaded_at >= ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return timestamp, raw
+
+    def put(self, key: str, timestamp: float, raw: bytes) -> None:
+        """写入条目，超过容量时淘汰最久未使用的条目"""
+        if not self.enabled:
+            return
+
+        size = self._entry_size(key, raw)
+        if size > self.max_bytes:
+            # 单个条目超过总容量，不进入内存层
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (timestamp, time.monotonic(), raw)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def discard_prefix(self, prefix: str, older_than: Optional[float] = None) -> None:
+        """删除键以 `{prefix}_` 开头的条目"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(f"{prefix}_")]:
+                if older_than is None or self._entries[key][0] < older_than:
+                    self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+CACHE_BACKENDS = {
+    JsonFileCacheBackend.name: JsonFileCacheBackend,
+    SQLiteCacheBackend.name: SQLiteCacheBackend,
+}
+
+
+def create_cache_backend(name: str, root_path: Union[str, Path]) -> CacheBackend:
+    """根据名称创建缓存后端"""
+    backend_cls = CACHE_BACKENDS.get(name)
+    if backend_cls is None:
+        raise ValueError(f"未知的缓存后端: {name}，可选值: {', '.join(CACHE_BACKENDS)}")
+    return backend_cls(root_path)
+
+
+def migrate_json_cache(root_path: Union[str, Path], delete_source: bool = False) -> Dict[str, int]:
+    """把旧版JSON文件缓存目录迁移到SQLite存储
+
+    Args:
+        root_path: 缓存目录
+        delete_source: 迁移成功后是否删除原JSON文件
+
+    Returns:
+        Dict: 迁移统计 {'migrated': 迁移记录数, 'deleted': 删除文件数}
+    """
+    source = JsonFileCacheBackend(root_path)
+    target = SQLiteCacheBackend(root_path)
+    migrated_keys = []
+
+    def records():
+        for key, record in source.iter_records():
+            migrated_keys.append(key)
+            yield key, record
+
+    try:
+        migrated = target.write_many(records())
+    finally:
+        target.close()
+
+    deleted = 0
+    if delete_source:
+        for key in migrated_keys:
+            source.delete(key)
+            deleted += 1
+
+    return {'migrated': migrated, 'deleted': deleted}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="将JSON文件缓存迁移到SQLite缓存存储")
+    parser.add_argument("paths", nargs="*", help="缓存目录，默认迁移 data/cache 下的所有子目录")
+    parser.add_argument("--delete-source", action="store_true", help="迁移完成后删除原JSON文件")
+    args = parser.parse_args()
+
+    cache_dirs = [Path(p) for p in args.paths] or sorted(
+        p for p in NBAConfig.PATHS.CACHE_DIR.iterdir() if p.is_dir()
+    )
+    for cache_dir in cache_dirs:
+        stats = migrate_json_cache(cache_dir, delete_source=args.delete_source)
+        print(f"{cache_dir}: 迁移 {stats['migrated']} 条记录，删除 {stats['deleted']} 个文件")
@@ -4,6 +4,7 @@ from datetime import timedelta
 from enum import Enum
 from .base_fetcher import BaseNBAFetcher, BaseRequestConfig, BaseCacheConfig
 from config import NBAConfig
+from utils.async_fetch_engine import AsyncFetchEngine
 
 
 class GameStatusEnum(Enum):
@@ -600,6 +601,60 @@ class GameFetcher(BaseNBAFetcher):
             game_statuses=game_statuses
         )
 
+    def batch_get_cdn_data(
+            self,
+            game_ids: List[str],
+            data_type: str = 'boxscore',
+            force_update: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """通过异步抓取引擎批量获取CDN上的比赛数据(liveData)
+
+        CDN静态文件不经过stats API的节流，按 NBAConfig.NETWORK.ASYNC_HOST_LIMITS 控制并发。
+        已结束比赛的缓存直接返回，新获取的已结束比赛数据写入缓存。
+
+        Args:
+            game_ids: 比赛ID列表
+            data_type: 数据类型 (boxscore或playbyplay)
+            force_update: 是否强制更新缓存
+
+        Returns:
+            Dict: 以比赛ID为键，CDN数据为值的字典(获取失败的比赛不包含在内)
+        """
+        prefix = self.__class__.__name__.lower()
+        results: Dict[str, Dict[str, Any]] = {}
+        urls: Dict[str, str] = {}
+
+        for game_id in game_ids:
+            cache_key = f"{data_type}_{game_id}"
+            if not force_update:
+                cached_data = self.cache_manager.get(prefix, cache_key, GameStatusEnum.FINISHED)
+                if cached_data is not None and self._get_game_status(cached_data) == GameStatusEnum.FINISHED:
+                    results[game_id] = cached_data
+                    continue
+            urls[game_id] = f"{self.game_config.CDN_URL}/{data_type}/{data_type}_{game_id}.json"
+
+        self.logger.info(
+            f"开始异步批量获取CDN数据 | count={len(game_ids)} | data_type={data_type} | "
+            f"cached={len(results)} | to_fetch={len(urls)}"
+        )
+
+        with AsyncFetchEngine() as engine:
+            fetched = engine.fetch_all(urls)
+
+        for game_id, data in fetched.items():
+            if data is None:
+                continue
+            results[game_id] = data
+            if self._get_game_status(data) == GameStatusEnum.FINISHED:
+                self.cache_manager.set(
+                    prefix=prefix,
+                    identifier=f"{data_type}_{game_id}",
+                    data=data,
+                    metadata={"game_status": GameStatusEnum.FINISHED.value}
+                )
+
+        return results
+
     # ============== 缓存管理方法 ==============
 
     def clear_cache(
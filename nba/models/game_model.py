@@ -1,7 +1,8 @@
 from datetime import datetime
 from enum import IntEnum, Enum
-from typing import Optional, List, Dict, Any, Literal
-from pydantic import BaseModel, Field, model_validator, conint, confloat, ConfigDict
+from typing import Optional, List, Dict, Any, Literal, Iterable, Union
+import numpy as np
+from pydantic import BaseModel, Field, model_validator, conint, confloat, ConfigDict, PrivateAttr
 
 from utils.time_handler import  TimeHandler
 from utils.logger_handler import AppLogger
@@ -470,38 +471,58 @@ class BaseEvent(BaseModel):
     model_config = ConfigDict(from_attributes=True, extra='allow')
 
     @classmethod
-    def filter_by_team(cls, events: List["BaseEvent"], team_id: int) -> List["BaseEvent"]:
+    def filter_by_team(cls, events: Union[List["BaseEvent"], "EventIndex"], team_id: int) -> List["BaseEvent"]:
         """按球队ID筛选事件"""
+        if isinstance(events, EventIndex):
+            return events.select(team_id=team_id)
         return [event for event in events if event.team_id == team_id]
 
     @classmethod
-    def filter_by_player(cls, events: List["BaseEvent"], player_id: int) -> List["BaseEvent"]:
+    def filter_by_player(cls, events: Union[List["BaseEvent"], "EventIndex"], player_id: int) -> List["BaseEvent"]:
         """按球员ID筛选事件"""
+        if isinstance(events, EventIndex):
+            return events.select(person_id=player_id)
         return [event for event in events if event.person_id == player_id]
 
     @classmethod
-    def filter_by_period(cls, events: List["BaseEvent"], period: int) -> List["BaseEvent"]:
+    def filter_by_period(cls, events: Union[List["BaseEvent"], "EventIndex"], period: int) -> List["BaseEvent"]:
         """按节数筛选事件"""
+        if isinstance(events, EventIndex):
+            return events.select(period=period)
         return [event for event in events if event.period == period]
 
     @classmethod
-    def filter_by_clutch_time(cls, events: List["BaseEvent"], minutes: int = 2) -> List["BaseEvent"]:
-        """筛选关键时刻事件(第四节或加时赛最后几分钟)"""
+    def filter_by_clutch_time(cls, events: Union[List["BaseEvent"], "EventIndex", "PlayByPlayColumns"],
+                              minutes: int = 2) -> List["BaseEvent"]:
+        """筛选关键时刻事件(第四节或加时赛最后几分钟)，传入列式视图时用向量化掩码"""
+        if isinstance(events, PlayByPlayColumns):
+            return events.to_events(events.clutch_mask(minutes))
+        if isinstance(events, EventIndex):
+            events = events.select(min_period=4)
         return [
             event for event in events
-            if (event.period >= 4 and ":" in event.clock and
-                int(event.clock.split(":")[0]) <= minutes)
+            if event.period >= 4 and event.clock_minutes is not None and event.clock_minutes <= minutes
         ]
 
     @classmethod
     def filter_multi(cls,
-                     events: List["BaseEvent"],
+                     events: Union[List["BaseEvent"], "EventIndex"],
                      team_id: Optional[int] = None,
                      player_id: Optional[int] = None,
                      period: Optional[int] = None,
                      is_clutch: bool = False,
                      clutch_minutes: int = 2) -> List["BaseEvent"]:
-        """多条件筛选"""
+        """多条件筛选
+
+        传入 EventIndex 时先用索引取出候选事件，再检查其余条件。
+        """
+        if isinstance(events, EventIndex):
+            filtered = events.select(team_id=team_id, person_id=player_id, period=period,
+                                     min_period=4 if is_clutch else None)
+            if is_clutch:
+                filtered = cls.filter_by_clutch_time(filtered, clutch_minutes)
+            return filtered
+
         filtered = events
 
         if team_id is not None:
@@ -518,6 +539,21 @@ class BaseEvent(BaseModel):
 
         return filtered
 
+    @property
+    def clock_minutes(self) -> Optional[int]:
+        """比赛时钟的剩余分钟数，支持 "PT05M23.00S" 和 "5:23" 两种格式"""
+        clock = self.clock or ""
+        if ":" in clock:
+            minutes = clock.split(":")[0]
+        elif clock.startswith("PT") and "M" in clock:
+            minutes = clock[2:clock.index("M")]
+        else:
+            return None
+        try:
+            return int(minutes.replace("PT", ""))
+        except ValueError:
+            return None
+
     @property
     def score_difference(self) -> Optional[int]:
         """计算比分差值"""
@@ -822,6 +858,274 @@ class GameData(BaseModel):
         return self
 
 
+# 投篮事件类型
+SHOT_ACTION_TYPES = ("2pt", "3pt")
+
+
+class EventIndex:
+    """比赛事件索引
+
+    一次遍历建立 action_type / person_id / team_id / period / assist_person_id
+    以及"与球员相关"到事件位置的映射，之后的筛选只访问命中的事件，结果保持原始顺序。
+    """
+
+    # 与球员间接相关的字段(助攻者、盖帽者、抢断者、被犯规者、得分者)
+    RELATED_PERSON_FIELDS = ('assist_person_id', 'block_person_id', 'steal_person_id',
+                             'foul_drawn_person_id', 'scoring_person_id')
+
+    def __init__(self, events: List[BaseEvent]):
+        self.events = events
+        self._size = len(events)
+        self.by_action_type: Dict[str, List[int]] = {}
+        self.by_person: Dict[int, List[int]] = {}
+        self.by_team: Dict[int, List[int]] = {}
+        self.by_period: Dict[int, List[int]] = {}
+        self.by_assist_person: Dict[int, List[int]] = {}
+        self.by_related_person: Dict[int, List[int]] = {}
+
+        for position, event in enumerate(events):
+            self.by_action_type.setdefault(event.action_type, []).append(position)
+            self.by_period.setdefault(event.period, []).append(position)
+            if event.team_id is not None:
+                self.by_team.setdefault(event.team_id, []).append(position)
+
+            related = set()
+            if event.person_id is not None:
+                self.by_person.setdefault(event.person_id, []).append(position)
+                related.add(event.person_id)
+            assist_person_id = getattr(event, 'assist_person_id', None)
+            if assist_person_id is not None:
+                self.by_assist_person.setdefault(assist_person_id, []).append(position)
+            for field in self.RELATED_PERSON_FIELDS:
+                value = getattr(event, field, None)
+                if value is not None:
+                    related.add(value)
+            for person_id in related:
+                self.by_related_person.setdefault(person_id, []).append(position)
+
+    def matches(self, events: List[BaseEvent]) -> bool:
+        """索引是否仍对应该事件列表(列表被替换或增删事件后需要重建)"""
+        return events is self.events and len(events) == self._size
+
+    def select(self,
+               action_types: Optional[Iterable[str]] = None,
+               person_id: Optional[int] = None,
+               team_id: Optional[int] = None,
+               period: Optional[int] = None,
+               assist_person_id: Optional[int] = None,
+               related_person_id: Optional[int] = None,
+               min_period: Optional[int] = None) -> List[BaseEvent]:
+        """按多个条件筛选事件(条件之间为"与")
+
+        Args:
+            action_types: 事件类型集合
+            person_id: 事件主体球员ID
+            team_id: 球队ID
+            period: 节数
+            assist_person_id: 助攻者ID
+            related_person_id: 直接或间接相关的球员ID
+            min_period: 最小节数(如关键时刻筛选第四节及加时)
+
+        Returns:
+            List[BaseEvent]: 按原始顺序排列的事件
+        """
+        candidates: List[List[int]] = []
+        if action_types is not None:
+            action_types = [action_types] if isinstance(action_types, str) else list(action_types)
+            if len(action_types) == 1:
+                candidates.append(self.by_action_type.get(action_types[0], []))
+            else:
+                candidates.append(sorted(position for action_type in action_types
+                                         for position in self.by_action_type.get(action_type, [])))
+        if person_id is not None:
+            candidates.append(self.by_person.get(person_id, []))
+        if team_id is not None:
+            candidates.append(self.by_team.get(team_id, []))
+        if period is not None:
+            candidates.append(self.by_period.get(period, []))
+        if assist_person_id is not None:
+            candidates.append(self.by_assist_person.get(assist_person_id, []))
+        if related_person_id is not None:
+            candidates.append(self.by_related_person.get(related_person_id, []))
+        if min_period is not None:
+            candidates.append(sorted(position for value, positions in self.by_period.items()
+                                     if value >= min_period for position in positions))
+
+        if not candidates:
+            return list(self.events)
+
+        # 从最短的候选列表出发，其余条件做集合判断
+        candidates.sort(key=len)
+        positions = candidates[0]
+        for other in candidates[1:]:
+            if not positions:
+                break
+            other_set = set(other)
+            positions = [position for position in positions if position in other_set]
+        return [self.events[position] for position in positions]
+
+
+def parse_clock_seconds(clock: Optional[str]) -> float:
+    """把比赛时钟解析为本节剩余秒数，支持 "PT05M23.00S" 和 "5:23"，无法解析时为NaN"""
+    if not clock:
+        return float('nan')
+    try:
+        if clock.startswith("PT"):
+            minutes, _, seconds = clock[2:].rstrip("S").partition("M")
+            return int(minutes or 0) * 60 + float(seconds or 0)
+        if ":" in clock:
+            minutes, _, seconds = clock.partition(":")
+            return int(minutes) * 60 + float(seconds)
+    except ValueError:
+        pass
+    return float('nan')
+
+
+class PlayByPlayColumns:
+    """回放事件的列式视图
+
+    每个字段一个NumPy数组(第i个元素对应第i个事件)，用于整场比赛的向量化统计和筛选。
+    缺失值约定: team_id/person_id 为0，坐标和时钟为NaN，shot_result 为-1(没有投篮结果的事件)。
+    比分按事件顺序前向填充，即每个事件发生时的比分。
+    """
+
+    # 事件类型编码，未列出的类型编码为 len(ACTION_TYPES)
+    ACTION_TYPES = ("period", "jumpball", "2pt", "3pt", "freethrow", "rebound", "steal", "block",
+                    "foul", "assist", "turnover", "violation", "timeout", "substitution", "ejection", "game")
+    ACTION_TYPE_CODES = {action_type: code for code, action_type in enumerate(ACTION_TYPES)}
+    OTHER_ACTION_CODE = len(ACTION_TYPES)
+
+    def __init__(self, events: List[BaseEvent]):
+        self.events = events
+        self._size = len(events)
+        count = len(events)
+
+        self.action_number = np.empty(count, dtype=np.int32)
+        self.period = np.empty(count, dtype=np.int16)
+        self.clock_seconds = np.empty(count, dtype=np.float32)
+        self.team_id = np.empty(count, dtype=np.int64)
+        self.person_id = np.empty(count, dtype=np.int64)
+        self.action_type = np.empty(count, dtype=np.int8)
+        self.x_legacy = np.empty(count, dtype=np.float32)
+        self.y_legacy = np.empty(count, dtype=np.float32)
+        self.shot_result = np.empty(count, dtype=np.int8)
+        self.score_home = np.empty(count, dtype=np.int32)
+        self.score_away = np.empty(count, dtype=np.int32)
+
+        codes = self.ACTION_TYPE_CODES
+        other = self.OTHER_ACTION_CODE
+        nan = float('nan')
+        home = away = 0
+        for i, event in enumerate(events):
+            self.action_number[i] = event.action_number
+            self.period[i] = event.period
+            self.clock_seconds[i] = parse_clock_seconds(event.clock)
+            self.team_id[i] = event.team_id or 0
+            self.person_id[i] = event.person_id or 0
+            self.action_type[i] = codes.get(event.action_type, other)
+            self.x_legacy[i] = nan if event.x_legacy is None else event.x_legacy
+            self.y_legacy[i] = nan if event.y_legacy is None else event.y_legacy
+            result = getattr(event, 'shot_result', None)
+            self.shot_result[i] = -1 if not result else int(result == ShotResult.MADE)
+            # 比分字段在非得分事件上可能为空，沿用上一个事件的比分
+            if event.score_home:
+                home = int(event.score_home)
+            if event.score_away:
+                away = int(event.score_away)
+            self.score_home[i] = home
+            self.score_away[i] = away
+
+    @classmethod
+    def from_events(cls, events: List[BaseEvent]) -> "PlayByPlayColumns":
+        """从事件对象列表构建列式视图"""
+        return cls(events)
+
+    def to_events(self, mask: Optional[np.ndarray] = None) -> List[BaseEvent]:
+        """转换回事件对象列表
+
+        Args:
+            mask: 布尔掩码或位置数组，为None时返回全部事件
+
+        Returns:
+            List[BaseEvent]: 按原始顺序排列的事件对象
+        """
+        if mask is None:
+            return list(self.events)
+        positions = np.flatnonzero(mask) if mask.dtype == np.bool_ else mask
+        return [self.events[position] for position in positions]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def matches(self, events: List[BaseEvent]) -> bool:
+        """视图是否仍对应该事件列表(列表被替换或增删事件后需要重建)"""
+        return events is self.events and len(events) == self._size
+
+    def action_code(self, action_type: str) -> int:
+        """事件类型对应的编码"""
+        return self.ACTION_TYPE_CODES.get(action_type, self.OTHER_ACTION_CODE)
+
+    def mask(self,
+             action_types: Optional[Iterable[str]] = None,
+             team_id: Optional[int] = None,
+             person_id: Optional[int] = None,
+             period: Optional[int] = None) -> np.ndarray:
+        """按条件生成布尔掩码(条件之间为"与")"""
+        result = np.ones(self._size, dtype=bool)
+        if action_types is not None:
+            action_types = [action_types] if isinstance(action_types, str) else action_types
+            result &= np.isin(self.action_type, [self.action_code(action_type) for action_type in action_types])
+        if team_id is not None:
+            result &= self.team_id == team_id
+        if person_id is not None:
+            result &= self.person_id == person_id
+        if period is not None:
+            result &= self.period == period
+        return result
+
+    def clutch_mask(self, minutes: int = 2) -> np.ndarray:
+        """关键时刻掩码: 第四节或加时赛，剩余分钟数不超过minutes(与 BaseEvent.filter_by_clutch_time 一致)"""
+        return (self.period >= 4) & (np.floor(self.clock_seconds / 60) <= minutes)
+
+    @property
+    def score_margin(self) -> np.ndarray:
+        """每个事件发生时的主队领先分差(主队得分-客队得分)"""
+        return self.score_home - self.score_away
+
+    def score_flow(self) -> Dict[str, int]:
+        """基于逐事件比分统计领先变换、平局次数和双方最大领先"""
+        if not self._size:
+            return {"lead_changes": 0, "times_tied": 0, "home_biggest_lead": 0, "away_biggest_lead": 0}
+
+        margin = self.score_margin
+        # 只看比分发生变化的事件
+        changed = np.concatenate(([margin[0] != 0], np.diff(margin) != 0))
+        leader = np.sign(margin[changed])
+        leading = leader[leader != 0]
+        return {
+            "lead_changes": int(np.count_nonzero(leading[1:] != leading[:-1])),
+            "times_tied": int(np.count_nonzero(leader == 0)),
+            "home_biggest_lead": int(max(margin.max(), 0)),
+            "away_biggest_lead": int(max(-margin.min(), 0))
+        }
+
+    def period_scores(self) -> List[Dict[str, int]]:
+        """由逐事件比分推算每节得分"""
+        if not self._size:
+            return []
+        periods = np.unique(self.period)
+        # 每节最后一个事件的位置(事件按时间顺序排列)
+        last_positions = [int(np.flatnonzero(self.period == period)[-1]) for period in periods]
+        home_totals = self.score_home[last_positions]
+        away_totals = self.score_away[last_positions]
+        home_scores = np.diff(home_totals, prepend=0)
+        away_scores = np.diff(away_totals, prepend=0)
+        return [
+            {"period": int(period), "home_score": int(home), "away_score": int(away)}
+            for period, home, away in zip(periods, home_scores, away_scores)
+        ]
+
+
 class PlayByPlay(BaseModel):
     """比赛回放数据"""
     game: Dict[str, Any] = Field(..., description="比赛信息")
@@ -843,6 +1147,29 @@ class Game(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    _event_index: Optional[EventIndex] = PrivateAttr(default=None)
+    _columns: Optional[PlayByPlayColumns] = PrivateAttr(default=None)
+
+    @property
+    def event_index(self) -> EventIndex:
+        """事件索引，首次访问时建立，事件列表变化后自动重建"""
+        actions = self.play_by_play.actions if self.play_by_play and self.play_by_play.actions else []
+        index = self._event_index
+        if index is None or not index.matches(actions):
+            index = EventIndex(actions)
+            self._event_index = index
+        return index
+
+    @property
+    def columns(self) -> PlayByPlayColumns:
+        """回放事件的列式视图，首次访问时建立，事件列表变化后自动重建"""
+        actions = self.play_by_play.actions if self.play_by_play and self.play_by_play.actions else []
+        columns = self._columns
+        if columns is None or not columns.matches(actions):
+            columns = PlayByPlayColumns.from_events(actions)
+            self._columns = columns
+        return columns
+
     #=====model层提供清晰的数据访问接口,类似于数据库的功能，service层可以直接调用这些接口，代码更简洁=========
 
     def game_now(self) -> Dict[str, Any]:
@@ -1027,30 +1354,27 @@ class Game(BaseModel):
         Returns:
             List[Dict[str, Any]]: 投篮数据列表，包含是否被助攻的信息
         """
-        shot_data = []
-        if self.play_by_play and self.play_by_play.actions:
-            for action in self.play_by_play.actions:
-                if action.action_type in ["2pt", "3pt"]:
-                    # 如果指定了球员ID，则只返回该球员的投篮
-                    if player_id is not None and action.person_id != player_id:
-                        continue
-
-                    shot_data.append({
-                        'x_legacy': action.x_legacy if hasattr(action, 'x_legacy') else None,
-                        'y_legacy': action.y_legacy if hasattr(action, 'y_legacy') else None,
-                        'shot_result': action.shot_result if hasattr(action, 'shot_result') else None,
-                        'description': action.description,
-                        'player_id': action.person_id,
-                        'team_id': action.team_id,
-                        'period': action.period,
-                        'action_type': action.action_type,
-                        'time': action.clock,
-                        'assisted': True if hasattr(action,
-                                                    'assist_person_id') and action.assist_person_id is not None else False,
-                        'assist_player_id': getattr(action, 'assist_person_id', None),
-                        'assist_player_name': getattr(action, 'assist_player_name_initial', None)
-                    })
-        return shot_data
+        return [self._shot_to_dict(action)
+                for action in self.event_index.select(action_types=SHOT_ACTION_TYPES, person_id=player_id)]
+
+    @staticmethod
+    def _shot_to_dict(action: BaseEvent) -> Dict[str, Any]:
+        """将投篮事件转换为投篮图使用的字典"""
+        assist_person_id = getattr(action, 'assist_person_id', None)
+        return {
+            'x_legacy': getattr(action, 'x_legacy', None),
+            'y_legacy': getattr(action, 'y_legacy', None),
+            'shot_result': getattr(action, 'shot_result', None),
+            'description': action.description,
+            'player_id': action.person_id,
+            'team_id': action.team_id,
+            'period': action.period,
+            'action_type': action.action_type,
+            'time': action.clock,
+            'assisted': assist_person_id is not None,
+            'assist_player_id': assist_person_id,
+            'assist_player_name': getattr(action, 'assist_player_name_initial', None)
+        }
 
     def get_assisted_shot_data(self, passer_id: int) -> List[Dict[str, Any]]:
         """获取特定球员的助攻导致的队友得分位置数据
@@ -1062,30 +1386,24 @@ class Game(BaseModel):
             List[Dict[str, Any]]: 经过该球员助攻的所有队友投篮数据
         """
         assisted_shots = []
-        if self.play_by_play and self.play_by_play.actions:
-            for action in self.play_by_play.actions:
-                # 只关注投篮事件
-                if action.action_type not in ["2pt", "3pt"]:
-                    continue
-
-                # 检查是否是该球员的助攻
-                if (hasattr(action, "assist_person_id") and
-                        action.assist_person_id == passer_id and
-                        action.shot_result == "Made"):  # 只记录命中的球
-
-                    assisted_shots.append({
-                        'x': action.x_legacy if hasattr(action, 'x_legacy') else None,
-                        'y': action.y_legacy if hasattr(action, 'y_legacy') else None,
-                        'shot_type': action.action_type,
-                        'shooter_id': action.person_id,
-                        'shooter_name': action.player_name,
-                        'team_id': action.team_id,
-                        'period': action.period,
-                        'time': action.clock,
-                        'description': action.description,
-                        'area': getattr(action, 'area', None),
-                        'distance': getattr(action, 'shot_distance', None)
-                    })
+        for action in self.event_index.select(action_types=SHOT_ACTION_TYPES, assist_person_id=passer_id):
+            # 只记录命中的球
+            if action.shot_result != "Made":
+                continue
+
+            assisted_shots.append({
+                'x': getattr(action, 'x_legacy', None),
+                'y': getattr(action, 'y_legacy', None),
+                'shot_type': action.action_type,
+                'shooter_id': action.person_id,
+                'shooter_name': action.player_name,
+                'team_id': action.team_id,
+                'period': action.period,
+                'time': action.clock,
+                'description': action.description,
+                'area': getattr(action, 'area', None),
+                'distance': getattr(action, 'shot_distance', None)
+            })
 
         return assisted_shots
 
@@ -1116,7 +1434,7 @@ class Game(BaseModel):
                 logger.warning(f"未找到ID为 {team_id} 的球队")
                 return {}
 
-            # 获取球队所有球员的投篮数据
+            # 获取球队所有球员的投篮数据(每名球员只访问索引命中的事件)
             if hasattr(target_team, 'players'):
                 for player in target_team.players:
                     if player.played == "1":  # 只处理上场球员
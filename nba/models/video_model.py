@@ -40,19 +40,24 @@ class VideoAsset(BaseModel):
     uuid: str
     qualities: Dict[str, VideoQuality]
 
-    def get_preferred_quality(self, quality: str = 'hd') -> Optional[VideoQuality]:
-        """获取指定质量的视频信息，如果不存在则返回可用的最高质量"""
+    def resolve_quality(self, quality: str = 'hd') -> Optional[str]:
+        """返回实际使用的清晰度，指定质量不存在时返回可用的最高质量"""
         if quality in self.qualities:
-            return self.qualities[quality]
+            return quality
 
         # 如果请求的质量不可用，按优先级尝试其他质量
         quality_priority = ['hd', 'md', 'sd']
         for q in quality_priority:
             if q in self.qualities:
-                return self.qualities[q]
+                return q
 
         return None
 
+    def get_preferred_quality(self, quality: str = 'hd') -> Optional[VideoQuality]:
+        """获取指定质量的视频信息，如果不存在则返回可用的最高质量"""
+        resolved = self.resolve_quality(quality)
+        return self.qualities[resolved] if resolved else None
+
     @property
     def duration(self) -> float:
         """获取视频时长（优先使用高清时长）"""
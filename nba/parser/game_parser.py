@@ -1,7 +1,7 @@
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, List
 from datetime import datetime
 import re
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 from nba.fetcher.game_fetcher import GameDataResponse
 from nba.models.game_model import (
     Game, GameData, GameStatusEnum, Arena, Official, PeriodScore,
@@ -12,6 +12,7 @@ from nba.models.game_model import (
     ShotEvent, GameEvent, TeamStatistics, PlayerStatistics, EjectionEvent,
     TeamRivalryInfo  # 添加对新模型的引用
 )
+from config import NBAConfig
 from utils.logger_handler import AppLogger
 
 
@@ -37,8 +38,26 @@ class GameDataParser:
         "game": GameEvent
     }
 
-    def __init__(self):
+    # 团队事件类型到事件类的映射(可信快速路径使用)
+    TEAM_EVENT_TYPE_MAP = {
+        "foul": FoulEvent,
+        "turnover": TurnoverEvent,
+        "rebound": ReboundEvent,
+        "violation": ViolationEvent
+    }
+
+    # 每个事件类一个列表校验器，按类批量校验(类级共享，首次使用时创建)
+    _list_adapters: Dict[type, TypeAdapter] = {}
+
+    def __init__(self, trusted_playbyplay: Optional[bool] = None):
+        """初始化解析器
+
+        Args:
+            trusted_playbyplay: 是否对回放数据使用可信快速路径(按事件类批量校验)，默认读取配置
+        """
         self.logger = AppLogger.get_logger(__name__, app_name='nba')
+        self.trusted_playbyplay = (NBAConfig.PARSER.TRUSTED_PLAYBYPLAY
+                                   if trusted_playbyplay is None else trusted_playbyplay)
 
     def parse_game_data(self, data: Union[Dict[str, Any], GameDataResponse]) -> Optional[Game]:
         """解析完整比赛数据
@@ -636,15 +655,9 @@ class GameDataParser:
                 return None
 
             # 4. 处理事件
-            actions = []
-            for action_data in actions_data:
-                try:
-                    event = self._process_event(action_data)
-                    if event:
-                        actions.append(event)
-                except Exception as e:
-                    self.logger.error(f"处理事件时出错: {e}, 事件数据: {action_data}", exc_info=True)
-                    continue
+            actions = self._parse_actions_trusted(actions_data) if self.trusted_playbyplay else None
+            if actions is None:
+                actions = self._parse_actions_validated(actions_data)
 
             self.logger.info(f"成功解析 {len(actions)} 个事件")
 
@@ -661,6 +674,129 @@ class GameDataParser:
             self.logger.error(f"解析回放数据时出错: {e}", exc_info=True)
             return None
 
+    def _parse_actions_validated(self, actions_data: List[Dict[str, Any]]) -> List[BaseEvent]:
+        """逐事件完整校验解析"""
+        actions = []
+        for action_data in actions_data:
+            try:
+                event = self._process_event(action_data)
+                if event:
+                    actions.append(event)
+            except Exception as e:
+                self.logger.error(f"处理事件时出错: {e}, 事件数据: {action_data}", exc_info=True)
+                continue
+        return actions
+
+    def _parse_actions_trusted(self, actions_data: List[Dict[str, Any]]) -> Optional[List[BaseEvent]]:
+        """可信快速路径: 按事件类分组，每组一次列表校验，不修改输入数据
+
+        pydantic-core 的校验本身很快，逐事件解析的开销主要在每个事件一次的Python调用、
+        字典修改和异常处理上。结构良好的CDN数据在这里每类事件只进入校验器一次；
+        任一事件缺少必需字段或任一分组校验失败时返回None，由调用方对整场比赛回退到
+        逐事件校验(跳过坏事件并记录日志)。
+
+        Returns:
+            Optional[List[BaseEvent]]: 按原始顺序排列的事件；批量校验失败时为None
+        """
+        groups: Dict[type, tuple] = {}
+        for position, action_data in enumerate(actions_data):
+            try:
+                resolved = self._resolve_event(action_data)
+            except Exception as e:
+                self.logger.warning(f"事件预处理失败，回退到逐事件校验 | position={position} | "
+                                    f"error={type(e).__name__}: {e}")
+                return None
+            if resolved is None:
+                continue
+            event_class, values = resolved
+            positions, group_values = groups.setdefault(event_class, ([], []))
+            positions.append(position)
+            group_values.append(values)
+
+        events: List[Optional[BaseEvent]] = [None] * len(actions_data)
+        for event_class, (positions, group_values) in groups.items():
+            adapter = self._list_adapters.get(event_class)
+            if adapter is None:
+                adapter = self._list_adapters[event_class] = TypeAdapter(List[event_class])
+            try:
+                validated = adapter.validate_python(group_values)
+            except ValidationError as ve:
+                self.logger.warning(f"批量校验失败，回退到逐事件校验 | event_class={event_class.__name__} | "
+                                    f"errors={ve.error_count()}")
+                return None
+            except Exception as e:
+                self.logger.warning(f"批量校验出错，回退到逐事件校验 | event_class={event_class.__name__} | "
+                                    f"error={type(e).__name__}: {e}")
+                return None
+            for position, event in zip(positions, validated):
+                events[position] = event
+
+        return [event for event in events if event is not None]
+
+    def _resolve_event(self, event_data: Dict[str, Any]) -> Optional[tuple]:
+        """确定事件类并补全默认字段，与 _process_event 的处理规则一致，但返回新字典
+
+        缺少必需字段(如团队篮板的subType、换人事件的playerName)时与 _process_event 一样抛出KeyError，
+        由 _parse_actions_trusted 回退到逐事件校验。
+
+        Returns:
+            Optional[tuple]: (事件类, 字段字典)，缺少actionType时为None
+        """
+        event_type = event_data.get('actionType')
+        if event_type is None:
+            return None
+
+        # 团队事件
+        if self._is_team_event(event_type, event_data):
+            values = {**event_data, 'playerName': 'TEAM', 'playerNameI': 'TEAM'}
+            if event_type == 'turnover':
+                values['turnoverTotal'] = 1
+            elif event_type == 'rebound':
+                values.update({
+                    'reboundTotal': 1,
+                    'reboundDefensiveTotal': 1 if values['subType'] == 'defensive' else 0,
+                    'reboundOffensiveTotal': 1 if values['subType'] == 'offensive' else 0
+                })
+            return self.TEAM_EVENT_TYPE_MAP.get(event_type, BaseEvent), values
+
+        if event_type in ['2pt', '3pt']:
+            if 'shotResult' in event_data:
+                return ShotEvent, event_data
+            return ShotEvent, {**event_data, 'shotResult': 'Made' if 'pointsTotal' in event_data else 'Missed'}
+
+        if event_type == 'steal':
+            return StealEvent, event_data if 'subType' in event_data else {**event_data, 'subType': ""}
+
+        if event_type == 'turnover':
+            values = event_data
+            if 'stealPlayerName' in event_data and 'stealPersonId' not in event_data:
+                values = {**values, 'stealPersonId': None}
+            if 'turnoverTotal' not in values:
+                values = {**values, 'turnoverTotal': 1}
+            return TurnoverEvent, values
+
+        if event_type == 'rebound':
+            if 'shotActionNumber' in event_data:
+                return ReboundEvent, event_data
+            return ReboundEvent, {**event_data, 'shotActionNumber': None}
+
+        if event_type == 'substitution':
+            return SubstitutionEvent, {
+                **event_data,
+                'incomingPlayerName': event_data['playerName'],
+                'incomingPlayerNameI': event_data['playerNameI'],
+                'incomingPersonId': event_data['personId'],
+                'outgoingPlayerName': event_data['playerName'],
+                'outgoingPlayerNameI': event_data['playerNameI'],
+                'outgoingPersonId': event_data['personId']
+            }
+
+        event_class = self.EVENT_TYPE_MAP.get(event_type)
+        if not event_class:
+            self.logger.warning(f"未知事件类型: {event_type}")
+            return BaseEvent, event_data
+        return event_class, event_data
+
     def _get_event_class(self, event_type: str) -> Optional[type]:
         """
         根据事件类型获取对应的事件类
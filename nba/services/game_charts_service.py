@@ -1,9 +1,19 @@
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+import multiprocessing
+import os
 import time
 import threading
-from typing import Optional, Dict, Any, Tuple, Union, List
+from typing import Optional, Dict, Any, Tuple, Union, List, Iterable
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
 from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import Normalize
 from matplotlib.patches import Rectangle, Circle, Arc
 from matplotlib.lines import Line2D
 from PIL import Image, ImageDraw, ImageEnhance
@@ -12,7 +22,10 @@ from io import BytesIO
 from pathlib import Path
 from scipy.spatial import cKDTree
 
+from database.repositories.playbyplay_repository import PlayByPlayRepository
+from database.repositories.schedule_repository import ScheduleRepository
 from nba.models.game_model import Game
+from utils.http_handler import RateLimitedAdapter
 from utils.logger_handler import AppLogger
 from config import NBAConfig
 
@@ -37,18 +50,31 @@ class ChartConfig:
     paint_color: str = '#FDB927'  # 禁区颜色
     paint_alpha: float = 0.3  # 禁区透明度
 
+    # 球场底图设置
+    court_template_cache: bool = True  # 复用按配置预渲染的球场底图，避免每张图重绘球场
+
     # 图像缓存设置
     cache_duration: int = 24 * 60 * 60  # 缓存有效期（秒），默认24小时
 
     # 边框设置
     marker_border_width: float = 0.5  # 头像边框宽度
 
+    # 投篮标记渲染方式: "raster" 在一个图层上合成所有头像，"matplotlib" 每个投篮一个inset_axes
+    marker_backend: str = "raster"
+
+    # 赛季投篮热图设置
+    hexbin_gridsize: int = 30  # 球场宽度方向的六边形数量
+    hexbin_min_attempts: int = 2  # 出手次数少于此值的区域不显示
+    heatmap_cmap: str = 'RdYlGn'  # 命中率配色
+
     def __post_init__(self) -> None:
         """配置验证与初始化"""
         if self.dpi < 72 or self.dpi > 600:
             raise ValueError("DPI must be between 72 and 600")
         if self.scale_factor < 0.5 or self.scale_factor > 5.0:
             raise ValueError("Scale factor must be between 0.5 and 5.0")
+        if self.marker_backend not in ("raster", "matplotlib"):
+            raise ValueError("Marker backend must be 'raster' or 'matplotlib'")
 
         # 设定中文字体
         plt.rcParams['font.sans-serif'] = ['SimHei']  # 使用黑体
@@ -94,8 +120,160 @@ class ImageCache:
         self.processed_cache[key] = (image, time.time())
 
 
+class HeadshotStore:
+    """球员头像磁盘缓存
+
+    原始PNG保存在 raw/{player_id}.png，处理后的版本保存在
+    processed/{player_id}_{size}_{circle|square}.png:
+    1. 文件修改时间为写入时间，用于判断是否过期
+    2. 文件访问时间记录最近一次读取，重启后据此恢复LRU顺序
+    3. 总大小超过上限时淘汰最近最少使用的文件
+    """
+
+    def __init__(self, root: Optional[Path] = None,
+                 max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[int] = None) -> None:
+        self.root = Path(root or NBAConfig.PATHS.HEADSHOT_CACHE_DIR)
+        self.max_bytes = NBAConfig.CACHE.HEADSHOT_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttl_seconds = NBAConfig.CACHE.HEADSHOT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.raw_dir = self.root / "raw"
+        self.processed_dir = self.root / "processed"
+        self.raw_dir.mkdir(parents=True, exist_ok=True)
+        self.processed_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # LRU顺序: 最久未使用的在前 {路径: 字节数}
+        self._entries: "OrderedDict[Path, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """扫描缓存目录，按访问时间重建LRU顺序"""
+        files = []
+        for directory in (self.raw_dir, self.processed_dir):
+            for path in directory.glob("*.png"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_atime, path, stat.st_size))
+        files.sort(key=lambda item: item[0])
+        with self._lock:
+            for _, path, size in files:
+                self._entries[path] = size
+                self._total_bytes += size
+            self._evict_locked()
+
+    def raw_path(self, player_id: int) -> Path:
+        return self.raw_dir / f"{player_id}.png"
+
+    def processed_path(self, player_id: int, size: int, is_circle: bool) -> Path:
+        return self.processed_dir / f"{player_id}_{size}_{'circle' if is_circle else 'square'}.png"
+
+    def has_raw(self, player_id: int) -> bool:
+        """是否有未过期的原始头像"""
+        return self._is_fresh(self.raw_path(player_id))
+
+    def get_raw(self, player_id: int) -> Optional[bytes]:
+        """读取原始头像数据"""
+        return self._read(self.raw_path(player_id))
+
+    def set_raw(self, player_id: int, data: bytes) -> None:
+        """写入原始头像数据"""
+        self._write(self.raw_path(player_id), data)
+
+    def get_processed(self, player_id: int, size: int, is_circle: bool) -> Optional[Image.Image]:
+        """读取处理后的头像"""
+        data = self._read(self.processed_path(player_id, size, is_circle))
+        if data is None:
+            return None
+        try:
+            image = Image.open(BytesIO(data))
+            image.load()
+            return image
+        except Exception:
+            return None
+
+    def set_processed(self, player_id: int, size: int, is_circle: bool, image: Image.Image) -> None:
+        """写入处理后的头像"""
+        buffer = BytesIO()
+        image.save(buffer, format='PNG')
+        self._write(self.processed_path(player_id, size, is_circle), buffer.getvalue())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"files": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes})
+        return stats
+
+    def clear(self) -> None:
+        """删除所有缓存文件"""
+        with self._lock:
+            for path in self._entries:
+                path.unlink(missing_ok=True)
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _is_fresh(self, path: Path) -> bool:
+        try:
+            return time.time() - path.stat().st_mtime < self.ttl_seconds
+        except OSError:
+            return False
+
+    def _read(self, path: Path) -> Optional[bytes]:
+        if not self._is_fresh(path):
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        try:
+            data = path.read_bytes()
+            # 只更新访问时间，修改时间保持为写入时间
+            os.utime(path, (time.time(), path.stat().st_mtime))
+        except OSError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self._stats["hits"] += 1
+            if path in self._entries:
+                self._entries.move_to_end(path)
+        return data
+
+    def _write(self, path: Path, data: bytes) -> None:
+        # 先写临时文件再替换，并发读取不会读到半个文件
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self._total_bytes += len(data)
+            self._stats["writes"] += 1
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """淘汰最近最少使用的文件直到不超过上限(调用方持有锁)"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            path, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self._stats["evictions"] += 1
+            path.unlink(missing_ok=True)
+
+
 class PlayerImageManager:
-    """球员图像管理器 - 处理球员头像的获取、处理和缓存"""
+    """球员图像管理器 - 处理球员头像的获取、处理和缓存
+
+    查找顺序: 内存缓存 -> 磁盘缓存(HeadshotStore) -> 网络下载。
+    渲染前可调用 prefetch 并发下载缺失的头像，绘图过程中不再等待网络。
+    """
 
     # 使用单例模式共享缓存
     _instance = None
@@ -106,9 +284,22 @@ class PlayerImageManager:
             if cls._instance is None:
                 cls._instance = super(PlayerImageManager, cls).__new__(cls)
                 cls._instance.cache = ImageCache(cache_duration)
-                cls._instance.session = requests.Session()  # 重用HTTP连接
+                cls._instance.store = HeadshotStore()
+                cls._instance.session = cls._create_session()  # 重用HTTP连接
+                cls._instance.logger = AppLogger.get_logger(__name__, app_name='nba')
+                cls._instance._failures = {}  # 下载失败的球员ID -> 失败时间
         return cls._instance
 
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """创建连接池足够并发预取的会话，请求计入共享的主机令牌桶"""
+        session = requests.Session()
+        pool_size = NBAConfig.CACHE.HEADSHOT_PREFETCH_WORKERS
+        adapter = RateLimitedAdapter(pool_connections=2, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
     def get_player_headshot_url(self, player_id: int, small: bool = False) -> str:
         """获取NBA官方球员头像URL"""
         if small:
@@ -134,32 +325,118 @@ class PlayerImageManager:
         if processed_image:
             return processed_image
 
-        # 获取原始图像
-        image_url = self.get_player_headshot_url(player_id, small=True)
-        raw_data = self.cache.get_raw(image_url)
+        processed_image = self.store.get_processed(player_id, size, is_circle)
+        if processed_image:
+            self.cache.set_processed(cache_key, processed_image)
+            return processed_image
 
+        # 获取原始图像
+        raw_data = self.get_raw_image(player_id)
         if raw_data is None:
-            try:
-                response = self.session.get(image_url)
-                raw_data = response.content
-                self.cache.set_raw(image_url, raw_data)
-            except Exception as e:
-                print(f"获取球员图像失败: {e}")
-                # 返回一个占位图像
-                placeholder = Image.new('RGBA', (size, size), (200, 200, 200, 255))
-                return placeholder
+            # 返回一个占位图像
+            placeholder = Image.new('RGBA', (size, size), (200, 200, 200, 255))
+            return placeholder
 
         # 处理图像
         try:
             img = Image.open(BytesIO(raw_data))
             processed = self._process_image(img, size, is_circle)
             self.cache.set_processed(cache_key, processed)
-            return processed
         except Exception as e:
             print(f"处理球员图像失败: {e}")
             placeholder = Image.new('RGBA', (size, size), (200, 200, 200, 255))
             return placeholder
 
+        try:
+            self.store.set_processed(player_id, size, is_circle, processed)
+        except OSError as e:
+            self.logger.warning(f"写入头像磁盘缓存失败: player_id={player_id}, error={e}")
+        return processed
+
+    def get_raw_image(self, player_id: int) -> Optional[bytes]:
+        """获取原始头像数据，依次查找内存、磁盘和网络
+
+        Returns:
+            Optional[bytes]: PNG数据，下载失败时返回None
+        """
+        image_url = self.get_player_headshot_url(player_id, small=True)
+        raw_data = self.cache.get_raw(image_url)
+        if raw_data is not None:
+            return raw_data
+
+        raw_data = self.store.get_raw(player_id)
+        if raw_data is not None:
+            self.cache.set_raw(image_url, raw_data)
+            return raw_data
+
+        return self._download(player_id)
+
+    def prefetch(self, player_ids: Iterable[int], sizes: Iterable[int] = (),
+                 is_circle: bool = True, max_workers: Optional[int] = None) -> Dict[str, int]:
+        """并发下载缺失的球员头像，并可预先生成指定尺寸的处理版本
+
+        Args:
+            player_ids: 球员ID
+            sizes: 需要预先生成的头像尺寸(像素)
+            is_circle: 预生成的是否为圆形头像
+            max_workers: 并发下载数，默认使用配置
+
+        Returns:
+            Dict[str, int]: 球员数、下载数、下载失败数和预生成的图像数
+        """
+        player_ids = list(dict.fromkeys(player_ids))
+        missing = [
+            player_id for player_id in player_ids
+            if self.cache.get_raw(self.get_player_headshot_url(player_id, small=True)) is None
+            and not self.store.has_raw(player_id)
+        ]
+
+        downloaded = 0
+        if missing:
+            workers = min(max_workers or NBAConfig.CACHE.HEADSHOT_PREFETCH_WORKERS, len(missing))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="headshot") as executor:
+                downloaded = sum(1 for data in executor.map(self._download, missing) if data is not None)
+
+        processed = 0
+        for player_id in player_ids:
+            for size in sizes:
+                self.get_player_image(player_id, size=size, is_circle=is_circle)
+                processed += 1
+
+        result = {
+            "players": len(player_ids),
+            "downloaded": downloaded,
+            "failed": len(missing) - downloaded,
+            "processed": processed,
+        }
+        if missing:
+            self.logger.info(f"球员头像预取完成: {result}")
+        return result
+
+    def _download(self, player_id: int) -> Optional[bytes]:
+        """下载原始头像并写入内存和磁盘缓存，近期失败过的球员直接跳过"""
+        failed_at = self._failures.get(player_id)
+        if failed_at and time.time() - failed_at < NBAConfig.CACHE.HEADSHOT_FAILURE_RETRY_SECONDS:
+            return None
+
+        image_url = self.get_player_headshot_url(player_id, small=True)
+        try:
+            response = self.session.get(image_url, timeout=10)
+            response.raise_for_status()
+            raw_data = response.content
+        except Exception as e:
+            self._failures[player_id] = time.time()
+            self.logger.warning(f"获取球员图像失败: player_id={player_id}, error={e}")
+            return None
+
+        self._failures.pop(player_id, None)
+        self.cache.set_raw(image_url, raw_data)
+        try:
+            self.store.set_raw(player_id, raw_data)
+        except OSError as e:
+            self.logger.warning(f"写入头像磁盘缓存失败: player_id={player_id}, error={e}")
+        return raw_data
+
     def _process_image(self, img: Image.Image, target_size: int, is_circle: bool = True) -> Image.Image:
         """处理球员头像（裁剪、缩放、圆形处理）"""
         # 优化的图像处理流程
@@ -207,23 +484,108 @@ class PlayerImageManager:
 class CourtRenderer:
     """NBA球场渲染器 - 专注于绘制球场元素"""
 
+    # 球场坐标范围 (left, right, bottom, top)，y轴向下为正
+    COURT_EXTENT = (-250, 250, 422.5, -47.5)
+
+    # 预渲染球场底图缓存: {配置键: RGBA数组}
+    _court_templates: Dict[Tuple, np.ndarray] = {}
+    _template_lock = threading.Lock()
+
     @staticmethod
     def draw_court(config: ChartConfig) -> Tuple[plt.Figure, plt.Axes]:
         """绘制NBA半场
 
+        启用 config.court_template_cache 时，球场只在首次使用某组配置时
+        矢量绘制一次并栅格化，之后直接以图像形式铺在坐标轴上。
+
         Args:
             config: 图表配置对象
 
         Returns:
             fig, axis: matplotlib图表对象和轴对象
         """
+        fig = plt.figure(figsize=CourtRenderer._figure_size(config), dpi=config.dpi)
+        axis = fig.add_subplot(111)
+
+        if config.court_template_cache:
+            axis.add_artist(_CourtBackground(config))
+        else:
+            CourtRenderer._draw_court_elements(axis, config)
+
+        CourtRenderer._setup_court_axis(axis)
+        return fig, axis
+
+    @staticmethod
+    def get_court_template(config: ChartConfig) -> np.ndarray:
+        """获取预渲染的球场底图(坐标轴区域的RGBA像素)
+
+        Args:
+            config: 图表配置对象
+
+        Returns:
+            np.ndarray: 形状为 (高, 宽, 4) 的uint8数组，多个图表共享，不应修改
+        """
+        key = CourtRenderer._template_key(config)
+        template = CourtRenderer._court_templates.get(key)
+        if template is not None:
+            return template
+
+        with CourtRenderer._template_lock:
+            template = CourtRenderer._court_templates.get(key)
+            if template is None:
+                template = CourtRenderer._render_court_template(config)
+                CourtRenderer._court_templates[key] = template
+        return template
+
+    @staticmethod
+    def clear_court_templates() -> None:
+        """清空预渲染的球场底图缓存"""
+        with CourtRenderer._template_lock:
+            CourtRenderer._court_templates.clear()
+
+    @staticmethod
+    def _template_key(config: ChartConfig) -> Tuple:
+        """影响球场外观的配置项"""
+        return (config.dpi, config.scale_factor, config.court_bg_color,
+                config.paint_color, config.paint_alpha)
+
+    @staticmethod
+    def _figure_size(config: ChartConfig) -> Tuple[float, float]:
         base_width, base_height = 12, 12
-        scaled_width = base_width * config.scale_factor
-        scaled_height = base_height * config.scale_factor
+        return base_width * config.scale_factor, base_height * config.scale_factor
 
-        fig = plt.figure(figsize=(scaled_width, scaled_height), dpi=config.dpi)
+    @staticmethod
+    def _render_court_template(config: ChartConfig) -> np.ndarray:
+        """在独立的Agg画布上绘制球场，截取坐标轴区域的像素"""
+        fig = Figure(figsize=CourtRenderer._figure_size(config), dpi=config.dpi)
+        canvas = FigureCanvasAgg(fig)
         axis = fig.add_subplot(111)
+        CourtRenderer._draw_court_elements(axis, config)
+        CourtRenderer._setup_court_axis(axis)
+        # 边框由使用底图的坐标轴自己绘制
+        axis.set_axis_off()
+
+        canvas.draw()
+        pixels = np.asarray(canvas.buffer_rgba())
+        height = pixels.shape[0]
+        x0, y0, x1, y1 = axis.get_window_extent().extents
+        # 显示坐标原点在左下角，像素数组原点在左上角
+        template = pixels[int(round(height - y1)):int(round(height - y0)),
+                          int(round(x0)):int(round(x1))].copy()
+        return template
 
+    @staticmethod
+    def _setup_court_axis(axis: Axes) -> None:
+        """设置坐标轴范围并隐藏刻度"""
+        left, right, bottom, top = CourtRenderer.COURT_EXTENT
+        axis.set_xlim(left, right)
+        axis.set_ylim(bottom, top)
+        axis.set_xticks([])
+        axis.set_yticks([])
+
+    @staticmethod
+    def _draw_court_elements(axis: Axes, config: ChartConfig) -> None:
+        """在坐标轴上矢量绘制球场各元素"""
         # 基础线条宽度
         base_line_width = 2 * config.scale_factor
 
@@ -323,14 +685,6 @@ class CourtRenderer:
         axis.add_patch(center_outer_arc)
         axis.add_patch(center_inner_arc)
 
-        # 设置坐标轴
-        axis.set_xlim(-250, 250)
-        axis.set_ylim(422.5, -47.5)
-        axis.set_xticks([])
-        axis.set_yticks([])
-
-        return fig, axis
-
     @staticmethod
     def add_player_portrait(axis: Axes, player_id: int,
                           position: Tuple[float, float] = (0.9995, 0.002),
@@ -369,8 +723,200 @@ class CourtRenderer:
             print(f"添加球员肖像出错: {str(e)}")
 
 
+class _CourtBackground(Artist):
+    """把预渲染的球场底图按像素直接贴到坐标轴区域
+
+    不经过imshow的重采样流程，绘制开销只有一次像素拷贝；
+    输出DPI与配置不同时(如交互显示)按实际DPI取对应的底图。
+    """
+
+    zorder = 0
+
+    def __init__(self, config: ChartConfig) -> None:
+        super().__init__()
+        self.config = config
+
+    def draw(self, renderer) -> None:
+        if not self.get_visible():
+            return
+        config = self.config
+        if renderer.dpi != config.dpi:
+            config = replace(config, dpi=int(round(renderer.dpi)))
+        template = CourtRenderer.get_court_template(config)
+
+        bbox = self.axes.bbox
+        size = (int(round(bbox.width)), int(round(bbox.height)))
+        if size != (template.shape[1], template.shape[0]):
+            # 坐标轴被调整过大小时缩放底图
+            template = np.asarray(Image.fromarray(template).resize(size, Image.Resampling.LANCZOS))
+        gc = renderer.new_gc()
+        renderer.draw_image(gc, int(round(bbox.x0)), int(round(bbox.y0)), template[::-1])
+        gc.restore()
+        self.stale = False
+
+
+# 投篮结构化数组的字段
+SHOT_DTYPE = np.dtype([
+    ('x', 'f8'),
+    ('y', 'f8'),
+    ('player_id', 'i8'),
+    ('made', '?'),
+    ('assisted', '?'),
+    ('period', 'i2'),
+])
+
+
 class ShotProcessor:
-    """投篮数据处理器 - 处理和分析投篮数据"""
+    """投篮数据处理器 - 处理和分析投篮数据
+
+    内部以结构化NumPy数组(SHOT_DTYPE)表示投篮，筛选、标记大小和透明度都是向量化计算，
+    单场比赛和整个赛季数万次投篮使用同一套处理流程。
+    """
+
+    @staticmethod
+    def shots_to_array(shots: Iterable[Dict[str, Any]], player_id: Optional[int] = None) -> np.ndarray:
+        """把投篮字典转换为结构化数组，丢弃没有坐标或球员ID的投篮
+
+        Args:
+            shots: Game.get_shot_data 格式的投篮字典
+            player_id: 指定时覆盖每条记录中的player_id(球队数据按球员分组时使用)
+
+        Returns:
+            np.ndarray: SHOT_DTYPE结构化数组
+        """
+        rows = []
+        for shot in shots:
+            x, y = shot.get('x_legacy'), shot.get('y_legacy')
+            shooter = player_id if player_id is not None else shot.get('player_id')
+            if x is None or y is None or shooter is None:
+                continue
+            rows.append((x, y, shooter, shot.get('shot_result') == "Made",
+                         bool(shot.get('assisted')), shot.get('period') or 0))
+        return np.array(rows, dtype=SHOT_DTYPE)
+
+    @staticmethod
+    def filter_shots(shots: np.ndarray, shot_outcome: str = "all",
+                     player_ids: Optional[Iterable[int]] = None,
+                     periods: Optional[Iterable[int]] = None,
+                     assisted: Optional[bool] = None) -> np.ndarray:
+        """按结果、球员、节次和是否助攻筛选投篮
+
+        Args:
+            shots: SHOT_DTYPE结构化数组
+            shot_outcome: "made_only"仅命中，"all"全部
+            player_ids: 只保留这些球员的投篮
+            periods: 只保留这些节次的投篮
+            assisted: True仅被助攻的投篮，False仅非助攻投篮
+
+        Returns:
+            np.ndarray: 筛选后的数组
+        """
+        mask = np.ones(len(shots), dtype=bool)
+        if shot_outcome == "made_only":
+            mask &= shots['made']
+        if player_ids is not None:
+            mask &= np.isin(shots['player_id'], np.fromiter(player_ids, dtype='i8'))
+        if periods is not None:
+            mask &= np.isin(shots['period'], np.fromiter(periods, dtype='i2'))
+        if assisted is not None:
+            mask &= shots['assisted'] == assisted
+        return shots[mask]
+
+    @staticmethod
+    def marker_sizes(x: np.ndarray, y: np.ndarray, config: ChartConfig) -> np.ndarray:
+        """基于最近邻距离向量化计算标记大小
+
+        距离小于理想间距的点按距离比例缩小(不小于最小尺寸)，孤立点保持基础大小。
+
+        Args:
+            x: 投篮x坐标
+            y: 投篮y坐标
+            config: 图表配置
+
+        Returns:
+            np.ndarray: 每个点的标记大小
+        """
+        count = len(x)
+        if count <= 1:
+            return np.full(count, config.marker_base_size)
+
+        points = np.column_stack((x, y)).astype(float)
+        distances, _ = cKDTree(points).query(points, k=2, workers=-1)  # k=2因为最近的点是自己
+        nearest = distances[:, 1]
+
+        min_ratio = config.marker_min_size / config.marker_base_size
+        scaled = config.marker_base_size * np.maximum(min_ratio, nearest / config.ideal_marker_distance)
+        return np.where(nearest < config.ideal_marker_distance, scaled, config.marker_base_size)
+
+    @staticmethod
+    def marker_alphas(made: np.ndarray) -> np.ndarray:
+        """命中的投篮设置更高的不透明度"""
+        return np.where(made, 0.95, 0.75)
+
+    @staticmethod
+    def to_marker_dicts(shots: np.ndarray, config: ChartConfig) -> List[Dict[str, Any]]:
+        """计算标记大小和透明度，转换为渲染器使用的投篮点字典"""
+        sizes = ShotProcessor.marker_sizes(shots['x'], shots['y'], config)
+        alphas = ShotProcessor.marker_alphas(shots['made'])
+        return [
+            {'player_id': player_id, 'x': x, 'y': y, 'is_made': made, 'size': size, 'alpha': alpha}
+            for player_id, x, y, made, size, alpha in zip(
+                shots['player_id'].tolist(), shots['x'].tolist(), shots['y'].tolist(),
+                shots['made'].tolist(), sizes.tolist(), alphas.tolist())
+        ]
+
+    @staticmethod
+    def hexbin_aggregate(x: np.ndarray, y: np.ndarray, made: np.ndarray,
+                         gridsize: int = 30,
+                         extent: Tuple[float, float, float, float] = (-250, 250, -47.5, 422.5)) -> Dict[str, Any]:
+        """把投篮聚合到六边形网格
+
+        六边形中心位于两组相互错开的矩形格点上，每个投篮归入距离最近的中心。
+
+        Args:
+            x: 投篮x坐标
+            y: 投篮y坐标
+            made: 是否命中
+            gridsize: x方向的六边形数量
+            extent: 坐标范围 (xmin, xmax, ymin, ymax)
+
+        Returns:
+            Dict: x/y为各六边形中心，attempts/makes为出手和命中数，radius为六边形外接圆半径
+        """
+        xmin, xmax, ymin, _ = extent
+        sx = (xmax - xmin) / gridsize
+        sy = sx * np.sqrt(3)
+        radius = sx / np.sqrt(3)
+        if len(x) == 0:
+            empty = np.empty(0)
+            return {'x': empty, 'y': empty, 'attempts': empty.astype(int), 'makes': empty.astype(int), 'radius': radius}
+
+        gx = (np.asarray(x, dtype=float) - xmin) / sx
+        gy = (np.asarray(y, dtype=float) - ymin) / sy
+
+        # 候选中心1: 整数格点；候选中心2: 偏移半格的格点
+        ix1, iy1 = np.round(gx), np.round(gy)
+        ix2, iy2 = np.floor(gx) + 0.5, np.floor(gy) + 0.5
+        d1 = ((gx - ix1) * sx) ** 2 + ((gy - iy1) * sy) ** 2
+        d2 = ((gx - ix2) * sx) ** 2 + ((gy - iy2) * sy) ** 2
+        use_first = d1 <= d2
+        cx = np.where(use_first, ix1, ix2)
+        cy = np.where(use_first, iy1, iy2)
+
+        # 中心坐标以半格为单位编码后分组计数
+        codes = np.column_stack((np.rint(cx * 2), np.rint(cy * 2))).astype(np.int64)
+        unique_codes, inverse = np.unique(codes, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        attempts = np.bincount(inverse, minlength=len(unique_codes))
+        makes = np.bincount(inverse, weights=np.asarray(made, dtype=float), minlength=len(unique_codes))
+
+        return {
+            'x': xmin + unique_codes[:, 0] / 2 * sx,
+            'y': ymin + unique_codes[:, 1] / 2 * sy,
+            'attempts': attempts,
+            'makes': makes.astype(int),
+            'radius': radius,
+        }
 
     @staticmethod
     def calculate_marker_sizes(coordinates: List[Tuple[float, float]], config: ChartConfig) -> List[float]:
@@ -383,31 +929,10 @@ class ShotProcessor:
         Returns:
             每个点对应的标记大小列表
         """
-        if len(coordinates) <= 1:
-            return [config.marker_base_size] * len(coordinates)
-
-        # 构建KD树
-        tree = cKDTree(coordinates)
-
-        # 查询每个点的最近邻点
-        distances, _ = tree.query(coordinates, k=2)  # k=2因为最近的点是自己
-        nearest_distances = distances[:, 1]  # 第二近的点距离
-
-        # 计算每个点的标记大小
-        marker_sizes = []
-        for dist in nearest_distances:
-            if dist < config.ideal_marker_distance:
-                # 根据距离比例平滑缩放
-                scale_factor = max(config.marker_min_size / config.marker_base_size,
-                                  dist / config.ideal_marker_distance)
-                size = config.marker_base_size * scale_factor
-            else:
-                # 孤立点保持原始大小
-                size = config.marker_base_size
-
-            marker_sizes.append(size)
-
-        return marker_sizes
+        if not coordinates:
+            return []
+        points = np.asarray(coordinates, dtype=float)
+        return ShotProcessor.marker_sizes(points[:, 0], points[:, 1], config).tolist()
 
     @staticmethod
     def prepare_team_shots_data(team_shots: Dict[int, List[Dict[str, Any]]],
@@ -426,38 +951,10 @@ class ShotProcessor:
         if not config:
             config = ChartConfig()
 
-        # 收集投篮数据
-        all_shots_data = []
-        for player_id, shots in team_shots.items():
-            for shot in shots:
-                shot_result = shot.get('shot_result')
-                if shot_outcome == "made_only" and shot_result != "Made":
-                    continue
-
-                x = shot.get('x_legacy')
-                y = shot.get('y_legacy')
-                if x is not None and y is not None:
-                    all_shots_data.append({
-                        'player_id': player_id,
-                        'x': float(x),
-                        'y': float(y),
-                        'is_made': shot_result == "Made"
-                    })
-
-        if len(all_shots_data) < 2:
-            return all_shots_data
-
-        # 提取坐标计算标记大小
-        coordinates = [(shot['x'], shot['y']) for shot in all_shots_data]
-        marker_sizes = ShotProcessor.calculate_marker_sizes(coordinates, config)
-
-        # 合并标记大小到投篮数据
-        for i, shot in enumerate(all_shots_data):
-            shot['size'] = marker_sizes[i]
-            # 命中的投篮设置更高的不透明度
-            shot['alpha'] = 0.95 if shot['is_made'] else 0.75
-
-        return all_shots_data
+        arrays = [ShotProcessor.shots_to_array(shots, player_id) for player_id, shots in team_shots.items()]
+        shots = np.concatenate(arrays) if arrays else np.empty(0, dtype=SHOT_DTYPE)
+        shots = ShotProcessor.filter_shots(shots, shot_outcome)
+        return ShotProcessor.to_marker_dicts(shots, config)
 
     @staticmethod
     def prepare_player_shots_data(player_shots: List[Dict[str, Any]],
@@ -476,37 +973,8 @@ class ShotProcessor:
         if not config:
             config = ChartConfig()
 
-        # 收集投篮数据
-        all_shots_data = []
-        for shot in player_shots:
-            shot_result = shot.get('shot_result')
-            if shot_outcome == "made_only" and shot_result != "Made":
-                continue
-
-            x = shot.get('x_legacy')
-            y = shot.get('y_legacy')
-            player_id = shot.get('player_id')
-            if x is not None and y is not None and player_id is not None:
-                all_shots_data.append({
-                    'player_id': player_id,
-                    'x': float(x),
-                    'y': float(y),
-                    'is_made': shot_result == "Made"
-                })
-
-        if len(all_shots_data) < 2:
-            return all_shots_data
-
-        # 提取坐标计算标记大小
-        coordinates = [(shot['x'], shot['y']) for shot in all_shots_data]
-        marker_sizes = ShotProcessor.calculate_marker_sizes(coordinates, config)
-
-        # 合并标记大小到投篮数据
-        for i, shot in enumerate(all_shots_data):
-            shot['size'] = marker_sizes[i]
-            shot['alpha'] = 0.95 if shot['is_made'] else 0.75
-
-        return all_shots_data
+        shots = ShotProcessor.filter_shots(ShotProcessor.shots_to_array(player_shots), shot_outcome)
+        return ShotProcessor.to_marker_dicts(shots, config)
 
 
 class ShotRenderer:
@@ -718,15 +1186,161 @@ class ShotRenderer:
     def render_shots(axis: Axes, shots_data: List[Dict[str, Any]], config: ChartConfig) -> None:
         """渲染所有投篮点
 
+        config.marker_backend 为 "raster" 时所有标记在绘制阶段合成到同一个图层，
+        否则每个投篮点创建一个子图。
+
         Args:
             axis: matplotlib轴对象
             shots_data: 处理后的投篮数据列表
             config: 图表配置
         """
+        if config.marker_backend == "raster":
+            axis.add_artist(ShotMarkerLayer(shots_data, config))
+            return
+
         for shot in shots_data:
             ShotRenderer.add_shot_marker(axis, shot, config)
 
 
+class ShotMarkerLayer(Artist):
+    """投篮标记栅格图层
+
+    在绘制阶段把所有球员头像标记一次性合成到与坐标轴同尺寸的RGBA画布上，
+    再作为一张图像交给渲染器，代替每个投篮一个 inset_axes + imshow + Circle。
+    标记尺寸、透明度和边框与 ShotRenderer.add_shot_marker 保持一致。
+    """
+
+    zorder = 5  # 与inset_axes相同，位于球场元素之上
+
+    # 边框圆环的超采样倍数，用于抗锯齿
+    RING_SUPERSAMPLE = 4
+
+    def __init__(self, shots_data: List[Dict[str, Any]], config: ChartConfig) -> None:
+        super().__init__()
+        self.shots_data = shots_data
+        self.config = config
+
+    def draw(self, renderer) -> None:
+        if not self.get_visible() or not self.shots_data:
+            return
+        layer = self.compose(renderer.dpi)
+        if layer is None:
+            return
+        bbox = self.axes.bbox
+        gc = renderer.new_gc()
+        renderer.draw_image(gc, int(round(bbox.x0)), int(round(bbox.y0)),
+                            np.ascontiguousarray(np.asarray(layer)[::-1]))
+        gc.restore()
+        self.stale = False
+
+    def compose(self, dpi: float) -> Optional[Image.Image]:
+        """按当前坐标轴的像素位置合成所有标记
+
+        Args:
+            dpi: 渲染器DPI，用于换算边框宽度
+
+        Returns:
+            Optional[Image.Image]: 与坐标轴同尺寸的RGBA图层
+        """
+        bbox = self.axes.bbox
+        width, height = int(round(bbox.width)), int(round(bbox.height))
+        if width <= 0 or height <= 0:
+            return None
+
+        image_manager = PlayerImageManager()
+        layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        # matplotlib路径的边框以圆周为中心线，外侧一半被子图裁掉，可见宽度约为线宽的一半
+        ring_width = self.config.marker_border_width * dpi / 72 / 2 + 0.5
+        markers: Dict[Tuple, Image.Image] = {}
+
+        # 数据坐标到像素坐标(图层原点在左上角)
+        centers = self.axes.transData.transform([(shot['x'], shot['y']) for shot in self.shots_data])
+        pixels_per_unit = min(abs(self.axes.transData.transform((1, 1)) - self.axes.transData.transform((0, 0))))
+
+        for shot, (cx, cy) in zip(self.shots_data, centers):
+            try:
+                diameter = max(1, int(round(shot['size'] * 500 * pixels_per_unit)))
+                border_color = self.config.made_shot_color if shot['is_made'] else self.config.missed_shot_color
+                key = (shot['player_id'], diameter, shot['alpha'], border_color)
+                marker = markers.get(key)
+                if marker is None:
+                    headshot = image_manager.get_player_image(shot['player_id'], size=diameter)
+                    marker = self._build_marker(headshot, diameter, shot['alpha'], border_color, ring_width)
+                    markers[key] = marker
+
+                left = int(round(cx - bbox.x0 - diameter / 2))
+                top = int(round(bbox.y1 - cy - diameter / 2))
+                self._paste(layer, marker, left, top)
+            except Exception as e:
+                print(f"合成投篮标记出错: {str(e)}")
+
+        return layer
+
+    @classmethod
+    def _build_marker(cls, headshot: Image.Image, diameter: int, alpha: float,
+                      border_color: str, ring_width: float) -> Image.Image:
+        """生成带透明度和边框圆环的单个标记"""
+        marker = headshot.convert('RGBA')
+        if marker.size != (diameter, diameter):
+            marker = marker.resize((diameter, diameter), Image.Resampling.LANCZOS)
+        if alpha < 1:
+            marker_alpha = marker.getchannel('A').point(lambda a: int(a * alpha))
+            marker.putalpha(marker_alpha)
+
+        # 边框在超采样画布上绘制后缩小，边缘平滑
+        scale = cls.RING_SUPERSAMPLE
+        ring = Image.new('RGBA', (diameter * scale, diameter * scale), (0, 0, 0, 0))
+        ImageDraw.Draw(ring).ellipse((0, 0, diameter * scale - 1, diameter * scale - 1),
+                                     outline=border_color, width=max(1, int(round(ring_width * scale))))
+        ring = ring.resize((diameter, diameter), Image.Resampling.LANCZOS)
+        marker.alpha_composite(ring)
+        return marker
+
+    @staticmethod
+    def _paste(layer: Image.Image, marker: Image.Image, left: int, top: int) -> None:
+        """把标记合成到图层上，超出图层的部分被裁掉"""
+        src_left, src_top = max(0, -left), max(0, -top)
+        right = min(layer.width, left + marker.width)
+        bottom = min(layer.height, top + marker.height)
+        if right <= left + src_left or bottom <= top + src_top:
+            return
+        layer.alpha_composite(
+            marker,
+            dest=(left + src_left, top + src_top),
+            source=(src_left, src_top, right - left, bottom - top)
+        )
+
+
+# 紧凑投篮记录: (球员ID, x, y, 是否命中)
+ShotTuple = Tuple[int, float, float, bool]
+
+
+@dataclass
+class ChartJob:
+    """批量渲染中的单个图表任务
+
+    只携带绘图所需的紧凑投篮数组，可以低成本地传给子进程，
+    不需要序列化整个 Game 对象。
+    """
+    kind: str  # "team_shots"、"player_shots" 或 "player_impact"
+    output_path: Path
+    title: str
+    result_key: str  # 结果字典中的键，如 "team_chart"、"impact_chart"
+    shots: List[ShotTuple]
+    assisted_shots: Optional[List[ShotTuple]] = None  # 仅player_impact: (投篮者ID, x, y, True)
+    player_id: Optional[int] = None
+    shot_outcome: str = "made_only"
+    impact_type: str = "full_impact"
+
+    def player_ids(self) -> List[int]:
+        """任务中出现的所有球员ID(用于预取头像)"""
+        ids = {shot[0] for shot in self.shots}
+        ids.update(shot[0] for shot in self.assisted_shots or ())
+        if self.player_id is not None:
+            ids.add(self.player_id)
+        return sorted(ids)
+
+
 class GameChartsService:
     """NBA比赛数据可视化服务 - 增强版，整合业务逻辑"""
 
@@ -960,11 +1574,7 @@ class GameChartsService:
                     shot['size'] = marker_sizes[i]
 
             # 渲染所有投篮点
-            for shot in player_processed_shots:
-                ShotRenderer.add_shot_marker(ax, shot, self.config)
-
-            for shot in assisted_processed_shots:
-                ShotRenderer.add_shot_marker(ax, shot, self.config)
+            ShotRenderer.render_shots(ax, player_processed_shots + assisted_processed_shots, self.config)
 
             # 根据impact_type调整标题
             if title:
@@ -1001,6 +1611,181 @@ class GameChartsService:
             self.logger.error(f"绘制球员影响力图时出错: {str(e)}")
             return None
 
+    def plot_shot_heatmap(self,
+                          shots: np.ndarray,
+                          title: Optional[str] = None,
+                          output_path: Optional[str] = None,
+                          gridsize: Optional[int] = None,
+                          min_attempts: Optional[int] = None) -> Optional[plt.Figure]:
+        """绘制六边形投篮热图
+
+        每个六边形的大小表示该区域出手次数，颜色表示该区域命中率。
+
+        Args:
+            shots: SHOT_DTYPE结构化投篮数组
+            title: 图表标题
+            output_path: 输出路径
+            gridsize: 球场宽度方向的六边形数量，默认使用配置
+            min_attempts: 显示区域的最少出手次数，默认使用配置
+
+        Returns:
+            Optional[plt.Figure]: 生成的图表对象
+        """
+        try:
+            if len(shots) == 0:
+                self.logger.warning("热图投篮数据为空")
+                return None
+
+            gridsize = gridsize or self.config.hexbin_gridsize
+            min_attempts = self.config.hexbin_min_attempts if min_attempts is None else min_attempts
+            bins = ShotProcessor.hexbin_aggregate(shots['x'], shots['y'], shots['made'], gridsize)
+            visible = bins['attempts'] >= min_attempts
+            if not visible.any():
+                self.logger.warning("没有出手次数达到阈值的区域")
+                return None
+
+            attempts = bins['attempts'][visible]
+            fg_pct = bins['makes'][visible] / attempts
+            # 出手次数越多六边形越大，按面积(平方根)缩放
+            scale = 0.35 + 0.65 * np.sqrt(attempts / attempts.max())
+            angles = np.deg2rad(np.arange(30, 390, 60))
+            unit = np.column_stack((np.cos(angles), np.sin(angles))) * bins['radius']
+            centers = np.column_stack((bins['x'][visible], bins['y'][visible]))
+            polygons = centers[:, None, :] + scale[:, None, None] * unit[None, :, :]
+
+            fig, ax = CourtRenderer.draw_court(self.config)
+            norm = Normalize(vmin=0.25, vmax=0.65)
+            cmap = plt.get_cmap(self.config.heatmap_cmap)
+            collection = PolyCollection(polygons, facecolors=cmap(norm(fg_pct)),
+                                        edgecolors='white', linewidths=0.5 * self.config.scale_factor,
+                                        alpha=0.9, zorder=4)
+            ax.add_collection(collection)
+
+            # 命中率色条
+            colorbar_ax = ax.inset_axes((0.70, 0.03, 0.27, 0.025))
+            colorbar = fig.colorbar(plt.cm.ScalarMappable(norm=norm, cmap=cmap), cax=colorbar_ax,
+                                    orientation='horizontal')
+            colorbar.set_label('命中率', fontsize=8 * self.config.scale_factor)
+            colorbar.ax.tick_params(labelsize=7 * self.config.scale_factor)
+
+            total_attempts = len(shots)
+            total_pct = shots['made'].mean()
+            ax.text(0.03, 0.03, f"出手 {total_attempts}   命中率 {total_pct:.1%}",
+                    transform=ax.transAxes, fontsize=9 * self.config.scale_factor, zorder=5)
+
+            if title:
+                ax.set_title(title, pad=20, fontsize=12 * self.config.scale_factor)
+
+            if output_path:
+                self._save_figure(fig, output_path)
+
+            return fig
+
+        except Exception as e:
+            self.logger.error(f"绘制投篮热图时出错: {str(e)}")
+            return None
+
+    def load_season_shots(self,
+                          player_id: Optional[int] = None,
+                          team_id: Optional[int] = None,
+                          season: Optional[str] = None,
+                          season_type: Optional[str] = "Regular Season",
+                          date_from: Optional[str] = None,
+                          date_to: Optional[str] = None) -> np.ndarray:
+        """从game.db的events表流式读取投篮，组装为结构化数组
+
+        Args:
+            player_id: 球员ID
+            team_id: 球队ID
+            season: 赛季标识，如"2024-25"
+            season_type: 比赛类型，如"Regular Season"、"Playoffs"，None表示全部
+            date_from: 开始日期(YYYY-MM-DD)
+            date_to: 结束日期(YYYY-MM-DD)
+
+        Returns:
+            np.ndarray: SHOT_DTYPE结构化数组
+        """
+        game_ids = None
+        if date_from or date_to:
+            game_ids = ScheduleRepository().get_game_ids_by_date_range(date_from, date_to)
+
+        rows = PlayByPlayRepository().iter_shot_locations(
+            player_id=player_id, team_id=team_id, season=season,
+            season_type=season_type, game_ids=game_ids
+        )
+        return np.fromiter(
+            ((x, y, person_id or 0, result == "Made", False, period or 0)
+             for _, period, person_id, x, y, result in rows),
+            dtype=SHOT_DTYPE
+        )
+
+    def generate_season_shot_chart(self,
+                                   player_id: Optional[int] = None,
+                                   team_id: Optional[int] = None,
+                                   name: Optional[str] = None,
+                                   season: Optional[str] = None,
+                                   season_type: Optional[str] = "Regular Season",
+                                   date_from: Optional[str] = None,
+                                   date_to: Optional[str] = None,
+                                   output_dir: Optional[Path] = None,
+                                   force_reprocess: bool = False) -> Optional[Path]:
+        """生成球员或球队在赛季/时间段内的投篮热图
+
+        直接读取events表中已同步的投篮位置，不需要逐场解析Game。
+
+        Args:
+            player_id: 球员ID(与team_id二选一)
+            team_id: 球队ID
+            name: 球员或球队名称，用于标题
+            season: 赛季标识，如"2024-25"
+            season_type: 比赛类型，如"Regular Season"、"Playoffs"，None表示全部
+            date_from: 开始日期(YYYY-MM-DD)
+            date_to: 结束日期(YYYY-MM-DD)
+            output_dir: 输出目录
+            force_reprocess: 是否强制重新生成
+
+        Returns:
+            Optional[Path]: 生成图表的路径
+        """
+        if player_id is None and team_id is None:
+            self.logger.error("生成赛季投篮热图需要指定球员或球队")
+            return None
+
+        try:
+            subject = f"player_{player_id}" if player_id is not None else f"team_{team_id}"
+            type_code = PlayByPlayRepository.SEASON_TYPE_CODES.get(season_type, 'all') if season_type else 'all'
+            date_part = f"_{date_from or 'start'}_{date_to or 'end'}" if (date_from or date_to) else ""
+            output_filename = f"season_heatmap_{subject}_{season or 'all'}_{type_code}{date_part}.png"
+            output_path = (output_dir or self.default_output_dir) / output_filename
+
+            if not force_reprocess and output_path.exists():
+                self.logger.info(f"检测到已存在的处理结果: {output_path}")
+                return output_path
+
+            started = time.perf_counter()
+            shots = self.load_season_shots(player_id, team_id, season, season_type, date_from, date_to)
+            self.logger.info(f"读取投篮{len(shots)}次, 耗时{time.perf_counter() - started:.2f}秒")
+            if len(shots) == 0:
+                self.logger.warning(f"未找到{name or subject}的投篮数据")
+                return None
+
+            season_type_names = {'Regular Season': '常规赛', 'Playoffs': '季后赛', 'Pre Season': '季前赛',
+                                 'All Star': '全明星赛', 'PlayIn': '附加赛'}
+            title_parts = [name or subject, season, season_type_names.get(season_type)]
+            if date_from or date_to:
+                title_parts.append(f"{date_from or ''}~{date_to or ''}")
+            title = " ".join(part for part in title_parts if part) + " 投篮热图"
+
+            fig = self.plot_shot_heatmap(shots, title=title, output_path=str(output_path))
+            if fig:
+                self.logger.info(f"赛季投篮热图已生成: {output_path}")
+                return output_path
+            return None
+
+        except Exception as e:
+            self.logger.error(f"生成赛季投篮热图失败: {e}", exc_info=True)
+            return None
+
     # ==== 从NBAService下放的业务方法 ====
 
     def generate_player_scoring_impact_charts(self,
@@ -1034,6 +1819,8 @@ class GameChartsService:
                 output_dir = self.default_output_dir
                 output_dir.mkdir(parents=True, exist_ok=True)
 
+            self._prefetch_headshots(game)
+
             # 收集输入数据
             chart_data = self._collect_player_chart_data(
                 game=game,
@@ -1117,6 +1904,9 @@ class GameChartsService:
                 output_dir = self.default_output_dir
                 output_dir.mkdir(parents=True, exist_ok=True)
 
+            # 渲染前一次性下载本场比赛所需的球员头像
+            self._prefetch_headshots(game)
+
             # 1. 生成球员投篮图
             if chart_type in ["player", "both"] and player_id:
                 player_chart = self._generate_player_chart(
@@ -1152,6 +1942,20 @@ class GameChartsService:
 
     # ==== 辅助方法 ====
 
+    def _prefetch_headshots(self, game: Game) -> None:
+        """预取本场比赛所有上场球员的头像，避免绘图过程中逐个等待网络"""
+        try:
+            player_ids = [
+                player.person_id
+                for team in (game.game_data.home_team, game.game_data.away_team)
+                for player in team.players
+                if player.played == "1"
+            ]
+            if player_ids:
+                PlayerImageManager().prefetch(player_ids)
+        except Exception as e:
+            self.logger.warning(f"预取球员头像失败: {e}")
+
     def _collect_player_chart_data(self, game: Game, player_id: int, player_name: str, impact_type: str) -> Dict[str, Any]:
         """收集球员图表所需数据
 
@@ -1383,13 +2187,188 @@ class GameChartsService:
             self.logger.error("球队投篮图生成失败")
             return None
 
+    # ==== 批量渲染 ====
+
+    def build_chart_jobs(self,
+                         game: Game,
+                         team_id: Optional[int] = None,
+                         player_id: Optional[int] = None,
+                         team_name: Optional[str] = None,
+                         player_name: Optional[str] = None,
+                         chart_type: str = "both",
+                         output_dir: Optional[Path] = None,
+                         force_reprocess: bool = False,
+                         shot_outcome: str = "made_only",
+                         impact_type: str = "full_impact") -> List[ChartJob]:
+        """把一场比赛的图表需求转换为可批量渲染的任务
+
+        参数与 generate_shot_charts 相同；已存在且不强制重新处理的图表不会生成任务。
+
+        Returns:
+            List[ChartJob]: 图表任务列表
+        """
+        jobs = []
+        output_dir = output_dir or self.default_output_dir
+        formatted_date = game.game_data.game_time_beijing.strftime("%Y年%m月%d日")
+        game_id = game.game_data.game_id
+
+        if chart_type in ["player", "both"] and player_id:
+            if impact_type == "full_impact":
+                output = self._prepare_player_chart_output(player_id, game, output_dir, impact_type, force_reprocess)
+                player_shots = self._compact_shots(game.get_shot_data(player_id))
+                assisted = [(int(shot['shooter_id']), float(shot['x']), float(shot['y']), True)
+                            for shot in game.get_assisted_shot_data(player_id)
+                            if shot.get('x') is not None and shot.get('y') is not None and shot.get('shooter_id')]
+                if output["success"] and (player_shots or assisted):
+                    jobs.append(ChartJob(
+                        kind="player_impact",
+                        output_path=output["path"],
+                        title=f"{player_name} 得分影响力图\n{formatted_date}",
+                        result_key="player_chart",
+                        shots=player_shots,
+                        assisted_shots=assisted,
+                        player_id=player_id,
+                        impact_type=impact_type
+                    ))
+            else:
+                filename_prefix = "all_shots" if shot_outcome == "all" else "scoring"
+                output_path = output_dir / f"{filename_prefix}_{game_id}_{player_id}.png"
+                shots = self._compact_shots(game.get_shot_data(player_id))
+                if (force_reprocess or not output_path.exists()) and shots:
+                    title_prefix = "所有" if shot_outcome == "all" else ""
+                    jobs.append(ChartJob(
+                        kind="player_shots",
+                        output_path=output_path,
+                        title=f"{player_name} {title_prefix}投篮分布图\n{formatted_date}",
+                        result_key="player_chart",
+                        shots=shots,
+                        player_id=player_id,
+                        shot_outcome=shot_outcome
+                    ))
+
+        if chart_type in ["team", "both"] and team_id:
+            filename_prefix = "all_shots" if shot_outcome == "all" else "team_shots"
+            output_path = output_dir / f"{filename_prefix}_{game_id}_{team_id}.png"
+            if force_reprocess or not output_path.exists():
+                shots = [shot for player_shots in game.get_team_shot_data(team_id).values()
+                         for shot in self._compact_shots(player_shots)]
+                if shots:
+                    title_prefix = "所有" if shot_outcome == "all" else ""
+                    jobs.append(ChartJob(
+                        kind="team_shots",
+                        output_path=output_path,
+                        title=f"{team_name} {title_prefix}球队投篮分布图\n{formatted_date}",
+                        result_key="team_chart",
+                        shots=shots,
+                        shot_outcome=shot_outcome
+                    ))
+
+        return jobs
+
+    def render_charts_batch(self, jobs: List[ChartJob], max_workers: Optional[int] = None) -> List[Optional[Path]]:
+        """在进程池中并行渲染一批图表
+
+        渲染是CPU密集且受GIL限制的，每个子进程使用Agg后端独立绘图。
+        开始前在主进程预取所有球员头像，子进程直接从磁盘缓存读取。
+
+        Args:
+            jobs: 图表任务列表，通常由多场比赛的 build_chart_jobs 结果拼接而成
+            max_workers: 进程数，默认使用CPU核数
+
+        Returns:
+            List[Optional[Path]]: 与jobs一一对应的输出路径，渲染失败为None
+        """
+        if not jobs:
+            return []
+
+        started = time.perf_counter()
+        player_ids = sorted({player_id for job in jobs for player_id in job.player_ids()})
+        PlayerImageManager().prefetch(player_ids)
+
+        for job in jobs:
+            Path(job.output_path).parent.mkdir(parents=True, exist_ok=True)
+
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+        results: List[Optional[Path]] = [None] * len(jobs)
+        if workers == 1:
+            _init_chart_worker(self.config)
+            for i, job in enumerate(jobs):
+                results[i] = _render_chart_job(job)
+        else:
+            # spawn启动的子进程不继承主进程的线程和数据库连接
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_chart_worker, initargs=(self.config,)) as executor:
+                futures = {executor.submit(_render_chart_job, job): i for i, job in enumerate(jobs)}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        self.logger.error(f"图表渲染进程出错({jobs[i].output_path}): {e}")
+
+        succeeded = sum(1 for path in results if path is not None)
+        self.logger.info(f"批量渲染完成: {succeeded}/{len(jobs)}张图表, 进程数{workers}, "
+                         f"耗时{time.perf_counter() - started:.1f}秒")
+        return results
+
+    @staticmethod
+    def _compact_shots(shots: List[Dict[str, Any]]) -> List[ShotTuple]:
+        """把投篮字典列表转换为紧凑元组，丢弃没有坐标的投篮"""
+        return [
+            (int(shot['player_id']), float(shot['x_legacy']), float(shot['y_legacy']), shot.get('shot_result') == "Made")
+            for shot in shots
+            if shot.get('x_legacy') is not None and shot.get('y_legacy') is not None and shot.get('player_id') is not None
+        ]
+
     def clear_cache(self) -> None:
         """清理图表服务缓存"""
-        # 当前实现下没有需要特别清理的缓存
-        pass
+        CourtRenderer.clear_court_templates()
 
     def close(self) -> None:
         """关闭图表服务资源"""
         # 关闭所有plt图表
         plt.close('all')
-        self.logger.info("图表服务资源已清理")
\ No newline at end of file
+        self.logger.info("图表服务资源已清理")
+
+
+# ==== 进程池渲染 ====
+
+_worker_service: Optional[GameChartsService] = None
+
+
+def _init_chart_worker(config: ChartConfig) -> None:
+    """子进程初始化: 切换到Agg后端并创建图表服务"""
+    global _worker_service
+    plt.switch_backend('Agg')
+    _worker_service = GameChartsService(config)
+
+
+def _render_chart_job(job: ChartJob) -> Optional[Path]:
+    """渲染单个图表任务，成功时返回输出路径"""
+    service = _worker_service
+    shots = [{'player_id': player_id, 'x_legacy': x, 'y_legacy': y,
+              'shot_result': "Made" if is_made else "Missed"}
+             for player_id, x, y, is_made in job.shots]
+
+    if job.kind == "team_shots":
+        team_shots: Dict[int, List[Dict[str, Any]]] = {}
+        for shot in shots:
+            team_shots.setdefault(shot['player_id'], []).append(shot)
+        fig = service.plot_shots(team_shots, title=job.title, output_path=str(job.output_path),
+                                 shot_outcome=job.shot_outcome, data_type="team")
+    elif job.kind == "player_shots":
+        fig = service.plot_shots(shots, title=job.title, output_path=str(job.output_path),
+                                 shot_outcome=job.shot_outcome, data_type="player")
+    elif job.kind == "player_impact":
+        assisted = [{'shooter_id': shooter_id, 'x': x, 'y': y}
+                    for shooter_id, x, y, _ in job.assisted_shots or ()]
+        fig = service.plot_player_impact(shots, assisted, job.player_id, title=job.title,
+                                         output_path=str(job.output_path), impact_type=job.impact_type)
+    else:
+        raise ValueError(f"未知的图表任务类型: {job.kind}")
+
+    if fig is None:
+        return None
+    plt.close(fig)
+    return Path(job.output_path)
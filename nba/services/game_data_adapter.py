@@ -1,6 +1,6 @@
 from typing import Dict, Any, Optional, List,  Protocol
 from pydantic import BaseModel
-from nba.models.game_model import Game
+from nba.models.game_model import Game, EventIndex
 from utils.logger_handler import AppLogger
 
 
@@ -497,7 +497,7 @@ class EventsExtractor:
             all_events = game.play_by_play.actions
             if player_id:
                 # 筛选与球员相关的事件
-                player_events = self._filter_player_events(all_events, player_id)
+                player_events = self._filter_player_events(game.event_index, player_id)
                 return {
                     "count": len(player_events),
                     "data": [self._event_to_dict(event) for event in player_events]
@@ -517,11 +517,14 @@ class EventsExtractor:
         return {"count": 0, "data": []}
 
     def _filter_player_events(self, events, player_id):
-        """筛选与球员相关的事件"""
-        result = []
-        for event in events:
-            if self._is_event_related_to_player(event, player_id):
-                result.append(event)
+        """筛选与球员相关的事件
+
+        events 为 EventIndex 时直接取索引中与球员相关的事件，否则逐个判断。
+        """
+        if isinstance(events, EventIndex):
+            result = events.select(related_person_id=player_id)
+        else:
+            result = [event for event in events if self._is_event_related_to_player(event, player_id)]
 
         # 按时间排序
         result.sort(key=lambda x: (getattr(x, 'period', 0), getattr(x, 'clock', '')))
@@ -622,8 +625,23 @@ class GamePaceExtractor:
                     "biggest_run_score": away_stats.biggest_scoring_run_score
                 }
             },
-            "pacing": self._analyze_game_pacing(home_stats, away_stats)
+            "pacing": self._analyze_game_pacing(home_stats, away_stats),
+            "score_flow": self._analyze_score_flow(game)
+        }
+
+    def _analyze_score_flow(self, game: 'Game') -> Dict[str, Any]:
+        """基于回放事件的列式视图统计比分走势(领先变换、平局、最大领先、关键时刻分差)"""
+        if not game.play_by_play or not game.play_by_play.actions:
+            return {}
+
+        columns = game.columns
+        flow = columns.score_flow()
+        clutch_margin = columns.score_margin[columns.clutch_mask(5)]
+        flow["clutch"] = {
+            "events": int(clutch_margin.size),
+            "max_margin": int(abs(clutch_margin).max()) if clutch_margin.size else None
         }
+        return flow
 
     def _get_lead_changes_description(self, count: int) -> str:
         """根据领先变换次数提供描述性文本"""
@@ -723,12 +741,20 @@ class PeriodPerformanceExtractor:
 
         home_periods = game.game_data.home_team.periods
         away_periods = game.game_data.away_team.periods
+        home_scores = [period.score for period in home_periods]
+        away_scores = [period.score for period in away_periods]
+
+        # boxscore中没有分节比分时，由回放事件的逐事件比分推算
+        if not home_scores and not away_scores and game.play_by_play and game.play_by_play.actions:
+            derived = game.columns.period_scores()
+            home_scores = [period["home_score"] for period in derived]
+            away_scores = [period["away_score"] for period in derived]
 
         # 整理各节数据
         period_data = []
-        for i in range(max(len(home_periods), len(away_periods))):
-            home_score = home_periods[i].score if i < len(home_periods) else 0
-            away_score = away_periods[i].score if i < len(away_periods) else 0
+        for i in range(max(len(home_scores), len(away_scores))):
+            home_score = home_scores[i] if i < len(home_scores) else 0
+            away_score = away_scores[i] if i < len(away_scores) else 0
 
             period_data.append({
                 "period": i + 1,
@@ -1,7 +1,10 @@
 # game_data_provider.py
-from typing import Optional
-from functools import lru_cache
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 
+from config import NBAConfig
 from nba.fetcher.game_fetcher import GameFetcher
 from nba.parser.game_parser import GameDataParser
 from nba.models.game_model import Game
@@ -9,6 +12,139 @@ from nba.models.game_model import Game
 from utils.logger_handler import AppLogger
 
 
+class ParsedGameCache:
+    """解析后Game对象的进程内缓存
+
+    - 缓存时间由比赛状态决定：已结束的比赛长期有效，进行中的比赛只缓存几秒
+    - 获取或解析失败(None)按较短的负缓存时间保存，避免短时间内重复请求
+    - 容量按比赛数和回放事件总数(近似内存占用)限制，超出时按LRU淘汰
+    - 所有操作加锁，可在线程间共享
+    """
+
+    # 每场比赛除回放事件外的估算权重(球员、统计数据等)
+    GAME_BASE_WEIGHT = 100
+
+    def __init__(self, max_entries: Optional[int] = None, max_events: Optional[int] = None,
+                 status_ttl: Optional[Dict[int, float]] = None, negative_ttl: Optional[float] = None):
+        cache_config = NBAConfig.CACHE
+        self.max_entries = cache_config.PARSED_GAME_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_events = cache_config.PARSED_GAME_MAX_EVENTS if max_events is None else max_events
+        self.status_ttl = dict(cache_config.PARSED_GAME_STATUS_TTL_SECONDS if status_ttl is None else status_ttl)
+        self.negative_ttl = cache_config.PARSED_GAME_NEGATIVE_TTL_SECONDS if negative_ttl is None else negative_ttl
+
+        # game_id -> (Game或None, 过期时间(monotonic), 权重)
+        self._entries: "OrderedDict[str, Tuple[Optional[Game], float, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.current_weight = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _weight(self, game: Optional[Game]) -> int:
+        if game is None:
+            return 1
+        actions = game.play_by_play.actions if game.play_by_play and game.play_by_play.actions else []
+        return len(actions) + self.GAME_BASE_WEIGHT
+
+    def _ttl(self, game: Optional[Game]) -> float:
+        if game is None:
+            return self.negative_ttl
+        status = int(game.game_data.game_status) if game.game_data else None
+        # 未知状态按进行中处理，宁可多请求也不返回过期数据
+        return self.status_ttl.get(status, self.status_ttl.get(2, 0))
+
+    def _remove(self, game_id: str) -> None:
+        entry = self._entries.pop(game_id, None)
+        if entry is not None:
+            self.current_weight -= entry[2]
+
+    def get(self, game_id: str) -> Tuple[bool, Optional[Game]]:
+        """获取缓存的比赛
+
+        Returns:
+            Tuple[bool, Optional[Game]]: (是否命中, Game对象)；命中负缓存时为 (True, None)
+        """
+        with self._lock:
+            entry = self._entries.get(game_id)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            game, expires_at, _ = entry
+            if time.monotonic() >= expires_at:
+                self._remove(game_id)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(game_id)
+            if game is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, game
+
+    def put(self, game_id: str, game: Optional[Game]) -> None:
+        """写入比赛(None表示获取失败)，超过容量时淘汰最久未使用的条目"""
+        if not self.enabled:
+            return
+
+        ttl = self._ttl(game)
+        if ttl <= 0:
+            return
+        weight = self._weight(game)
+        if weight > self.max_events:
+            # 单场比赛超过总容量，不进入缓存
+            return
+
+        with self._lock:
+            self._remove(game_id)
+            self._entries[game_id] = (game, time.monotonic() + ttl, weight)
+            self.current_weight += weight
+
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     self.current_weight > self.max_events):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, game_id: str) -> None:
+        """删除指定比赛的缓存"""
+        with self._lock:
+            if game_id in self._entries:
+                self._remove(game_id)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_weight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'negative_entries': sum(1 for game, _, _ in self._entries.values() if game is None),
+                'events': self.current_weight,
+                'max_entries': self.max_entries,
+                'max_events': self.max_events,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'hit_rate': round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+            }
+
+
 class GameDataProvider:
     """
     GameDataProvider的核心职责是：数据获取和解析。
@@ -19,6 +155,7 @@ class GameDataProvider:
             self,
             game_fetcher: Optional[GameFetcher] = None,
             game_parser: Optional[GameDataParser] = None,
+            game_cache: Optional[ParsedGameCache] = None,
     ):
         """初始化NBA比赛数据服务"""
         self.logger = AppLogger.get_logger(__name__, app_name='nba')
@@ -30,6 +167,9 @@ class GameDataProvider:
         self.game_fetcher = game_fetcher or GameFetcher()
         self.game_parser = game_parser or GameDataParser()
 
+        # 解析后的比赛缓存
+        self.game_cache = game_cache or ParsedGameCache()
+
         # 标记初始化成功
         self._initialized = True
         self.logger.info("GameData服务初始化成功")
@@ -49,13 +189,21 @@ class GameDataProvider:
             if not game_id:
                 raise ValueError("必须提供有效的比赛ID")
 
-            return self._fetch_game_data_sync(game_id, force_update)
+            if force_update:
+                self.game_cache.invalidate(game_id)
+            else:
+                hit, game = self.game_cache.get(game_id)
+                if hit:
+                    return game
+
+            game = self._fetch_game_data_sync(game_id, force_update)
+            self.game_cache.put(game_id, game)
+            return game
 
         except Exception as e:
             self.logger.error(f"获取比赛数据时出错: {e}", exc_info=True)
             return None
 
-    @lru_cache(maxsize=128)
     def _fetch_game_data_sync(self, game_id: str, force_update: bool = False) -> Optional[Game]:
         """同步获取比赛数据（包括boxscore和playbyplay）"""
         try:
@@ -90,12 +238,15 @@ class GameDataProvider:
     def clear_cache(self) -> None:
         """清理缓存数据"""
         try:
-            if hasattr(self._fetch_game_data_sync, 'cache_clear'):
-                self._fetch_game_data_sync.cache_clear()
-                self.logger.info("成功清理 get_game 缓存")
+            self.game_cache.clear()
+            self.logger.info("成功清理 get_game 缓存")
         except Exception as e:
             self.logger.warning(f"清理缓存时出错: {e}")
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取解析后比赛缓存的统计信息"""
+        return self.game_cache.stats()
+
     def close(self):
         """关闭资源"""
         try:
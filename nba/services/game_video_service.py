@@ -1,8 +1,14 @@
 from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
 import time
 import threading
-from typing import Optional, Dict, Any, List, Set
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Optional, Dict, Any, List, Set, Callable
 from dataclasses import dataclass
+from urllib.parse import urlsplit
 
 from nba.fetcher.video_fetcher import VideoFetcher
 from nba.models.video_model import VideoAsset, ContextMeasure
@@ -24,8 +30,13 @@ class VideoConfig:
     min_download_delay: float = 2.0  # HTTP请求最小延迟(秒)
     max_download_delay: float = 5.0  # HTTP请求最大延迟(秒)
     concurrent_downloads: int = 3  # 同时进行的下载任务数量
+    max_downloads_per_host: int = 3  # 同一主机同时进行的下载任务数量
     output_dir: Path = NBAConfig.PATHS.VIDEO_DIR
     request_timeout: int = 30  # 请求超时时间(秒)
+    range_segments: int = 4  # 大文件分段并行下载的段数(1表示不分段)
+    range_segment_min_bytes: int = 64 * 1024 * 1024  # 超过此大小且服务器支持Range时分段下载
+    use_clip_store: bool = True  # 同一事件同一清晰度只下载一次，各用途目录通过硬链接引用
+    clip_store_dir: Path = None  # 片段存储目录，默认 output_dir/clip_store
 
     # 新增，用于高级业务功能
     team_video_dir: Path = None  # 球队视频目录
@@ -40,6 +51,10 @@ class VideoConfig:
         # 确保基础目录存在
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        # 片段存储放在输出目录下，保证与链接目标在同一文件系统(硬链接要求)
+        if not self.clip_store_dir:
+            self.clip_store_dir = self.output_dir / "clip_store"
+
         # 设置子目录
         if self.base_output_dir:
             if not self.team_video_dir:
@@ -94,13 +109,139 @@ class VideoConfig:
         return gif_dir
 
 
+class DownloadManifest:
+    """下载清单
+
+    每个输出目录一个JSON清单，记录已校验文件的 URL、大小、ETag 和 sha256，
+    以及未完成 .part 文件的 ETag(用于 If-Range 断点续传)。
+    重新运行时清单中大小一致的文件直接跳过，不再请求服务器。
+    """
+
+    FILENAME = ".download_manifest.json"
+
+    def __init__(self, directory: Path):
+        self.path = directory / self.FILENAME
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self.logger = AppLogger.get_logger(__name__, app_name='nba')
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding='utf-8'))
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"下载清单读取失败，将重新建立: {self.path} | {e}")
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        """原子写入: 先写临时文件再替换"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.FILENAME}.{threading.get_ident()}.tmp")
+        temp_path.write_text(json.dumps(self._entries, ensure_ascii=False, indent=1), encoding='utf-8')
+        os.replace(temp_path, self.path)
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._load().get(filename)
+            return dict(entry) if entry else None
+
+    def set(self, filename: str, **entry: Any) -> None:
+        with self._lock:
+            self._load()[filename] = entry
+            self._save()
+
+    def remove(self, filename: str) -> None:
+        with self._lock:
+            if self._load().pop(filename, None) is not None:
+                self._save()
+
+    def is_verified(self, path: Path, url: Optional[str] = None) -> bool:
+        """文件是否与清单中已完成的记录一致(存在、大小相同，给出url时URL也相同)"""
+        entry = self.get(path.name)
+        if not entry or not entry.get('complete') or not path.exists():
+            return False
+        if url is not None and entry.get('url') != url:
+            return False
+        return path.stat().st_size == entry.get('size')
+
+
+class ClipStore:
+    """内容寻址的片段存储
+
+    每个片段按 (game_id, event_id, quality) 只存一份，球队集锦、球员各类型集锦和回合GIF
+    使用的 get_output_path 路径都是指向存储文件的链接(优先硬链接，其次符号链接，最后复制)。
+    同一片段的并发下载通过按键加锁串行化。
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._locks: Dict[Path, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self.logger = AppLogger.get_logger(__name__, app_name='nba')
+
+    def path_for(self, game_id: str, event_id: str, quality: str) -> Path:
+        """片段在存储中的路径"""
+        return self.root / f"game_{game_id}" / f"event_{event_id}_{quality}.mp4"
+
+    def lock_for(self, path: Path) -> threading.Lock:
+        """获取片段对应的锁"""
+        with self._locks_lock:
+            lock = self._locks.get(path)
+            if lock is None:
+                lock = self._locks[path] = threading.Lock()
+            return lock
+
+    @staticmethod
+    def is_linked(source: Path, target: Path) -> bool:
+        """target 是否已经指向 source"""
+        try:
+            return target.exists() and os.path.samefile(source, target)
+        except OSError:
+            return False
+
+    def link(self, source: Path, target: Path) -> Path:
+        """在用途目录中创建指向存储文件的链接"""
+        if self.is_linked(source, target):
+            return target
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f"{target.name}.{threading.get_ident()}.link")
+        temp_path.unlink(missing_ok=True)
+        try:
+            os.link(source, temp_path)
+        except OSError:
+            try:
+                temp_path.symlink_to(source.resolve())
+            except OSError as e:
+                self.logger.warning(f"无法创建链接，复制文件: {target.name} | {e}")
+                shutil.copy2(source, temp_path)
+        os.replace(temp_path, target)
+        return target
+
+
 class VideoDownloader:
-    """使用HTTPRequestManager的视频下载器"""
+    """使用HTTPRequestManager的视频下载器
+
+    下载写入 .part 文件，完成并校验大小后原子重命名为最终文件:
+    - 中断后重新运行时用 HTTP Range 从 .part 末尾续传(If-Range 携带ETag，文件变化时从头下载)
+    - 完成的文件记录到目录下的 DownloadManifest，重新运行时直接跳过
+    - 大文件且服务器支持Range时分段并行下载
+    - 启用 ClipStore 时同一事件同一清晰度只下载一次，输出路径为指向存储文件的链接
+    """
+
+    # 分段下载时每段的读取块大小
+    SEGMENT_CHUNK_SIZE = 1024 * 1024
 
     def __init__(self, config: VideoConfig):
         self.config = config
         self.logger = AppLogger.get_logger(__name__, app_name='nba')
         self._semaphore = threading.Semaphore(config.concurrent_downloads)  # 控制并发下载数量
+        self._manifests: Dict[Path, DownloadManifest] = {}
+        self._manifests_lock = threading.Lock()
+        self.clip_store = ClipStore(config.clip_store_dir) if config.use_clip_store else None
 
         # 初始化HTTP请求管理器，适配新的速率限制功能
         self.http_manager = HTTPRequestManager(
@@ -152,35 +293,87 @@ class VideoDownloader:
         """
         try:
             # 获取指定质量的视频
-            video_quality = video_asset.get_preferred_quality(self.config.quality)
-            if not video_quality:
+            quality = video_asset.resolve_quality(self.config.quality)
+            if not quality:
                 self.logger.error(f"未找到指定质量的视频: {self.config.quality}")
                 return None
+            url = video_asset.qualities[quality].url
 
             # 确定输出路径，传入可选参数
             output_path = self.config.get_output_path(game_id, video_asset, player_id, context_measure)
 
-            # 增量处理: 检查文件是否已存在且有效，除非强制重新处理
-            if not force_reprocess and output_path.exists():
-                if output_path.stat().st_size > 1024 * 10:  # 至少10KB
-                    self.logger.info(f"视频文件已存在，跳过下载: {output_path}")
-                    return output_path
-                else:
-                    # 文件过小，可能损坏，删除并重新下载
-                    self.logger.warning(f"文件过小，可能已损坏，将重新下载: {output_path}")
-                    output_path.unlink()
+            if self.clip_store is None:
+                return self._fetch(url, output_path, force_reprocess)
 
-            # 使用信号量控制并发数量
-            with self._semaphore:
-                return self._download_to_file(video_quality.url, output_path)
+            # 同一事件只下载到存储一次，输出路径链接到存储文件
+            store_path = self.clip_store.path_for(game_id, video_asset.event_id, quality)
+            with self.clip_store.lock_for(store_path):
+                legacy_path = output_path if not self.clip_store.is_linked(store_path, output_path) else None
+                stored = self._fetch(url, store_path, force_reprocess, legacy_path=legacy_path)
+                if not stored:
+                    return None
+                return self.clip_store.link(stored, output_path)
 
         except Exception as e:
             self.logger.error(f"视频下载失败: {str(e)}", exc_info=True)
             return None
 
+    def _fetch(self, url: str, path: Path, force_reprocess: bool = False,
+               legacy_path: Optional[Path] = None) -> Optional[Path]:
+        """下载到指定路径，清单中已校验的文件直接返回
+
+        Args:
+            url: 视频URL
+            path: 目标路径
+            force_reprocess: 是否丢弃已有文件重新下载
+            legacy_path: 可能存在的未经校验的旧文件，存在时转为 .part 续传校验，默认为 path 本身
+        """
+        manifest = self.get_manifest(path.parent)
+        legacy_path = legacy_path or path
+
+        if force_reprocess:
+            self._discard(path, manifest)
+        elif manifest.is_verified(path, url):
+            # 增量处理: 清单中已校验的文件直接跳过，不再请求服务器
+            self.logger.info(f"视频文件已存在，跳过下载: {path}")
+            return path
+        elif legacy_path.exists() and not self.part_path(path).exists():
+            # 没有清单记录的旧文件无法确认完整，转为 .part 续传校验(完整时服务器返回416)
+            self.logger.warning(f"视频文件未经校验，将续传校验: {legacy_path}")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(legacy_path, self.part_path(path))
+            manifest.set(path.name, url=url, size=None, etag=None, complete=False)
+
+        # 使用信号量控制并发数量
+        with self._semaphore:
+            return self._download_to_file(url, path)
+
+    def get_manifest(self, directory: Path) -> DownloadManifest:
+        """获取目录对应的下载清单(每个目录一个实例，线程间共享)"""
+        with self._manifests_lock:
+            manifest = self._manifests.get(directory)
+            if manifest is None:
+                manifest = self._manifests[directory] = DownloadManifest(directory)
+            return manifest
+
+    @staticmethod
+    def part_path(output_path: Path) -> Path:
+        """未完成下载的临时文件路径"""
+        return output_path.with_name(output_path.name + ".part")
+
+    def _discard(self, output_path: Path, manifest: DownloadManifest) -> None:
+        """删除已有文件、.part 文件和清单记录"""
+        for path in (output_path, self.part_path(output_path)):
+            if path.exists():
+                path.unlink()
+        manifest.remove(output_path.name)
+
     def _download_to_file(self, url: str, output_path: Path) -> Optional[Path]:
         """使用HTTPRequestManager下载文件到本地
 
+        写入 .part 文件，已有 .part 时用Range续传；大小校验通过后原子重命名并记录到清单。
+        大小不符时保留 .part 供下次续传。
+
         Args:
             url: 视频URL
             output_path: 输出路径
@@ -188,45 +381,283 @@ class VideoDownloader:
         Returns:
             Optional[Path]: 下载成功则返回文件路径，否则返回None
         """
+        part_path = self.part_path(output_path)
+        manifest = self.get_manifest(output_path.parent)
         try:
             # 确保输出目录存在
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
+            # 断点续传: 只有清单中记录的同一URL、顺序写入的 .part 才续传
+            # (分段下载的 .part 是预分配的稀疏文件，大小不代表已写入的数据)
+            part_entry = manifest.get(output_path.name) or {}
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            if offset and (part_entry.get('url') != url or part_entry.get('segmented')):
+                part_path.unlink()
+                offset = 0
+
+            headers = {}
+            if offset:
+                headers['Range'] = f"bytes={offset}-"
+                if part_entry.get('etag'):
+                    headers['If-Range'] = part_entry['etag']
+
             # 使用自定义的session进行流式请求
-            with self.http_manager.session.get(url, stream=True, timeout=self.config.request_timeout) as response:
+            with self.http_manager.session.get(url, stream=True, headers=headers,
+                                               timeout=self.config.request_timeout) as response:
+                if response.status_code == 416 and offset:
+                    # 请求范围超出文件末尾: .part 可能已完整，按服务器返回或清单记录的大小校验
+                    total_size = self._total_size(response, offset) or part_entry.get('size')
+                    if total_size != offset:
+                        part_path.unlink()
+                        manifest.remove(output_path.name)
+                        self.logger.warning(f"无法续传，下次运行时重新下载: {output_path.name}")
+                        return None
+                    return self._finalize(url, output_path, total_size, part_entry.get('etag'))
+
                 if not response.ok:
                     self.logger.error(f"HTTP错误: {response.status_code}, URL: {url}")
                     return None
 
-                # 获取内容大小（如果服务器提供）
-                total_size = int(response.headers.get('content-length', 0))
+                etag = response.headers.get('etag')
+                resumed = offset > 0 and response.status_code == 206
+                if offset and not resumed:
+                    # 服务器忽略了Range或文件已变化，从头下载
+                    self.logger.info(f"无法续传，从头下载: {output_path.name}")
+                    offset = 0
+                total_size = self._total_size(response, offset)
+                segmented = bool(not offset and total_size and self.config.range_segments > 1 and
+                                 total_size >= self.config.range_segment_min_bytes and
+                                 response.headers.get('accept-ranges', '').lower() == 'bytes')
+
+                # 记录 .part 的来源，便于中断后续传
+                manifest.set(output_path.name, url=url, size=total_size, etag=etag,
+                             segmented=segmented, complete=False)
+
+                if segmented:
+                    response.close()
+                    completed = False
+                    try:
+                        completed = self._download_segments(url, part_path, total_size, etag)
+                    finally:
+                        # 任一分段失败或中断(包括异常和Ctrl-C)时丢弃 .part，不留下带空洞的文件
+                        if not completed:
+                            part_path.unlink(missing_ok=True)
+                            manifest.remove(output_path.name)
+                    if not completed:
+                        return None
+                else:
+                    if resumed:
+                        self.logger.info(f"从 {offset} 字节处续传: {output_path.name}")
+                    with open(part_path, 'ab' if resumed else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=self.config.chunk_size):
+                            if chunk:
+                                f.write(chunk)
+
+            return self._finalize(url, output_path, total_size, etag)
 
-                # 实现分块下载
-                with open(output_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=self.config.chunk_size):
+        except Exception as e:
+            self.logger.error(f"下载视频文件失败: {str(e)}", exc_info=True)
+            return None
+
+    @staticmethod
+    def _total_size(response, offset: int) -> Optional[int]:
+        """从响应头推算完整文件大小，无法确定时返回None"""
+        content_range = response.headers.get('content-range', '')
+        if response.status_code in (206, 416) and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1]
+            if total.isdigit():
+                return int(total)
+        content_length = response.headers.get('content-length')
+        if response.status_code == 200 and content_length and content_length.isdigit():
+            return int(content_length)
+        if response.status_code == 206 and content_length and content_length.isdigit():
+            return int(content_length) + offset
+        return None
+
+    def _download_segments(self, url: str, part_path: Path, total_size: int, etag: Optional[str]) -> bool:
+        """按字节范围分段并行下载到预分配的 .part 文件
+
+        分段下载不支持续传，任一分段失败时返回False(或抛出异常)，由调用方删除 .part。
+        """
+        segments = self.config.range_segments
+        segment_size = -(-total_size // segments)
+        ranges = [(start, min(start + segment_size, total_size) - 1)
+                  for start in range(0, total_size, segment_size)]
+
+        with open(part_path, 'wb') as f:
+            f.truncate(total_size)
+
+        def fetch(byte_range) -> bool:
+            start, end = byte_range
+            headers = {'Range': f"bytes={start}-{end}"}
+            if etag:
+                headers['If-Range'] = etag
+            with self.http_manager.session.get(url, stream=True, headers=headers,
+                                               timeout=self.config.request_timeout) as response:
+                if response.status_code != 206:
+                    self.logger.error(f"分段请求失败: status={response.status_code}, range={start}-{end}")
+                    return False
+                with open(part_path, 'r+b') as f:
+                    f.seek(start)
+                    for chunk in response.iter_content(chunk_size=self.SEGMENT_CHUNK_SIZE):
                         if chunk:
                             f.write(chunk)
+                    return f.tell() == end + 1
 
-                # 验证下载文件
-                if output_path.exists() and output_path.stat().st_size > 0:
-                    if total_size > 0 and abs(output_path.stat().st_size - total_size) > 100:
-                        # 文件大小不符合预期，可能下载不完整
-                        self.logger.warning(
-                            f"文件大小不符预期: {output_path.stat().st_size} bytes vs 预期 {total_size} bytes")
+        self.logger.info(f"分段下载 {part_path.name} | size={total_size} | segments={len(ranges)}")
+        with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="clip-segment") as executor:
+            results = list(executor.map(fetch, ranges))
 
-                self.logger.info(f"视频下载成功: {output_path}")
-                return output_path
+        return all(results)
 
-        except Exception as e:
-            self.logger.error(f"下载视频文件失败: {str(e)}", exc_info=True)
+    def _finalize(self, url: str, output_path: Path, expected_size: Optional[int],
+                  etag: Optional[str]) -> Optional[Path]:
+        """校验 .part 大小，通过后计算sha256、原子重命名并写入清单"""
+        part_path = self.part_path(output_path)
+        if not part_path.exists():
+            self.logger.error(f"下载文件不存在: {part_path}")
+            return None
+
+        size = part_path.stat().st_size
+        if not size or (expected_size and size != expected_size):
+            # 保留 .part，下次运行时续传
+            self.logger.warning(f"文件大小不符预期: {size} bytes vs 预期 {expected_size} bytes，"
+                                f"保留未完成文件: {part_path.name}")
             return None
 
+        digest = hashlib.sha256()
+        with open(part_path, 'rb') as f:
+            for block in iter(lambda: f.read(self.SEGMENT_CHUNK_SIZE), b''):
+                digest.update(block)
+
+        os.replace(part_path, output_path)
+        self.get_manifest(output_path.parent).set(
+            output_path.name, url=url, size=size, etag=etag, sha256=digest.hexdigest(),
+            complete=True, completed_at=time.time()
+        )
+        self.logger.info(f"视频下载成功: {output_path}")
+        return output_path
+
     def close(self):
         """关闭下载器并释放资源"""
         if hasattr(self, 'http_manager'):
             self.http_manager.close()
 
 
+@dataclass
+class ClipJob:
+    """一个待下载的视频片段"""
+    event_id: str
+    video_asset: VideoAsset
+    context_measure: Optional[str] = None
+
+
+class ClipDownloadPipeline:
+    """并发视频下载流水线
+
+    - 最多 concurrent_downloads 个片段同时下载，同一主机不超过 max_downloads_per_host 个
+    - 每个片段下载完成后立即调用 on_downloaded 回调(如提交到GIF转换线程池)，
+      后续处理与其余片段的下载重叠进行，而不是等全部下载完成后才开始
+    """
+
+    def __init__(self, downloader: VideoDownloader, max_workers: Optional[int] = None,
+                 max_per_host: Optional[int] = None):
+        self.downloader = downloader
+        self.max_workers = max_workers or downloader.config.concurrent_downloads
+        self.max_per_host = max_per_host or downloader.config.max_downloads_per_host
+        self.logger = AppLogger.get_logger(__name__, app_name='nba')
+        self._host_semaphores: Dict[str, threading.Semaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def _host_semaphore(self, host: str) -> threading.Semaphore:
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._host_semaphores[host] = threading.Semaphore(self.max_per_host)
+            return semaphore
+
+    def run(self,
+            jobs: List[ClipJob],
+            game_id: str,
+            player_id: Optional[int] = None,
+            force_reprocess: bool = False,
+            on_downloaded: Optional[Callable[[str, Path], None]] = None,
+            timeout: Optional[float] = None) -> Dict[str, Path]:
+        """并发下载一组片段
+
+        Args:
+            jobs: 待下载片段
+            game_id: 比赛ID
+            player_id: 球员ID (可选)
+            force_reprocess: 是否强制重新下载
+            on_downloaded: 片段下载成功后的回调 (event_id, path)，在下载线程中执行
+            timeout: 总超时(秒)，超时后未开始的片段不再下载
+
+        Returns:
+            Dict[str, Path]: 下载成功的片段，按jobs顺序排列，以事件ID为键
+        """
+        if not jobs:
+            return {}
+
+        started = time.time()
+        self.logger.info(f"开始并发下载 {len(jobs)} 个视频 | workers={self.max_workers} | "
+                         f"per_host={self.max_per_host}")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="clip-download")
+        try:
+            futures: Dict[str, Future] = {
+                job.event_id: executor.submit(self._download_one, job, game_id, player_id,
+                                              force_reprocess, on_downloaded)
+                for job in jobs
+            }
+            _, not_done = wait(futures.values(), timeout=timeout)
+            if not_done:
+                for future in not_done:
+                    future.cancel()
+                self.logger.warning(f"下载超时，已完成 {len(futures) - len(not_done)}/{len(futures)}")
+        finally:
+            # 已开始的下载会继续完成，未开始的已取消
+            executor.shutdown(wait=True)
+
+        results = {}
+        for event_id, future in futures.items():
+            if future.cancelled():
+                continue
+            path = future.result()
+            if path:
+                results[event_id] = path
+
+        self.logger.info(f"并发下载完成 | succeeded={len(results)}/{len(jobs)} | "
+                         f"elapsed={time.time() - started:.1f}s")
+        return results
+
+    def _download_one(self, job: ClipJob, game_id: str, player_id: Optional[int],
+                      force_reprocess: bool, on_downloaded: Optional[Callable[[str, Path], None]]) -> Optional[Path]:
+        """下载单个片段，成功后调用回调"""
+        try:
+            quality = job.video_asset.get_preferred_quality(self.downloader.config.quality)
+            host = (urlsplit(quality.url).hostname or '') if quality else ''
+            with self._host_semaphore(host):
+                path = self.downloader.download_video(
+                    job.video_asset, game_id, player_id, job.context_measure, force_reprocess
+                )
+        except Exception as e:
+            self.logger.error(f"下载视频出错 {job.event_id}: {str(e)}")
+            return None
+
+        if not path:
+            self.logger.warning(f"视频 {job.event_id} 下载失败")
+            return None
+
+        self.logger.info(f"视频 {job.event_id} 下载成功: {path}")
+        if on_downloaded:
+            try:
+                on_downloaded(job.event_id, path)
+            except Exception as e:
+                self.logger.error(f"下载后处理失败 {job.event_id}: {str(e)}")
+        return path
+
+
 class GameVideoService:
     """NBA比赛视频服务 - 增强版，整合业务逻辑"""
 
@@ -236,6 +667,7 @@ class GameVideoService:
         self.video_fetcher = VideoFetcher()  # 使用 VideoFetcher
         self.video_parser = VideoParser()  # 保留 VideoParser 用于解析
         self.downloader = VideoDownloader(config=self.config)
+        self.download_pipeline = ClipDownloadPipeline(self.downloader)
         # 视频处理器 (由外部注入或内部创建)
         self.video_processor = video_processor or VideoProcessor(VideoProcessConfig())
 
@@ -406,13 +838,27 @@ class GameVideoService:
             all_videos = videos_result["videos"]
             videos_type_map = videos_result["videos_type_map"]
 
+            # 需要GIF时，每个片段下载完成后立即提交GIF转换，与其余片段的下载并行
+            gif_futures: Dict[str, Future] = {}
+            on_downloaded = None
+            if output_format in ("gif", "both"):
+                gif_dir = self.config.get_player_gif_dir(player_id, game_id)
+
+                def submit_gif_on_download(event_id: str, video_path: Path) -> None:
+                    gif_futures[event_id] = self._submit_gif(
+                        event_id, video_path, gif_dir, player_id, force_reprocess
+                    )
+
+                on_downloaded = submit_gif_on_download
+
             # 下载视频
             videos_dict = self._download_videos(
                 videos=all_videos,
                 game_id=game_id,
                 player_id=player_id,
                 videos_type_map=videos_type_map,
-                force_reprocess=force_reprocess
+                force_reprocess=force_reprocess,
+                on_downloaded=on_downloaded
             )
 
             if not videos_dict:
@@ -434,7 +880,8 @@ class GameVideoService:
                 output_dir=output_dir,
                 output_format=output_format,
                 merge=merge,
-                force_reprocess=force_reprocess
+                force_reprocess=force_reprocess,
+                gif_futures=gif_futures
             )
 
             # 合并结果
@@ -559,10 +1006,11 @@ class GameVideoService:
                          team_id: Optional[int] = None,
                          context_measure: Optional[str] = None,
                          videos_type_map: Optional[Dict[str, str]] = None,
-                         force_reprocess: bool = False) -> Dict[str, Path]:
+                         force_reprocess: bool = False,
+                         on_downloaded: Optional[Callable[[str, Path], None]] = None) -> Dict[str, Path]:
         """下载视频辅助方法
 
-        从视频服务下载一组视频资产。
+        从视频服务并发下载一组视频资产。
 
         Args:
             videos: 视频资产字典
@@ -572,25 +1020,21 @@ class GameVideoService:
             context_measure: 上下文类型 (可选)
             videos_type_map: 视频ID到类型的映射 (可选)
             force_reprocess: 是否强制重新处理
+            on_downloaded: 每个片段下载成功后的回调 (event_id, path)
 
         Returns:
             Dict[str, Path]: 视频路径字典，以事件ID为键
         """
         try:
-            # 如果提供了类型映射，使用单独下载
+            # 如果提供了类型映射，每个视频使用各自的类型
             if videos_type_map:
-                video_paths = {}
-                for event_id, video in videos.items():
-                    # 从映射中获取该视频的类型
-                    video_type = videos_type_map.get(event_id)
-                    # 单独下载每个视频，传递其类型
-                    path = self.downloader.download_video(
-                        video, game_id, player_id, video_type, force_reprocess
-                    )
-                    if path:
-                        video_paths[event_id] = path
-                        self.logger.info(f"视频 {event_id} 下载成功: {path}")
-                return video_paths
+                jobs = [ClipJob(event_id, video, videos_type_map.get(event_id))
+                        for event_id, video in videos.items()]
+                return self.download_pipeline.run(
+                    jobs, game_id, player_id,
+                    force_reprocess=force_reprocess,
+                    on_downloaded=on_downloaded
+                )
             else:
                 # 批量下载
                 return self.batch_download_videos(
@@ -599,7 +1043,8 @@ class GameVideoService:
                     player_id=player_id,
                     team_id=team_id,
                     context_measure=context_measure,
-                    force_reprocess=force_reprocess
+                    force_reprocess=force_reprocess,
+                    on_downloaded=on_downloaded
                 )
 
         except Exception as e:
@@ -613,7 +1058,8 @@ class GameVideoService:
                                output_dir: Path,
                                output_format: str = "both",
                                merge: bool = True,
-                               force_reprocess: bool = False) -> Dict[str, Any]:
+                               force_reprocess: bool = False,
+                               gif_futures: Optional[Dict[str, Future]] = None) -> Dict[str, Any]:
         """处理球员视频，包括合并和创建GIF
 
         Args:
@@ -624,11 +1070,13 @@ class GameVideoService:
             output_format: 输出格式，可选 "video"(仅视频), "gif"(仅GIF), "both"(视频和GIF)
             merge: 是否合并视频
             force_reprocess: 是否强制重新处理
+            gif_futures: 下载阶段已提交的GIF转换任务，以事件ID为键
 
         Returns:
             Dict[str, Any]: 处理结果路径字典
         """
         result = {}
+        gif_futures = gif_futures or {}
 
         # 合并视频
         if merge and (output_format == "video" or output_format == "both"):
@@ -653,16 +1101,19 @@ class GameVideoService:
                     if gif_path:
                         result["merged_gif"] = gif_path
 
-        # 生成GIF
+        # 生成GIF：先收集下载阶段已提交的转换任务，其余视频再批量转换
         if output_format == "gif" or output_format == "both":
             gif_dir = self.config.get_player_gif_dir(player_id, game_id)
 
-            gif_paths = self._create_gifs_from_videos(
-                videos=videos_dict,
-                output_dir=gif_dir,
-                player_id=player_id,
-                force_reprocess=force_reprocess
-            )
+            gif_paths = self._collect_gif_futures(gif_futures)
+            remaining = {event_id: path for event_id, path in videos_dict.items() if event_id not in gif_futures}
+            if remaining:
+                gif_paths.update(self._create_gifs_from_videos(
+                    videos=remaining,
+                    output_dir=gif_dir,
+                    player_id=player_id,
+                    force_reprocess=force_reprocess
+                ))
 
             if gif_paths:
                 result["gifs"] = gif_paths
@@ -782,6 +1233,37 @@ class GameVideoService:
             self.logger.error(f"创建GIF失败: {str(e)}", exc_info=True)
             return {}
 
+    def _submit_gif(self, event_id: str, video_path: Path, output_dir: Path,
+                    player_id: Optional[int] = None, force_reprocess: bool = False) -> Future:
+        """提交单个视频的GIF转换任务到视频处理器的线程池
+
+        Returns:
+            Future: 结果为GIF路径或None
+        """
+        if player_id:
+            gif_path = output_dir / f"round_{event_id}_{player_id}.gif"
+        else:
+            gif_path = output_dir / f"event_{event_id}.gif"
+        return self.video_processor.submit_gif(video_path, gif_path, force_reprocess=force_reprocess)
+
+    def _collect_gif_futures(self, gif_futures: Dict[str, Future]) -> Dict[str, Path]:
+        """等待已提交的GIF转换任务完成
+
+        Returns:
+            Dict[str, Path]: GIF路径字典，以事件ID为键
+        """
+        gif_result = {}
+        for event_id, future in gif_futures.items():
+            try:
+                gif_path = future.result()
+            except Exception as e:
+                self.logger.error(f"GIF转换任务失败 {event_id}: {str(e)}")
+                continue
+            if gif_path:
+                gif_result[event_id] = gif_path
+                self.logger.info(f"GIF创建成功: {gif_path}")
+        return gif_result
+
     def _extract_event_id(self, path: Path) -> int:
         """从文件名中提取事件ID
 
@@ -810,7 +1292,8 @@ class GameVideoService:
             team_id: Optional[int] = None,
             context_measure: Optional[str] = None,
             max_videos: Optional[int] = None,
-            force_reprocess: bool = False
+            force_reprocess: bool = False,
+            on_downloaded: Optional[Callable[[str, Path], None]] = None
     ) -> Dict[str, Path]:
         """批量下载视频（支持最大数量限制）
 
@@ -822,6 +1305,7 @@ class GameVideoService:
             context_measure: 上下文指标 (可选)
             max_videos: 最大下载视频数量 (可选)
             force_reprocess: 是否强制重新处理
+            on_downloaded: 每个片段下载成功后的回调 (event_id, path)
 
         Returns:
             Dict[str, Path]: 视频路径字典
@@ -847,7 +1331,8 @@ class GameVideoService:
             player_id,
             context_measure,
             timeout=self.config.request_timeout * len(limited_videos),  # 根据视频数量调整总超时
-            force_reprocess=force_reprocess
+            force_reprocess=force_reprocess,
+            on_downloaded=on_downloaded
         )
 
     def download_videos(
@@ -857,42 +1342,35 @@ class GameVideoService:
             player_id: Optional[int] = None,
             context_measure: Optional[str] = None,
             timeout: float = 300.0,
-            force_reprocess: bool = False
+            force_reprocess: bool = False,
+            on_downloaded: Optional[Callable[[str, Path], None]] = None
     ) -> Dict[str, Path]:
-        """同步下载多个视频"""
-        results: Dict[str, Path] = {}
-        start_time = time.time()
-
-        try:
-            self.logger.info(f"开始下载 {len(videos)} 个视频")
-
-            # 处理每个视频
-            for event_id, video in videos.items():
-                try:
-                    # 检查是否超时
-                    if time.time() - start_time > timeout:
-                        self.logger.warning(f"下载超时，已下载 {len(results)}/{len(videos)}")
-                        break
-
-                    # 传递player_id和context_measure参数
-                    result_path = self.downloader.download_video(
-                        video, game_id, player_id, context_measure,
-                        force_reprocess=force_reprocess
-                    )
-                    if result_path:
-                        results[event_id] = result_path
-                        self.logger.info(f"视频 {event_id} 下载成功: {result_path}")
-                    else:
-                        self.logger.warning(f"视频 {event_id} 下载失败")
+        """并发下载多个视频
 
-                except Exception as e:
-                    self.logger.error(f"下载视频出错 {event_id}: {str(e)}")
+        Args:
+            videos: 视频资源字典
+            game_id: 比赛ID
+            player_id: 球员ID (可选)
+            context_measure: 上下文指标 (可选)
+            timeout: 总超时(秒)
+            force_reprocess: 是否强制重新处理
+            on_downloaded: 每个片段下载成功后的回调 (event_id, path)
 
-            return results
+        Returns:
+            Dict[str, Path]: 视频路径字典，以事件ID为键
+        """
+        try:
+            jobs = [ClipJob(event_id, video, context_measure) for event_id, video in videos.items()]
+            return self.download_pipeline.run(
+                jobs, game_id, player_id,
+                force_reprocess=force_reprocess,
+                on_downloaded=on_downloaded,
+                timeout=timeout
+            )
 
         except Exception as e:
             self.logger.error(f"批量下载视频失败: {str(e)}", exc_info=True)
-            return results
+            return {}
 
     def clear_cache(self):
         """清理视频服务缓存"""
@@ -1246,4 +1246,9 @@ class NBAService(BaseService):
                 "error": health.error_message
             }
 
+        # 数据服务附带解析后比赛缓存的统计
+        data_service = self._services.get('data')
+        if 'data' in result and data_service is not None:
+            result['data']['game_cache'] = data_service.get_cache_stats()
+
         return result
\ No newline at end of file
@@ -0,0 +1,190 @@
+# utils/async_fetch_engine.py
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, Mapping, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from config import NBAConfig
+from utils.http_handler import RateLimitedAdapter
+from utils.logger_handler import AppLogger
+
+
+class AsyncFetchEngine:
+    """异步批量抓取引擎
+
+    面向 cdn.nba.com 这类可承受高并发的静态JSON文件:
+    1. asyncio负责调度、按主机限流(每个主机一个信号量)和退避重试
+    2. 实际IO复用一个连接池化的 requests.Session，在有界线程池中执行
+    3. 与 HTTPRequestManager 的stats API节流互不影响，stats.nba.com 默认并发为1
+    4. 请求同样计入 HostRateLimiter 的主机令牌桶，与其他组件共享速率预算
+
+    用法:
+        engine = AsyncFetchEngine()
+        results = engine.fetch_all({game_id: url, ...})
+    """
+
+    # 需要退避重试的状态码
+    RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, host_limits: Optional[Dict[str, int]] = None,
+                 default_limit: Optional[int] = None,
+                 pool_size: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        """初始化抓取引擎
+
+        Args:
+            host_limits: 主机名到最大并发数的映射
+            default_limit: 未配置主机的最大并发数
+            pool_size: 连接池大小
+            timeout: 单个请求超时(秒)
+            max_retries: 最大重试次数
+            headers: 附加请求头
+        """
+        network = NBAConfig.NETWORK
+        self.host_limits = dict(network.ASYNC_HOST_LIMITS)
+        self.host_limits.update(host_limits or {})
+        self.default_limit = default_limit or network.ASYNC_DEFAULT_HOST_LIMIT
+        self.pool_size = pool_size or network.ASYNC_POOL_SIZE
+        self.timeout = timeout or network.ASYNC_TIMEOUT
+        self.max_retries = network.ASYNC_MAX_RETRIES if max_retries is None else max_retries
+        self.logger = AppLogger.get_logger(__name__, app_name='network')
+
+        self.session = self._create_session(headers)
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="async-fetch")
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "succeeded": 0, "failed": 0, "retries": 0, "bytes": 0}
+
+    def _create_session(self, headers: Optional[Dict[str, str]]) -> requests.Session:
+        """创建连接池化的会话，每个主机最多保持 pool_size 个连接，请求计入共享的主机令牌桶"""
+        session = requests.Session()
+        session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+        if headers:
+            session.headers.update(headers)
+        adapter = RateLimitedAdapter(pool_connections=8, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def __enter__(self) -> 'AsyncFetchEngine':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """关闭线程池和会话"""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def fetch_all(self, urls: Mapping[Hashable, str]) -> Dict[Hashable, Optional[Dict[str, Any]]]:
+        """同步入口：并发获取一组URL的JSON数据
+
+        Args:
+            urls: 键(如game_id)到URL的映射
+
+        Returns:
+            Dict: 键到JSON数据的映射，失败的请求为None
+        """
+        if not urls:
+            return {}
+
+        started = time.perf_counter()
+        results = asyncio.run(self.fetch_many(urls))
+        elapsed = time.perf_counter() - started
+        succeeded = sum(1 for data in results.values() if data is not None)
+        self.logger.info(f"异步批量抓取完成 | count={len(urls)} | succeeded={succeeded} | "
+                         f"elapsed={elapsed:.2f}s | rate={len(urls) / elapsed if elapsed > 0 else 0:.1f}/s")
+        return results
+
+    async def fetch_many(self, urls: Mapping[Hashable, str]) -> Dict[Hashable, Optional[Dict[str, Any]]]:
+        """在当前事件循环中并发获取一组URL
+
+        Args:
+            urls: 键到URL的映射
+
+        Returns:
+            Dict: 键到JSON数据的映射，失败的请求为None
+        """
+        # 信号量与事件循环绑定，每次调用重新创建
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        for url in urls.values():
+            host = urlsplit(url).hostname or ''
+            if host not in semaphores:
+                semaphores[host] = asyncio.Semaphore(self.host_limits.get(host, self.default_limit))
+
+        async def fetch_one(key: Hashable, url: str):
+            async with semaphores[urlsplit(url).hostname or '']:
+                return key, await self.fetch_json(url)
+
+        pairs = await asyncio.gather(*(fetch_one(key, url) for key, url in urls.items()))
+        return dict(pairs)
+
+    async def fetch_json(self, url: str) -> Optional[Dict[str, Any]]:
+        """获取单个URL的JSON数据，429/5xx/网络异常时指数退避重试
+
+        调用方负责主机并发控制(fetch_many已处理)。
+
+        Returns:
+            Dict: JSON数据；404/403等不可重试错误或重试耗尽时返回None
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            self._count("requests")
+            try:
+                status, body = await loop.run_in_executor(self._executor, self._get, url)
+            except requests.RequestException as e:
+                status, body = None, None
+                error = str(e)
+            else:
+                error = None
+
+            if status == 200:
+                try:
+                    data = json.loads(body)
+                except ValueError as e:
+                    self.logger.error(f"JSON解析失败 | url={url} | error='{e}'")
+                    self._count("failed")
+                    return None
+                self._count("succeeded")
+                self._count("bytes", len(body))
+                return data
+
+            retryable = status is None or status in self.RETRY_STATUS
+            if not retryable or attempt >= self.max_retries:
+                self.logger.warning(f"异步请求失败 | url={url} | status={status} | error='{error}' | "
+                                    f"attempts={attempt + 1}")
+                self._count("failed")
+                return None
+
+            attempt += 1
+            self._count("retries")
+            wait = min(0.5 * 2 ** attempt, 8.0) + random.uniform(0, 0.5)
+            self.logger.debug(f"异步请求重试 | url={url} | status={status} | wait={wait:.2f}s | attempt={attempt}")
+            await asyncio.sleep(wait)
+
+    def _get(self, url: str):
+        """在线程池中执行的阻塞GET，只返回状态码和原始内容"""
+        response = self.session.get(url, timeout=self.timeout)
+        return response.status_code, response.content
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += value
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取请求统计"""
+        with self._stats_lock:
+            return dict(self._stats)
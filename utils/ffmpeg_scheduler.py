@@ -0,0 +1,248 @@
+#utils/ffmpeg_scheduler.py
+"""
+本模块提供ffmpeg任务调度，所有ffmpeg子进程(合并、去水印、GIF)都经由同一个调度器执行:
+- 按CPU核数确定线程预算，每个任务按线程提示占用预算，避免过度订阅或闲置核心
+- 优先级队列: 短小的GIF任务优先于耗时的合并/重编码任务
+- 通过 -progress pipe:1 读取实时进度
+- 记录每个任务的耗时和实时倍率(处理的媒体时长 / 实际耗时)
+主要类:
+- FFmpegJobResult: 任务结果数据类
+- FFmpegScheduler: 调度器主类
+"""
+import heapq
+import itertools
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from utils.logger_handler import AppLogger
+
+
+@dataclass
+class FFmpegJobResult:
+    """ffmpeg任务结果"""
+    task_id: str
+    kind: str
+    success: bool
+    returncode: Optional[int]
+    threads: int
+    wait_time: float  # 排队时间(秒)
+    wall_time: float  # 执行耗时(秒)
+    media_time: float  # ffmpeg报告的已处理媒体时长(秒)
+    stderr: str = ""
+
+    @property
+    def realtime_factor(self) -> Optional[float]:
+        """实时倍率: 大于1表示处理快于实时播放"""
+        if self.wall_time <= 0 or self.media_time <= 0:
+            return None
+        return self.media_time / self.wall_time
+
+
+class FFmpegScheduler:
+    """ffmpeg任务调度器
+
+    调用线程在 run() 中排队，轮到队首且空闲线程预算足够时才启动ffmpeg进程，
+    因此可以直接在现有的线程池中调用，并发上限由线程预算决定。
+    """
+
+    # 任务类型优先级，数值越小越先执行
+    PRIORITIES = {
+        'gif': 0,
+        'palette': 0,
+        'concat': 1,
+        'delogo': 2,
+    }
+    DEFAULT_PRIORITY = 1
+
+    _shared: Optional['FFmpegScheduler'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, cpu_threads: Optional[int] = None, history_size: int = 200):
+        """
+        Args:
+            cpu_threads: 线程预算，默认为CPU核数
+            history_size: 保留的最近任务结果数量
+        """
+        self.cpu_threads = max(1, cpu_threads or os.cpu_count() or 1)
+        self.logger = AppLogger.get_logger(__name__, app_name='nba')
+        self._condition = threading.Condition()
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._used_threads = 0
+        self._active: Dict[str, Dict[str, Any]] = {}
+        self._history: Deque[FFmpegJobResult] = deque(maxlen=history_size)
+
+    @classmethod
+    def shared(cls) -> 'FFmpegScheduler':
+        """进程内共享的调度器，多个VideoProcessor共用同一份CPU预算"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def run(self,
+            cmd: List[str],
+            task_id: str,
+            kind: str = 'ffmpeg',
+            threads: int = 1,
+            duration: Optional[float] = None,
+            on_progress: Optional[Callable[[str, float, Optional[float]], None]] = None) -> FFmpegJobResult:
+        """排队执行一条ffmpeg命令，阻塞直到完成
+
+        Args:
+            cmd: 完整的ffmpeg命令，最后一个参数为输出路径
+            task_id: 任务ID
+            kind: 任务类型，决定优先级
+            threads: 线程提示，占用的线程预算(超过预算时按预算计)，同时作为 -threads 传给ffmpeg
+            duration: 预期媒体时长(秒)，用于计算进度比例
+            on_progress: 进度回调 (task_id, 已处理秒数, 进度比例或None)
+
+        Returns:
+            FFmpegJobResult: 任务结果
+        """
+        threads = min(max(1, threads), self.cpu_threads)
+        priority = self.PRIORITIES.get(kind, self.DEFAULT_PRIORITY)
+        queued_at = time.perf_counter()
+
+        self._acquire(priority, threads)
+        started_at = time.perf_counter()
+        with self._condition:
+            self._active[task_id] = {'kind': kind, 'threads': threads, 'started_at': started_at,
+                                     'media_time': 0.0, 'fraction': None}
+        try:
+            returncode, media_time, stderr = self._execute(
+                self._build_command(cmd, threads), task_id, duration, on_progress
+            )
+        finally:
+            with self._condition:
+                self._active.pop(task_id, None)
+            self._release(threads)
+
+        result = FFmpegJobResult(
+            task_id=task_id,
+            kind=kind,
+            success=returncode == 0,
+            returncode=returncode,
+            threads=threads,
+            wait_time=started_at - queued_at,
+            wall_time=time.perf_counter() - started_at,
+            media_time=media_time,
+            stderr=stderr
+        )
+        with self._condition:
+            self._history.append(result)
+
+        factor = f"{result.realtime_factor:.2f}x" if result.realtime_factor else "-"
+        self.logger.info(f"ffmpeg任务{'完成' if result.success else '失败'}[{task_id}] kind={kind} "
+                         f"threads={threads} | 排队 {result.wait_time:.2f}s | 耗时 {result.wall_time:.2f}s | "
+                         f"媒体时长 {media_time:.2f}s | 实时倍率 {factor}")
+        return result
+
+    def _acquire(self, priority: int, threads: int) -> None:
+        """排队等待: 只有队首任务在预算足够时才能启动，保证高优先级任务不被插队"""
+        entry = (priority, next(self._sequence), threads)
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+            while self._queue[0] is not entry or self._used_threads + threads > self.cpu_threads:
+                self._condition.wait()
+            heapq.heappop(self._queue)
+            self._used_threads += threads
+            self._condition.notify_all()
+
+    def _release(self, threads: int) -> None:
+        with self._condition:
+            self._used_threads -= threads
+            self._condition.notify_all()
+
+    @staticmethod
+    def _build_command(cmd: List[str], threads: int) -> List[str]:
+        """加入进度输出和线程数参数(-threads 作为输出选项放在输出路径之前)"""
+        return [cmd[0], '-hide_banner', '-nostats', '-progress', 'pipe:1', *cmd[1:-1],
+                '-threads', str(threads), cmd[-1]]
+
+    def _execute(self, cmd: List[str], task_id: str, duration: Optional[float],
+                 on_progress: Optional[Callable[[str, float, Optional[float]], None]]) -> tuple:
+        """启动ffmpeg并读取 -progress 输出，返回 (returncode, 媒体时长, stderr)"""
+        process = None
+        stderr_chunks: List[bytes] = []
+        media_time = 0.0
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+            # stderr 单独线程读取，避免管道写满阻塞ffmpeg
+            stderr_reader = threading.Thread(
+                target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+            )
+            stderr_reader.start()
+
+            for raw_line in process.stdout:
+                key, _, value = raw_line.decode(errors='replace').strip().partition('=')
+                if key == 'out_time_us' and value.isdigit():
+                    media_time = int(value) / 1_000_000
+                elif key == 'progress':
+                    fraction = min(1.0, media_time / duration) if duration else None
+                    with self._condition:
+                        if task_id in self._active:
+                            self._active[task_id].update(media_time=media_time, fraction=fraction)
+                    if on_progress:
+                        on_progress(task_id, media_time, fraction)
+
+            process.wait()
+            stderr_reader.join()
+            return process.returncode, media_time, b''.join(stderr_chunks).decode(errors='replace')
+
+        except KeyboardInterrupt:
+            self.logger.warning(f"任务被取消[{task_id}]")
+            if process:
+                process.terminate()
+                process.wait()
+            raise
+
+        except Exception as e:
+            self.logger.error(f"处理出错[{task_id}]: {str(e)}")
+            if process and process.poll() is None:
+                process.kill()
+                process.wait()
+            return None, media_time, str(e)
+
+    def active_jobs(self) -> Dict[str, Dict[str, Any]]:
+        """正在执行的任务及其进度"""
+        now = time.perf_counter()
+        with self._condition:
+            return {
+                task_id: {**info, 'elapsed': now - info['started_at']}
+                for task_id, info in self._active.items()
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """按任务类型汇总最近任务的耗时和实时倍率"""
+        with self._condition:
+            history = list(self._history)
+            queued = len(self._queue)
+            used = self._used_threads
+
+        by_kind: Dict[str, Dict[str, Any]] = {}
+        for result in history:
+            summary = by_kind.setdefault(result.kind, {
+                'jobs': 0, 'failures': 0, 'wall_time': 0.0, 'wait_time': 0.0, 'media_time': 0.0
+            })
+            summary['jobs'] += 1
+            summary['failures'] += 0 if result.success else 1
+            summary['wall_time'] += result.wall_time
+            summary['wait_time'] += result.wait_time
+            summary['media_time'] += result.media_time
+        for summary in by_kind.values():
+            summary['realtime_factor'] = (summary['media_time'] / summary['wall_time']
+                                          if summary['wall_time'] > 0 else None)
+
+        return {
+            'cpu_threads': self.cpu_threads,
+            'used_threads': used,
+            'queued': queued,
+            'by_kind': by_kind,
+        }
@@ -10,17 +10,23 @@
 - RetryableErrorType: 可重试错误类型枚举
 - RetryConfig: 重试配置数据类
 - RetryStrategy: 重试策略类
+- ConditionalRequest: 条件请求(ETag/Last-Modified)上下文
 - RequestWindowManager: 请求窗口管理器
+- HostRateLimiter: 按主机共享的令牌桶限速器
+- RateLimitedAdapter: 发送前向HostRateLimiter申请令牌的HTTPAdapter
 - BatchRequestManager: 批量请求管理器
 - HTTPRequestManager: HTTP请求管理器主类
 """
 import time
 import random
+import threading
 from dataclasses import dataclass
 import requests
 from enum import Enum
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Tuple
+from urllib.parse import urlsplit
 from requests.adapters import HTTPAdapter
+from config import NBAConfig
 from utils.logger_handler import AppLogger
 
 
@@ -141,6 +147,45 @@ class RetryStrategy:
         return False, 0
 
 
+@dataclass
+class ConditionalRequest:
+    """条件请求上下文
+
+    请求前提供已缓存的数据和校验信息(ETag/Last-Modified)，
+    服务器返回304时 make_request 直接返回 cached_data；
+    返回200时用响应头中的新校验信息原地更新本对象。
+    """
+    cached_data: Optional[Dict] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+    def request_headers(self) -> Dict[str, str]:
+        """生成条件请求头，没有缓存数据时不发送校验信息"""
+        headers = {}
+        if self.cached_data is None:
+            return headers
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def update_from_response(self, response: requests.Response) -> None:
+        """从200响应中记录新的校验信息"""
+        self.not_modified = False
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+
+    def merge_validators(self, metadata: Optional[Dict]) -> Optional[Dict]:
+        """把校验信息合并到缓存元数据中"""
+        validators = {key: value for key, value in
+                      (('etag', self.etag), ('last_modified', self.last_modified)) if value}
+        if not validators:
+            return metadata
+        return {**(metadata or {}), **validators}
+
+
 #############################################################################
 # 2.请求速率控制
 #############################################################################
@@ -281,6 +326,142 @@ class RequestWindowManager:
         return result
 
 
+class _TokenBucket:
+    """单个主机的令牌桶
+
+    采用预约方式: 令牌不足时先扣成负数并返回需要等待的时间，
+    调用方在锁外睡眠，多个线程按申请顺序错开，而不是同时醒来
+    """
+    __slots__ = ('rate', 'burst', 'tokens', 'updated', 'blocked_until', 'acquired', 'waited')
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.acquired = 0
+        self.waited = 0.0
+
+    def reserve(self, now: float) -> float:
+        """申请一个令牌，返回需要等待的秒数"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        wait = max(wait, self.blocked_until - now)
+        self.acquired += 1
+        self.waited += wait
+        return wait
+
+
+class HostRateLimiter:
+    """按主机共享的令牌桶限速器
+
+    进程内所有 HTTPRequestManager 共用同一个实例(get_instance)，
+    不同fetcher并发请求同一主机时共享该主机的速率预算。
+    速率和突发容量由 NBAConfig.NETWORK.HOST_RATE_LIMITS 配置。
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 default_limit: Optional[Tuple[float, float]] = None):
+        """初始化限速器
+
+        Args:
+            limits: 主机名到 (每秒令牌数, 桶容量) 的映射，子域名按后缀匹配
+            default_limit: 未配置主机的 (每秒令牌数, 桶容量)
+        """
+        self.limits = dict(NBAConfig.NETWORK.HOST_RATE_LIMITS if limits is None else limits)
+        self.default_limit = default_limit or NBAConfig.NETWORK.DEFAULT_HOST_RATE_LIMIT
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.logger = AppLogger.get_logger(__name__, app_name='network')
+
+    @classmethod
+    def get_instance(cls) -> 'HostRateLimiter':
+        """获取进程内共享的限速器"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _limit_for(self, host: str) -> Tuple[float, float]:
+        """查找主机的限速配置，先精确匹配再按域名后缀匹配"""
+        if host in self.limits:
+            return self.limits[host]
+        for configured, limit in self.limits.items():
+            if host.endswith('.' + configured):
+                return limit
+        return self.default_limit
+
+    def _bucket(self, host: str) -> _TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self._limit_for(host)
+            bucket = self._buckets[host] = _TokenBucket(rate, burst)
+        return bucket
+
+    def acquire(self, host: str) -> float:
+        """申请向主机发送一次请求，必要时阻塞等待
+
+        Args:
+            host: 主机名
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        with self._lock:
+            wait = self._bucket(host).reserve(time.monotonic())
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, host: str, seconds: float) -> None:
+        """主机返回限流/服务端错误时，暂停所有线程对该主机的请求
+
+        Args:
+            host: 主机名
+            seconds: 暂停时长(秒)
+        """
+        with self._lock:
+            bucket = self._bucket(host)
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + seconds)
+        self.logger.warning(f"主机限速暂停 | host={host} | seconds={seconds:.1f}")
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """获取各主机的令牌桶统计"""
+        with self._lock:
+            return {
+                host: {
+                    "rate": bucket.rate,
+                    "burst": bucket.burst,
+                    "acquired": bucket.acquired,
+                    "waited_seconds": round(bucket.waited, 3),
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """发送请求前向共享的 HostRateLimiter 申请令牌
+
+    挂载到任意 requests.Session 上即可让该会话的请求(包括流式下载和重试)
+    计入对应主机的速率预算。
+    """
+
+    def __init__(self, *args, rate_limiter: Optional[HostRateLimiter] = None, **kwargs):
+        self.rate_limiter = rate_limiter or HostRateLimiter.get_instance()
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        self.rate_limiter.acquire(urlsplit(request.url).hostname or '')
+        return super().send(request, **kwargs)
+
+
 #############################################################################
 # 3.批量请求管理器
 #############################################################################
@@ -482,6 +663,10 @@ class HTTPRequestManager:
         self.retry_strategy = RetryStrategy(RetryConfig())
         self.timeout = timeout or 30
         self.logger = AppLogger.get_logger(__name__, app_name='network')
+
+        # 限速模式：token_bucket 由共享的按主机令牌桶控制速率，adaptive 为每实例的自适应等待
+        self.rate_limiter = HostRateLimiter.get_instance()
+        self.token_bucket_enabled = NBAConfig.NETWORK.RATE_LIMIT_MODE == "token_bucket"
         self.session = self._create_session()
 
         # 请求间隔控制
@@ -538,7 +723,11 @@ class HTTPRequestManager:
         """创建HTTP会话"""
         session = requests.Session()
         session.headers.update(self.headers)
-        adapter = HTTPAdapter(max_retries=1)  # 内置重试设为1，使用自定义重试策略
+        # 内置重试设为1，使用自定义重试策略
+        if self.token_bucket_enabled:
+            adapter = RateLimitedAdapter(max_retries=1, rate_limiter=self.rate_limiter)
+        else:
+            adapter = HTTPAdapter(max_retries=1)
         session.mount('http://', adapter)
         session.mount('https://', adapter)
         return session
@@ -586,6 +775,29 @@ class HTTPRequestManager:
             self.last_long_wait_duration = duration
 
     def _wait_for_rate_limit(self):
+        """请求前的速率控制
+
+        令牌桶模式下速率由 RateLimitedAdapter 在发送时统一控制，这里只处理连续失败和会话轮换；
+        adaptive模式沿用每实例的自适应等待策略。
+        """
+        if not self.token_bucket_enabled:
+            self._wait_for_adaptive_delay()
+            return
+
+        if self._consecutive_failures >= 3:
+            self.logger.warning(f"连续失败次数过多({self._consecutive_failures})，重置会话")
+            self._reset_session()
+            self._consecutive_failures = 0
+
+        self._maintain_session()
+        self.last_request_time = time.time()
+
+    def _penalize_host(self, url: str, seconds: float) -> None:
+        """令牌桶模式下，把429/5xx的退避时间同步给访问同一主机的所有线程"""
+        if self.token_bucket_enabled:
+            self.rate_limiter.penalize(urlsplit(url).hostname or '', seconds)
+
+    def _wait_for_adaptive_delay(self):
         """等待请求间隔 - 优化的自适应策略
 
         控制请求频率，实现自适应等待策略，根据多种因素动态调整等待时间。
@@ -703,6 +915,11 @@ class HTTPRequestManager:
             self._record_delay(delay_source, wait_time)
             time.sleep(wait_time)
 
+        self._maintain_session()
+        self.last_request_time = time.time()
+
+    def _maintain_session(self):
+        """更新会话年龄并按请求数、存活时间和随机概率轮换会话"""
         # 检查是否需要重置会话
         self.session_age += 1
         self.total_requests += 1
@@ -723,8 +940,6 @@ class HTTPRequestManager:
             self.logger.info("随机重置会话，避免出现规律")
             self._reset_session()
 
-        self.last_request_time = time.time()
-
     # 批量请求相关方法 - 保持原有公共接口，内部使用BatchRequestManager
     def wait_for_next_batch(self):
         """等待直到可以处理下一批次"""
@@ -759,7 +974,8 @@ class HTTPRequestManager:
         return stats
 
     def make_request(self, url: str, method: str = 'GET', params: Optional[Dict[str, Any]] = None,
-                     data: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
+                     data: Optional[Dict[str, Any]] = None,
+                     conditional: Optional[ConditionalRequest] = None) -> Optional[Dict]:
         """发送HTTP请求
 
         执行HTTP请求，包含速率限制、重试逻辑和错误处理。
@@ -769,6 +985,7 @@ class HTTPRequestManager:
             method: HTTP方法(默认'GET')
             params: URL查询参数(可选)
             data: 请求体数据(可选)
+            conditional: 条件请求上下文(可选)，服务器返回304时直接返回其中的缓存数据
 
         Returns:
             Dict: 响应JSON数据，失败时返回None
@@ -784,21 +1001,36 @@ class HTTPRequestManager:
                     self._wait_for_rate_limit()
 
                     # 发送请求
+                    headers = self.headers
+                    if conditional is not None:
+                        headers = {**self.headers, **conditional.request_headers()}
                     response = self.session.request(
                         method=method.upper(),
                         url=url,
                         params=params,
                         json=data,
                         timeout=self.timeout,
-                        headers=self.headers
+                        headers=headers
                     )
 
                     self.logger.info(f"正在请求: {method} {response.request.url}")
 
+                    if response.status_code == 304 and conditional is not None \
+                            and conditional.cached_data is not None:
+                        # 内容未变化，使用缓存数据
+                        self._consecutive_failures = 0
+                        conditional.not_modified = True
+                        conditional.etag = response.headers.get('ETag', conditional.etag)
+                        conditional.last_modified = response.headers.get('Last-Modified', conditional.last_modified)
+                        return conditional.cached_data
+
                     if response.ok:
                         # 请求成功，重置连续失败计数
                         self._consecutive_failures = 0
-                        return response.json()
+                        result = response.json()
+                        if conditional is not None:
+                            conditional.update_from_response(response)
+                        return result
                     else:
                         self.logger.warning(f"请求失败: {response.status_code}, URL: {url}")
 
@@ -818,6 +1050,8 @@ class HTTPRequestManager:
                             # 增加额外随机延迟
                             extra_delay = random.uniform(2.0, 5.0)  # 减少随机延迟上限
                             total_wait = wait_time + extra_delay
+                            if response.status_code == 429 or response.status_code >= 500:
+                                self._penalize_host(url, total_wait)
                             self.logger.info(f"等待{total_wait:.2f}秒后重试(第{retry_count}次)")
                             time.sleep(total_wait)
                             continue
@@ -910,6 +1144,8 @@ class HTTPRequestManager:
 
                         if should_retry:
                             retry_count += 1
+                            if response.status_code == 429 or response.status_code >= 500:
+                                self._penalize_host(url, wait_time)
                             time.sleep(wait_time)
                             continue
 
@@ -966,6 +1202,8 @@ class HTTPRequestManager:
             }
 
         return {
+            "rate_limit_mode": "token_bucket" if self.token_bucket_enabled else "adaptive",
+            "host_buckets": self.rate_limiter.get_stats(),
             "delay_sources": self.recent_delay_sources,
             "delay_averages": delay_averages,
             "recent_force_wait": self.recent_force_wait,
@@ -1,4 +1,6 @@
+import math
 import os
+import re
 import tempfile
 from pathlib import Path
 from typing import List, Optional, Union, Dict
@@ -6,14 +8,19 @@ import subprocess
 import threading
 from dataclasses import dataclass
 from utils.logger_handler import AppLogger
-from concurrent.futures import ThreadPoolExecutor
+from utils.ffmpeg_scheduler import FFmpegJobResult, FFmpegScheduler
+from concurrent.futures import Future, ThreadPoolExecutor
 
 
 @dataclass
 class VideoProcessConfig:
     """视频处理配置"""
     ffmpeg_path: str = 'ffmpeg'
-    max_workers: int = 3  # 并发处理数量
+    max_workers: Optional[int] = None  # 转换线程池大小，默认等于ffmpeg线程预算
+    cpu_threads: Optional[int] = None  # ffmpeg线程预算，默认使用进程共享的调度器(按CPU核数)
+    gif_threads: int = 1  # 每个GIF任务的线程提示
+    merge_threads: Optional[int] = None  # 去水印重编码的线程提示，默认为线程预算的一半
+    merge_preset: str = 'medium'  # 去水印重编码的x264预设
     max_retries: int = 3
     retry_delay: float = 1.0
 
@@ -28,6 +35,12 @@ class VideoProcessConfig:
     gif_min_fps: int = 5  # 最低接受帧率
     gif_min_width: int = 450  # 最低接受宽度
 
+    # GIF大小预测: predict 先编码短探测片段预测完整GIF大小，一次选定参数; iterative 为逐步试错
+    gif_size_mode: str = "predict"
+    gif_probe_seconds: float = 2.0  # 探测片段时长(秒)
+    gif_size_margin: float = 0.9  # 预测时以限制的该比例为目标，给预测误差留余量
+    gif_use_palette: bool = True  # 预测模式下使用 palettegen/paletteuse 生成调色板(画质更好，文件更大)
+
 
 class VideoProcessor:
     """视频处理工具类 (同步版本)"""
@@ -35,37 +48,33 @@ class VideoProcessor:
     def __init__(self, config: Optional[VideoProcessConfig] = None):
         self.config = config or VideoProcessConfig()
         self.logger = AppLogger.get_logger(__name__, app_name='nba')
-        self._semaphore = threading.Semaphore(self.config.max_workers)
-        self._executor = ThreadPoolExecutor(max_workers=self.config.max_workers)
+        # 所有ffmpeg进程经由调度器执行，并发由线程预算控制
+        self.scheduler = (FFmpegScheduler(self.config.cpu_threads) if self.config.cpu_threads
+                          else FFmpegScheduler.shared())
+        self._executor = ThreadPoolExecutor(max_workers=self.config.max_workers or self.scheduler.cpu_threads)
+        # GIF大小模型校正系数: 完整编码实际大小 / 探测预测大小 的滑动平均，随批次逐步校准
+        self._gif_size_ratio = 1.0
+        self._gif_size_lock = threading.Lock()
+
+    def _run_job(self, cmd: List[str], task_id: str, kind: str = 'gif', threads: Optional[int] = None,
+                 duration: Optional[float] = None) -> FFmpegJobResult:
+        """通过调度器执行ffmpeg命令"""
+        result = self.scheduler.run(
+            cmd, task_id, kind=kind,
+            threads=threads or self.config.gif_threads,
+            duration=duration
+        )
+        if not result.success:
+            self.logger.error(f"处理失败[{task_id}]: {result.stderr}")
+        return result
 
-    def _run_ffmpeg(self, cmd: List[str], task_id: str) -> bool:
+    def _run_ffmpeg(self, cmd: List[str], task_id: str, kind: str = 'gif') -> bool:
         """同步执行ffmpeg命令"""
-        with self._semaphore:
-            try:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
+        return self._run_job(cmd, task_id, kind=kind).success
 
-                stdout, stderr = process.communicate()
-
-                if process.returncode != 0:
-                    self.logger.error(f"处理失败[{task_id}]: {stderr.decode()}")
-                    return False
-
-                return True
-
-            except KeyboardInterrupt:
-                self.logger.warning(f"任务被取消[{task_id}]")
-                if process:
-                    process.terminate()
-                    process.wait()
-                raise
-
-            except Exception as e:
-                self.logger.error(f"处理出错[{task_id}]: {str(e)}")
-                return False
+    def get_ffmpeg_stats(self) -> Dict:
+        """ffmpeg任务统计: 线程预算、排队数量、各类型任务耗时和实时倍率"""
+        return self.scheduler.stats()
 
     def merge_videos(self,
                      video_files: List[Path],
@@ -108,7 +117,7 @@ class VideoProcessor:
             # 先合并视频（不去水印）
             merged_temp_path = output_path.parent / f"temp_{output_path.name}"
             concat_cmd = [
-                'ffmpeg',
+                self.config.ffmpeg_path,
                 '-y',  # 覆盖现有文件
                 '-f', 'concat',
                 '-safe', '0',
@@ -119,25 +128,31 @@ class VideoProcessor:
 
             # 执行合并命令
             self.logger.info(f"执行视频合并命令: {' '.join(concat_cmd)}")
-            subprocess.run(concat_cmd, check=True)
+            concat_result = self._run_job(concat_cmd, f"concat_{output_path.stem}", kind='concat', threads=1)
+            if not concat_result.success:
+                raise subprocess.CalledProcessError(concat_result.returncode or 1, concat_cmd)
 
             # 如果需要去水印，对合并后的视频进行处理
             if remove_watermark and merged_temp_path.exists():
                 delogo_cmd = [
-                    'ffmpeg',
+                    self.config.ffmpeg_path,
                     '-y',
                     '-i', str(merged_temp_path),
                     '-vf', 'delogo=x=1030:y=5:w=230:h=40',
                     '-c:v', 'libx264',  # 使用H.264编码器
                     '-crf', '18',  # 高质量设置
-                    '-preset', 'medium',  # 平衡处理时间和质量
+                    '-preset', self.config.merge_preset,  # 平衡处理时间和质量
                     '-c:a', 'copy',  # 保持音频不变
                     str(output_path)
                 ]
 
                 # 执行去水印命令
                 self.logger.info(f"执行水印去除命令: {' '.join(delogo_cmd)}")
-                subprocess.run(delogo_cmd, check=True)
+                merge_threads = self.config.merge_threads or max(1, self.scheduler.cpu_threads // 2)
+                delogo_result = self._run_job(delogo_cmd, f"delogo_{output_path.stem}", kind='delogo',
+                                              threads=merge_threads, duration=concat_result.media_time)
+                if not delogo_result.success:
+                    raise subprocess.CalledProcessError(delogo_result.returncode or 1, delogo_cmd)
 
                 # 删除临时合并文件
                 merged_temp_path.unlink()
@@ -217,6 +232,28 @@ class VideoProcessor:
 
         return results
 
+    def submit_gif(
+            self,
+            video_path: Path,
+            output_path: Optional[Path] = None,
+            force_reprocess: bool = False,
+            **kwargs
+    ) -> Future:
+        """提交单个GIF转换任务到转换线程池，立即返回
+
+        用于下载流水线: 片段下载完成后立即开始转换，与其余片段的下载并行。
+
+        Returns:
+            Future: 结果为GIF路径，失败时为None
+        """
+        return self._executor.submit(
+            self._convert_to_gif_internal,
+            video_path,
+            output_path,
+            force_reprocess=force_reprocess,
+            **kwargs
+        )
+
     def convert_to_gif(
             self,
             video_path: Path,
@@ -298,6 +335,12 @@ class VideoProcessor:
                 self.logger.info(
                     f"GIF已存在但超出大小限制 ({file_size / 1024 / 1024:.2f}MB > {max_size_mb}MB)，重新生成")
 
+        if self.config.gif_size_mode == "predict":
+            result = self._convert_to_gif_predicted(video_path, output_path, task_id=task_id, **kwargs)
+            if result:
+                return result
+            self.logger.warning(f"GIF大小预测不可用，改为逐步调整参数: {output_path}")
+
         # 尝试自适应大小转换
         return self._convert_to_gif_with_size_limit(
             video_path,
@@ -307,6 +350,185 @@ class VideoProcessor:
             **kwargs
         )
 
+    def _probe_duration(self, video_path: Path) -> Optional[float]:
+        """从ffmpeg输出中解析视频时长(秒)"""
+        try:
+            result = subprocess.run(
+                [self.config.ffmpeg_path, '-hide_banner', '-i', str(video_path)],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=30
+            )
+            match = re.search(rb'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', result.stderr)
+            if not match:
+                return None
+            hours, minutes, seconds = match.groups()
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        except (OSError, subprocess.SubprocessError) as e:
+            self.logger.error(f"读取视频时长失败: {video_path} | {e}")
+            return None
+
+    @staticmethod
+    def _palette_filters(fps: int, width: int, quality: int, base_quality: int) -> str:
+        """paletteuse滤镜链: 质量值高于基准时改用bayer抖动，bayer_scale越大文件越小"""
+        if quality <= base_quality:
+            dither = 'sierra2_4a'
+        else:
+            dither = f'bayer:bayer_scale={min(5, 1 + (quality - base_quality) // 3)}'
+        return (f'[0:v]fps={fps},scale={width}:-1:flags=lanczos[x];'
+                f'[x][1:v]paletteuse=dither={dither}:diff_mode=rectangle')
+
+    def _generate_palette(self, video_path: Path, palette_path: Path, fps: int, width: int,
+                          task_id: str, start_time: Optional[float], duration: Optional[float]) -> bool:
+        """为整个片段生成一次调色板，后续每次编码复用"""
+        cmd = [self.config.ffmpeg_path, '-y']
+        if start_time:
+            cmd.extend(['-ss', str(start_time)])
+        if duration:
+            cmd.extend(['-t', str(duration)])
+        cmd.extend([
+            '-i', str(video_path),
+            '-vf', f'fps={fps},scale={width}:-1:flags=lanczos,palettegen=stats_mode=diff',
+            str(palette_path)
+        ])
+        return self._run_ffmpeg(cmd, f"{task_id}_palette", kind='palette')
+
+    def _encode_gif_with_palette(self, video_path: Path, palette_path: Path, output_path: Path,
+                                 fps: int, width: int, quality: int, task_id: str,
+                                 start_time: Optional[float], duration: Optional[float]) -> bool:
+        """使用已生成的调色板编码GIF"""
+        cmd = [self.config.ffmpeg_path, '-y']
+        if start_time:
+            cmd.extend(['-ss', str(start_time)])
+        if duration:
+            cmd.extend(['-t', str(duration)])
+        cmd.extend([
+            '-i', str(video_path),
+            '-i', str(palette_path),
+            '-lavfi', self._palette_filters(fps, width, quality, self.config.gif_quality),
+            str(output_path)
+        ])
+        return self._run_ffmpeg(cmd, task_id)
+
+    def _record_gif_size_ratio(self, predicted: float, actual: int) -> None:
+        """用完整编码结果校准预测模型"""
+        if predicted <= 0:
+            return
+        with self._gif_size_lock:
+            self._gif_size_ratio = 0.7 * self._gif_size_ratio + 0.3 * (actual / predicted)
+
+    def _convert_to_gif_predicted(
+            self,
+            video_path: Path,
+            output_path: Path,
+            task_id: str,
+            max_tries: int = 3,
+            **kwargs
+    ) -> Optional[Path]:
+        """预测参数的GIF转换
+
+        1. palettegen 为整个片段生成一次调色板(gif_use_palette 关闭时使用固定调色板编码)
+        2. 编码中间一段探测片段，按 时长 x 帧率 x 宽度² 线性外推完整GIF大小，
+           再乘以历史校正系数
+        3. 按与逐步调整相同的优先级(先降帧率到10fps，再降分辨率)选出预计能放进限制的参数，编码一次
+        4. 预测失误仍超出限制时，按实际大小重新计算宽度，复用调色板再编码
+
+        无法预测(分辨率不是 "宽度:-1" 形式、读取时长或探测失败)时返回None，由调用方回退到逐步调整。
+        """
+        max_size_mb = kwargs.get('max_size_mb', self.config.gif_max_size_mb)
+        max_size_bytes = max_size_mb * 1024 * 1024
+        target_bytes = max_size_bytes * self.config.gif_size_margin
+
+        fps = kwargs.get('fps', self.config.gif_fps)
+        quality = kwargs.get('quality', self.config.gif_quality)
+        start_time = kwargs.get('start_time')
+        try:
+            base_width = int(str(kwargs.get('scale', self.config.gif_scale)).split(':')[0])
+        except ValueError:
+            return None
+        if base_width <= 0:
+            return None
+
+        duration = kwargs.get('duration') or self._probe_duration(video_path)
+        if not duration:
+            return None
+        if kwargs.get('start_time') and not kwargs.get('duration'):
+            duration = max(0.1, duration - float(start_time))
+
+        temp_output = output_path.parent / f"temp_{output_path.name}"
+        probe_output = output_path.parent / f"temp_probe_{output_path.name}"
+        palette_path = output_path.parent / f"temp_{output_path.stem}_palette.png"
+        min_fps = self.config.gif_min_fps
+        min_width = self.config.gif_min_width
+
+        def encode(target: Path, encode_fps: int, width: int, encode_task_id: str,
+                   encode_start: Optional[float], encode_duration: Optional[float]) -> bool:
+            if self.config.gif_use_palette:
+                return self._encode_gif_with_palette(video_path, palette_path, target, encode_fps, width,
+                                                     quality, encode_task_id, encode_start, encode_duration)
+            return self._convert_to_gif_basic(video_path, target, encode_task_id, fps=encode_fps,
+                                              scale=f"{width}:-1", quality=quality,
+                                              start_time=encode_start, duration=encode_duration)
+
+        try:
+            if self.config.gif_use_palette and not self._generate_palette(
+                    video_path, palette_path, fps, base_width, task_id, start_time, kwargs.get('duration')):
+                return None
+
+            # 探测片段: 短片段直接完整编码，本身即为结果
+            probe_seconds = self.config.gif_probe_seconds
+            predicted = None
+            if duration > probe_seconds * 1.5:
+                probe_start = float(start_time or 0) + (duration - probe_seconds) / 2
+                if not encode(probe_output, fps, base_width, f"{task_id}_probe", probe_start, probe_seconds):
+                    return None
+                with self._gif_size_lock:
+                    ratio = self._gif_size_ratio
+                predicted = probe_output.stat().st_size * duration / probe_seconds * ratio
+
+                # 按优先级选择参数: 原参数 -> 降帧率 -> 按面积比例降分辨率
+                width = base_width
+                if predicted > target_bytes:
+                    reduced_fps = max(min_fps, min(fps, 10))
+                    predicted = predicted * reduced_fps / fps
+                    fps = reduced_fps
+                if predicted > target_bytes:
+                    width = max(min_width, int(base_width * math.sqrt(target_bytes / predicted)) // 2 * 2)
+                    predicted = predicted * (width / base_width) ** 2
+                self.logger.info(f"GIF大小预测 {predicted / 1024 / 1024:.2f}MB (限制 {max_size_mb}MB), "
+                                 f"参数: fps={fps}, scale={width}:-1 | {output_path.name}")
+            else:
+                width = base_width
+
+            file_size = 0
+            for attempt in range(1, max_tries + 1):
+                if not encode(temp_output, fps, width, task_id, start_time, kwargs.get('duration')):
+                    return None
+
+                file_size = temp_output.stat().st_size
+                if attempt == 1 and predicted:
+                    self._record_gif_size_ratio(predicted / ratio, file_size)
+                self.logger.info(f"编码 {attempt}/{max_tries}: 生成GIF大小 {file_size / 1024 / 1024:.2f}MB, "
+                                 f"参数: fps={fps}, scale={width}:-1")
+                if file_size <= max_size_bytes or width <= min_width:
+                    break
+
+                # 预测失误: 按实际大小计算新宽度
+                width = max(min_width, int(width * math.sqrt(target_bytes / file_size)) // 2 * 2)
+
+            if file_size > max_size_bytes:
+                self.logger.warning(f"无法生成符合大小限制的GIF ({max_size_mb}MB)，"
+                                    f"最后尝试生成大小: {file_size / 1024 / 1024:.2f}MB")
+            os.replace(temp_output, output_path)
+            self.logger.info(f"成功生成GIF: {output_path} ({file_size / 1024 / 1024:.2f}MB)")
+            return output_path
+
+        except Exception as e:
+            self.logger.error(f"GIF预测转换失败[{task_id}]: {str(e)}")
+            return None
+        finally:
+            for path in (temp_output, probe_output, palette_path):
+                if path.exists():
+                    path.unlink()
+
     def _convert_to_gif_with_size_limit(
             self,
             video_path: Path,
@@ -359,7 +581,7 @@ class VideoProcessor:
 
         self.logger.info(f"开始转换GIF (大小限制: {max_size_mb}MB): {output_path}")
 
-        success = False
+        fitted = False
         while tries < max_tries:
             tries += 1
             current_params = params.copy()
@@ -392,7 +614,7 @@ class VideoProcessor:
                         output_path.unlink()
                     temp_output.rename(output_path)
                 self.logger.info(f"成功生成符合大小要求的GIF: {output_path} ({file_size_mb:.2f}MB)")
-                success = True
+                fitted = True
                 break
             else:
                 # 记录上一次结果路径用于清理
@@ -428,7 +650,7 @@ class VideoProcessor:
                         break
 
         # 清理临时文件
-        if not success and last_result_path and last_result_path.exists():
+        if not fitted and last_result_path and last_result_path.exists():
             self.logger.warning(f"无法生成符合大小限制的GIF ({max_size_mb}MB)，"
                                 f"最后尝试生成大小: {last_file_size_mb:.2f}MB")
             # 如果用户愿意接受大一点的文件，可以保留最后生成的结果
@@ -437,7 +659,7 @@ class VideoProcessor:
             last_result_path.rename(output_path)
             return output_path
 
-        return output_path if success else None
+        return output_path if fitted else None
 
     def process_videos(
             self,
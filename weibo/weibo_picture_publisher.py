@@ -1,6 +1,7 @@
 from typing import Dict, Any, List, Union
 import os, time, json, hashlib, random
 import requests, base64, zlib
+from utils.http_handler import RateLimitedAdapter
 from utils.logger_handler import AppLogger
 
 
@@ -21,8 +22,9 @@ class WeiboImagePublisher:
         self.cookie = cookie
         self.xsrf_token = ""  # 初始为空，将通过API自动获取
 
-        # 创建并初始化会话对象
+        # 创建并初始化会话对象，请求计入微博主机的共享令牌桶
         self.session = requests.Session()
+        self.session.mount('https://', RateLimitedAdapter())
 
         # 设置会话的cookies
         if self.cookie:
@@ -371,6 +373,7 @@ class WeiboMobileImagePublisher:
         self._validate_cookies()
 
         self.session = requests.Session()
+        self.session.mount('https://', RateLimitedAdapter())
         self._xsrf_token = None
         self._setup_session()
 
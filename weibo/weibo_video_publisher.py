@@ -5,6 +5,7 @@ import math
 import hashlib
 import requests
 from typing import Dict, Any, Optional, List, Callable
+from utils.http_handler import RateLimitedAdapter
 from utils.logger_handler import AppLogger
 
 class WeiboVideoPublisher:
@@ -67,8 +68,9 @@ class WeiboVideoPublisher:
 
     def get_upload_urls(self) -> Dict[str, Any]:
         """获取上传相关的URL配置，同时更新XSRF token"""
-        # 创建会话对象处理cookies
+        # 创建会话对象处理cookies，请求计入微博主机的共享令牌桶
         session = requests.Session()
+        session.mount('https://', RateLimitedAdapter())
 
         # 设置session的cookies
         if self.cookie: